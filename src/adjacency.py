@@ -0,0 +1,73 @@
+import numpy as np
+
+
+class SpikeAdjacency:
+    """
+    CSR neuron -> neuron matrix used to deliver spikes.
+
+    Every neuron owns exactly num_outputs outputs and every output reaches at
+    most one input, so row i is the fixed slot range
+    indptr[i] .. indptr[i + 1] and slot j belongs to output j.
+    An unconnected output is an explicit zero, which lets link / unlink
+    update the matrix in place instead of rebuilding it.
+    """
+
+    def __init__(self, num_neurons: int, num_outputs: int) -> None:
+        self.num_neurons = num_neurons
+        self.num_outputs = num_outputs
+        self.indptr = np.arange(
+            0, num_neurons * num_outputs + 1, num_outputs, dtype=np.int64
+        )
+        self.indices = np.zeros(num_neurons * num_outputs, dtype=np.int32)
+        self.data = np.zeros(num_neurons * num_outputs, dtype=np.float32)
+
+    def link(
+        self, outputs: np.ndarray, targets: np.ndarray, transfers: np.ndarray
+    ) -> None:
+        self.indices[outputs] = targets
+        self.data[outputs] = transfers
+
+    def unlink(self, outputs: np.ndarray) -> None:
+        self.indices[outputs] = 0
+        self.data[outputs] = 0.0
+
+    def row_slots(self, neurons: np.ndarray) -> np.ndarray:
+        return (
+            self.indptr[neurons][:, None] + np.arange(self.num_outputs)
+        ).ravel()
+
+    def spike_product(self, spikes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Sparse A[spikes].T @ 1, only touching the rows of spiking neurons.
+        Returns (targets, amounts), targets may repeat.
+        """
+        slots = self.row_slots(spikes)
+        slots = slots[self.data[slots] > 0.0]
+        return self.indices[slots], self.data[slots]
+
+    def deliver(self, spikes: np.ndarray, charge: np.ndarray) -> np.ndarray:
+        """Add every spike's transfer to its targets' charge, returns the targets."""
+        if len(spikes) == 0:
+            return spikes
+        targets, amounts = self.spike_product(spikes)
+        np.add.at(charge, targets, amounts)
+        return targets
+
+
+def signal_transfer_amounts(
+    input_weight: np.ndarray, output_weight: np.ndarray
+) -> np.ndarray:
+    return np.clip(input_weight * output_weight, 0.0, 1.0)
+
+
+def rebuild_adjacency(brain) -> SpikeAdjacency:
+    """Build the adjacency from scratch out of brain.output_conn."""
+    adjacency = SpikeAdjacency(brain.num_neurons, brain.num_outputs)
+    outputs = np.flatnonzero(brain.output_conn >= 0)
+    inputs = brain.output_conn[outputs]
+    adjacency.link(
+        outputs,
+        brain.input_parent[inputs],
+        signal_transfer_amounts(brain.input_weight[inputs], brain.output_weight[outputs]),
+    )
+    return adjacency
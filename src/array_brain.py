@@ -0,0 +1,159 @@
+import numpy as np
+
+from src.adjacency import SpikeAdjacency
+from src.config import SimConfig
+from src.rng import seed_state
+
+
+class ArrayBrain:
+    """
+    Structure-of-arrays version of the brain.
+
+    Neuron i owns inputs i * num_inputs .. (i + 1) * num_inputs - 1
+    and outputs i * num_outputs .. (i + 1) * num_outputs - 1.
+    Connections are stored as indices, -1 means unconnected.
+    Sizes come from config, which the step functions read the rules from.
+    """
+
+    def __init__(self, config: SimConfig) -> None:
+        self.config = config
+        num_neurons = self.num_neurons = config.num_neurons
+        num_inputs = self.num_inputs = config.num_inputs
+        num_outputs = self.num_outputs = config.num_outputs
+
+        self.neuron_pos = np.zeros((num_neurons, 2), dtype=np.int32)
+        self.hub_pos = np.zeros((num_neurons, 2), dtype=np.int32)
+        self.satisfied = np.zeros(num_neurons, dtype=bool)
+        self.hub_satisfied = np.zeros(num_neurons, dtype=bool)
+        self.connected_inputs = np.zeros(num_neurons, dtype=np.int32)
+        self.connected_outputs = np.zeros(num_neurons, dtype=np.int32)
+
+        # global totals, kept in step with the per-neuron counts
+        self.total_connected = 0
+        self.total_satisfied = 0
+        self.total_hub_satisfied = 0
+        self.connection_changes = 0
+        self.moves = 0  # neuron, hub and terminal position changes
+
+        self.charge = np.zeros(num_neurons, dtype=np.float32)
+        self.charge_rate = np.zeros(num_neurons, dtype=np.float32)
+        self.signal_pos = np.zeros(num_neurons, dtype=np.float32)
+        self.signal_active = np.zeros(num_neurons, dtype=bool)
+
+        total_inputs = num_neurons * num_inputs
+        self.input_pos = np.zeros((total_inputs, 2), dtype=np.int32)
+        self.input_weight = np.zeros(total_inputs, dtype=np.float32)
+        self.input_parent = np.repeat(
+            np.arange(num_neurons, dtype=np.int32), num_inputs
+        )
+        self.input_conn = np.full(total_inputs, -1, dtype=np.int32)
+
+        total_outputs = num_neurons * num_outputs
+        self.output_pos = np.zeros((total_outputs, 2), dtype=np.int32)
+        self.output_weight = np.zeros(total_outputs, dtype=np.float32)
+        self.output_parent = np.repeat(
+            np.arange(num_neurons, dtype=np.int32), num_outputs
+        )
+        self.output_conn = np.full(total_outputs, -1, dtype=np.int32)
+
+        # sorted indices of the unconnected terminals, kept in sync with the
+        # conn arrays by register_connections / disconnect_arrays
+        self.free_inputs = np.arange(total_inputs, dtype=np.int64)
+        self.free_outputs = np.arange(total_outputs, dtype=np.int64)
+
+        # kept in sync by connect_arrays / disconnect_arrays
+        self.adjacency = SpikeAdjacency(num_neurons, num_outputs)
+
+        # set by start_profiling, connect attempts add their time to it
+        self.profiler = None
+
+
+def clamp_to_grid_arrays(points: np.ndarray, grid_size: int) -> np.ndarray:
+    return np.clip(points, 0, grid_size - 1)
+
+
+def clamp_to_taxicab_arrays(
+    points: np.ndarray,
+    centers: np.ndarray,
+    max_dist: int,
+    grid_size: int,
+) -> np.ndarray:
+    """
+    Vectorized clamp_xy_to_taxicab.
+
+    The object version shrinks the larger axis one cell at a time (x wins ties)
+    until the L1 distance fits, this computes the same end point in closed form.
+    """
+    clamped = clamp_to_grid_arrays(points, grid_size)
+    delta = clamped - centers
+    a = np.abs(delta[:, 0])
+    b = np.abs(delta[:, 1])
+    excess = a + b - max_dist
+
+    over = excess > 0
+    if np.any(over):
+        a_over = a[over]
+        b_over = b[over]
+        e_over = excess[over]
+        gap = np.abs(a_over - b_over)
+        x_larger = a_over >= b_over
+
+        # the larger axis absorbs everything
+        only_larger = gap >= e_over
+        new_a = np.where(x_larger & only_larger, a_over - e_over, a_over)
+        new_b = np.where(~x_larger & only_larger, b_over - e_over, b_over)
+
+        # equalize first, then alternate starting with x
+        rest = e_over - gap
+        level = np.minimum(a_over, b_over)
+        both = ~only_larger
+        new_a = np.where(both, level - (rest + 1) // 2, new_a)
+        new_b = np.where(both, level - rest // 2, new_b)
+
+        a[over] = new_a
+        b[over] = new_b
+        delta[:, 0] = np.sign(delta[:, 0]) * a
+        delta[:, 1] = np.sign(delta[:, 1]) * b
+
+    return clamp_to_grid_arrays(centers + delta, grid_size)
+
+
+def init_array_brain(state, seed: int | np.random.SeedSequence | None = None):
+    """
+    same placement rules as init_brain, but everything lands in flat arrays
+    on state.arrays instead of Neuron / Input / Output objects
+    """
+    seed_state(state, seed)
+    rng = state.rng
+    config = state.config
+    grid_size = config.grid_size
+    brain = ArrayBrain(config)
+
+    brain.neuron_pos[:] = rng.integers(0, grid_size, size=(brain.num_neurons, 2))
+
+    input_offsets = rng.integers(
+        -config.input_max_dist, config.input_max_dist + 1, size=brain.input_pos.shape
+    )
+    brain.input_pos[:] = clamp_to_grid_arrays(
+        brain.neuron_pos[brain.input_parent] + input_offsets, grid_size
+    )
+    brain.input_weight[:] = rng.uniform(-1.0, 1.0, size=brain.input_weight.shape)
+
+    # outputs are placed around the unclamped hub, same as init_brain
+    raw_hub_pos = brain.neuron_pos + rng.integers(
+        -config.hub_max_dist, config.hub_max_dist + 1, size=brain.hub_pos.shape
+    )
+    brain.hub_pos[:] = clamp_to_grid_arrays(raw_hub_pos, grid_size)
+
+    output_offsets = rng.integers(
+        -config.output_max_dist, config.output_max_dist + 1, size=brain.output_pos.shape
+    )
+    brain.output_pos[:] = clamp_to_grid_arrays(
+        raw_hub_pos[brain.output_parent] + output_offsets, grid_size
+    )
+    brain.output_weight[:] = rng.uniform(-1.0, 1.0, size=brain.output_weight.shape)
+
+    brain.charge[:] = rng.random(brain.num_neurons)
+    brain.charge_rate[:] = config.neuron_charge_rate
+
+    state.arrays = brain
@@ -0,0 +1,422 @@
+from time import perf_counter_ns
+
+import numpy as np
+
+from src.adjacency import signal_transfer_amounts
+from src.array_brain import (
+    ArrayBrain,
+    clamp_to_grid_arrays,
+    clamp_to_taxicab_arrays,
+)
+
+
+def step_array_state(state, dt: float) -> None:
+    """Array engine version of step_state, every phase is one vectorized pass."""
+    brain: ArrayBrain = state.arrays
+    rng = state.rng
+    scheduler = state.scheduler
+    step = state.step_count
+
+    profiler = state.profiler
+
+    migrate_neurons(brain, rng, *phase_slot(scheduler, "neurons", step))
+    if profiler is not None:
+        profiler.lap("neurons")
+    migrate_hubs(brain, rng, *phase_slot(scheduler, "hubs", step))
+    if profiler is not None:
+        profiler.lap("hubs")
+    migrate_inputs(brain, rng, *phase_slot(scheduler, "inputs", step))
+    if profiler is not None:
+        profiler.lap("inputs")
+    migrate_outputs(brain, rng, *phase_slot(scheduler, "outputs", step))
+    if profiler is not None:
+        profiler.lap("outputs")
+
+    period, offset = phase_slot(scheduler, "activity", step)
+    state.spike_count += update_activity(brain, dt * period, period, offset)
+    sync_counters(state, brain)
+    if profiler is not None:
+        profiler.lap("activity")
+
+
+def sync_counters(state, brain: ArrayBrain) -> None:
+    """Mirror the brain's running totals onto the State counters."""
+    state.connected_inputs = brain.total_connected
+    state.connected_outputs = brain.total_connected
+    state.satisfied_neurons = brain.total_satisfied
+    state.satisfied_hubs = brain.total_hub_satisfied
+    state.connection_changes = brain.connection_changes
+    state.moves = brain.moves
+
+
+def phase_slot(scheduler, name: str, step: int) -> tuple[int, int]:
+    """(period, offset) for a phase, items with index % period == offset are due."""
+    period = scheduler.period(name)
+    return period, step % period
+
+
+def due(walkers: np.ndarray, period: int, offset: int) -> np.ndarray:
+    if period == 1:
+        return walkers
+    return walkers[walkers % period == offset]
+
+
+def random_steps(rng: np.random.Generator, count: int) -> np.ndarray:
+    return rng.integers(-1, 2, size=(count, 2), dtype=np.int32)
+
+
+def cell_keys(pos: np.ndarray, grid_size: int) -> np.ndarray:
+    return pos[:, 0].astype(np.int64) * grid_size + pos[:, 1]
+
+
+def rank_within_cells(cells: np.ndarray) -> np.ndarray:
+    """For each entry, how many earlier entries share its cell."""
+    order = np.argsort(cells, kind="stable")
+    sorted_cells = cells[order]
+    positions = np.arange(len(cells))
+    starts = np.ones(len(cells), dtype=bool)
+    starts[1:] = sorted_cells[1:] != sorted_cells[:-1]
+    group_start = np.maximum.accumulate(np.where(starts, positions, 0))
+    ranks = np.empty(len(cells), dtype=np.int64)
+    ranks[order] = positions - group_start
+    return ranks
+
+
+def pair_by_cell(
+    movers: np.ndarray,
+    mover_pos: np.ndarray,
+    partners: np.ndarray,
+    partner_pos: np.ndarray,
+    grid_size: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Match the k-th mover in a cell with the k-th free partner in the same cell.
+    Partners outside the movers' cells are dropped before ranking, so the sort
+    scales with the movers and their neighbours rather than every free partner.
+    Returns matched (movers, partners).
+    """
+    empty = np.empty(0, dtype=np.int64)
+    if len(movers) == 0 or len(partners) == 0:
+        return empty, empty
+
+    mover_cells = cell_keys(mover_pos, grid_size)
+    partner_cells = cell_keys(partner_pos, grid_size)
+    occupied = np.unique(mover_cells)
+    slots = np.minimum(np.searchsorted(occupied, partner_cells), len(occupied) - 1)
+    nearby = occupied[slots] == partner_cells
+    # filtering keeps partner order, so ranks within the kept cells are unchanged
+    partners = partners[nearby]
+    partner_cells = partner_cells[nearby]
+    if len(partners) == 0:
+        return empty, empty
+
+    stride = max(len(movers), len(partners)) + 1
+    mover_keys = mover_cells * stride + rank_within_cells(mover_cells)
+    partner_keys = partner_cells * stride + rank_within_cells(partner_cells)
+
+    _, mover_hits, partner_hits = np.intersect1d(
+        mover_keys, partner_keys, assume_unique=True, return_indices=True
+    )
+    return movers[mover_hits], partners[partner_hits]
+
+
+def update_satisfaction(brain: ArrayBrain, neurons: np.ndarray) -> None:
+    if len(neurons) == 0:
+        return
+    was_satisfied = int(np.count_nonzero(brain.satisfied[neurons]))
+    was_hub_satisfied = int(np.count_nonzero(brain.hub_satisfied[neurons]))
+    config = brain.config
+    brain.satisfied[neurons] = (
+        brain.connected_inputs[neurons] / brain.num_inputs
+        >= config.neuron_satisfaction_ratio
+        if brain.num_inputs > 0
+        else True
+    )
+    brain.hub_satisfied[neurons] = (
+        brain.connected_outputs[neurons] / brain.num_outputs
+        >= config.hub_satisfaction_ratio
+        if brain.num_outputs > 0
+        else True
+    )
+    brain.total_satisfied += int(np.count_nonzero(brain.satisfied[neurons])) - was_satisfied
+    brain.total_hub_satisfied += (
+        int(np.count_nonzero(brain.hub_satisfied[neurons])) - was_hub_satisfied
+    )
+
+
+def connect_arrays(brain: ArrayBrain, inputs: np.ndarray, outputs: np.ndarray) -> None:
+    """Connect free input/output pairs, skipping pairs that share a neuron."""
+    input_parents = brain.input_parent[inputs]
+    output_parents = brain.output_parent[outputs]
+    keep = input_parents != output_parents
+    inputs = inputs[keep]
+    outputs = outputs[keep]
+    if len(inputs) == 0:
+        return
+
+    brain.input_conn[inputs] = outputs
+    brain.output_conn[outputs] = inputs
+    register_connections(brain, inputs, outputs)
+
+
+def register_connections(
+    brain: ArrayBrain, inputs: np.ndarray, outputs: np.ndarray
+) -> None:
+    """Adjacency, counts and satisfaction for pairs already written to the conn arrays."""
+    if len(inputs) == 0:
+        return
+    input_parents = brain.input_parent[inputs]
+    output_parents = brain.output_parent[outputs]
+    brain.adjacency.link(
+        outputs,
+        input_parents,
+        signal_transfer_amounts(brain.input_weight[inputs], brain.output_weight[outputs]),
+    )
+    np.add.at(brain.connected_inputs, input_parents, 1)
+    np.add.at(brain.connected_outputs, output_parents, 1)
+    brain.total_connected += len(inputs)
+    brain.connection_changes += len(inputs)
+    brain.free_inputs = brain.free_inputs[brain.input_conn[brain.free_inputs] < 0]
+    brain.free_outputs = brain.free_outputs[brain.output_conn[brain.free_outputs] < 0]
+    update_satisfaction(brain, np.union1d(input_parents, output_parents))
+
+
+def freed(free: np.ndarray, released: np.ndarray) -> np.ndarray:
+    """free with the released indices, none of them in it yet, merged in order."""
+    released = np.sort(released)
+    return np.insert(free, np.searchsorted(free, released), released)
+
+
+def disconnect_arrays(brain: ArrayBrain, inputs: np.ndarray) -> None:
+    """Disconnect the given inputs from whatever output they are attached to."""
+    inputs = inputs[brain.input_conn[inputs] >= 0]
+    if len(inputs) == 0:
+        return
+    outputs = brain.input_conn[inputs]
+
+    brain.input_conn[inputs] = -1
+    brain.output_conn[outputs] = -1
+    brain.adjacency.unlink(outputs)
+
+    input_parents = brain.input_parent[inputs]
+    output_parents = brain.output_parent[outputs]
+    np.subtract.at(brain.connected_inputs, input_parents, 1)
+    np.subtract.at(brain.connected_outputs, output_parents, 1)
+    brain.total_connected -= len(inputs)
+    brain.connection_changes += len(inputs)
+    brain.free_inputs = freed(brain.free_inputs, inputs)
+    brain.free_outputs = freed(brain.free_outputs, outputs)
+    update_satisfaction(brain, np.union1d(input_parents, output_parents))
+
+
+def attempt_connect_inputs(brain: ArrayBrain, inputs: np.ndarray) -> None:
+    profiler = brain.profiler
+    start = perf_counter_ns() if profiler is not None else 0
+    inputs = inputs[brain.input_conn[inputs] < 0]
+    free_outputs = brain.free_outputs
+    movers, partners = pair_by_cell(
+        inputs,
+        brain.input_pos[inputs],
+        free_outputs,
+        brain.output_pos[free_outputs],
+        brain.config.grid_size,
+    )
+    connect_arrays(brain, movers, partners)
+    if profiler is not None:
+        profiler.connect_ns += perf_counter_ns() - start
+
+
+def attempt_connect_outputs(brain: ArrayBrain, outputs: np.ndarray) -> None:
+    profiler = brain.profiler
+    start = perf_counter_ns() if profiler is not None else 0
+    outputs = outputs[brain.output_conn[outputs] < 0]
+    free_inputs = brain.free_inputs
+    movers, partners = pair_by_cell(
+        outputs,
+        brain.output_pos[outputs],
+        free_inputs,
+        brain.input_pos[free_inputs],
+        brain.config.grid_size,
+    )
+    connect_arrays(brain, partners, movers)
+    if profiler is not None:
+        profiler.connect_ns += perf_counter_ns() - start
+
+
+def walk(
+    rng: np.random.Generator,
+    pos: np.ndarray,
+    walkers: np.ndarray,
+    centers: np.ndarray,
+    max_dist: int,
+    grid_size: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Random step every walker, clamped around its center.
+    Returns the walkers that actually moved and their new positions.
+    """
+    steps = random_steps(rng, len(walkers))
+    stepping = np.any(steps != 0, axis=1)
+    walkers = walkers[stepping]
+    old_pos = pos[walkers]
+    new_pos = clamp_to_taxicab_arrays(
+        old_pos + steps[stepping], centers[stepping], max_dist, grid_size
+    )
+    moved = np.any(new_pos != old_pos, axis=1)
+    return walkers[moved], new_pos[moved]
+
+
+def migrate_inputs(
+    brain: ArrayBrain, rng: np.random.Generator, period: int = 1, offset: int = 0
+) -> None:
+    """Random walk every unconnected input around its neuron, then try to connect."""
+    walkers = due(brain.free_inputs, period, offset)
+    centers = brain.neuron_pos[brain.input_parent[walkers]]
+    config = brain.config
+    moved, new_pos = walk(
+        rng, brain.input_pos, walkers, centers, config.input_max_dist, config.grid_size
+    )
+    brain.input_pos[moved] = new_pos
+    brain.moves += len(moved)
+    attempt_connect_inputs(brain, moved)
+
+
+def migrate_outputs(
+    brain: ArrayBrain, rng: np.random.Generator, period: int = 1, offset: int = 0
+) -> None:
+    """Random walk every unconnected output around its hub, then try to connect."""
+    walkers = due(brain.free_outputs, period, offset)
+    centers = brain.hub_pos[brain.output_parent[walkers]]
+    config = brain.config
+    moved, new_pos = walk(
+        rng, brain.output_pos, walkers, centers, config.output_max_dist, config.grid_size
+    )
+    brain.output_pos[moved] = new_pos
+    brain.moves += len(moved)
+    attempt_connect_outputs(brain, moved)
+
+
+def pull_outputs_toward_hubs(brain: ArrayBrain, neurons: np.ndarray) -> None:
+    """Ensure outputs remain within their allowed radius when hubs move."""
+    if len(neurons) == 0:
+        return
+    outputs = (
+        neurons[:, None] * brain.num_outputs + np.arange(brain.num_outputs)
+    ).ravel()
+    old_pos = brain.output_pos[outputs]
+    centers = brain.hub_pos[brain.output_parent[outputs]]
+    new_pos = clamp_to_taxicab_arrays(
+        old_pos, centers, brain.config.output_max_dist, brain.config.grid_size
+    )
+    moved = np.any(new_pos != old_pos, axis=1)
+    outputs = outputs[moved]
+    if len(outputs) == 0:
+        return
+
+    connected = brain.output_conn[outputs]
+    disconnect_arrays(brain, connected[connected >= 0])
+    brain.output_pos[outputs] = new_pos[moved]
+    brain.moves += len(outputs)
+    attempt_connect_outputs(brain, outputs)
+
+
+def migrate_neurons(
+    brain: ArrayBrain, rng: np.random.Generator, period: int = 1, offset: int = 0
+) -> None:
+    """
+    Move every unsatisfied neuron by up to one cell, drag inputs that end up
+    too far along by the same step and keep the hub within reach.
+    """
+    config = brain.config
+    grid_size = config.grid_size
+    walkers = due(np.flatnonzero(~brain.satisfied), period, offset)
+    steps = random_steps(rng, len(walkers))
+    old_pos = brain.neuron_pos[walkers]
+    new_pos = clamp_to_grid_arrays(old_pos + steps, grid_size)
+    moved = np.any(new_pos != old_pos, axis=1)
+    neurons = walkers[moved]
+    if len(neurons) == 0:
+        return
+    steps = steps[moved]
+    brain.neuron_pos[neurons] = new_pos[moved]
+    brain.moves += len(neurons)
+
+    # inputs too far in x or y get shifted by that axis of the step
+    inputs = neurons[:, None] * brain.num_inputs + np.arange(brain.num_inputs)
+    input_pos = brain.input_pos[inputs]
+    neuron_pos = brain.neuron_pos[neurons][:, None, :]
+    too_far = np.abs(input_pos - neuron_pos) > config.input_max_dist
+    shifted = input_pos + np.where(too_far, steps[:, None, :], 0)
+    dragged = np.any(too_far, axis=2)
+
+    inputs = inputs[dragged]
+    if len(inputs):
+        disconnect_arrays(brain, inputs)
+        brain.input_pos[inputs] = clamp_to_taxicab_arrays(
+            shifted[dragged],
+            brain.neuron_pos[brain.input_parent[inputs]],
+            config.input_max_dist,
+            grid_size,
+        )
+        brain.moves += len(inputs)
+        attempt_connect_inputs(brain, inputs)
+
+    # ensure hubs stay within allowed distance after the neurons move
+    old_hub = brain.hub_pos[neurons]
+    new_hub = clamp_to_taxicab_arrays(
+        old_hub, brain.neuron_pos[neurons], config.hub_max_dist, grid_size
+    )
+    hub_moved = np.any(new_hub != old_hub, axis=1)
+    brain.hub_pos[neurons[hub_moved]] = new_hub[hub_moved]
+    brain.moves += int(np.count_nonzero(hub_moved))
+    pull_outputs_toward_hubs(brain, neurons[hub_moved])
+
+
+def migrate_hubs(
+    brain: ArrayBrain, rng: np.random.Generator, period: int = 1, offset: int = 0
+) -> None:
+    """Randomly walk unsatisfied hubs while keeping them near their neuron."""
+    walkers = due(np.flatnonzero(~brain.hub_satisfied), period, offset)
+    centers = brain.neuron_pos[walkers]
+    config = brain.config
+    moved, new_pos = walk(
+        rng, brain.hub_pos, walkers, centers, config.hub_max_dist, config.grid_size
+    )
+    brain.hub_pos[moved] = new_pos
+    brain.moves += len(moved)
+    pull_outputs_toward_hubs(brain, moved)
+
+
+def update_activity(
+    brain: ArrayBrain, dt: float, period: int = 1, offset: int = 0
+) -> int:
+    """
+    Charge integration, signal progress and threshold crossing in bulk.
+    Arriving signals are delivered through the CSR adjacency, so delivery
+    cost scales with the number of spikes rather than the number of neurons.
+    Only neurons with index % period == offset are integrated this step.
+    Returns the number of spikes fired.
+    """
+    if period == 1:
+        active = brain.signal_active.copy()
+        charging = ~active
+    else:
+        due_now = np.zeros(brain.num_neurons, dtype=bool)
+        due_now[offset::period] = True
+        active = brain.signal_active & due_now
+        charging = ~brain.signal_active & due_now
+
+    brain.signal_pos[active] += brain.config.signal_speed * dt
+    arrived = np.flatnonzero(active & (brain.signal_pos >= 1.0))
+    brain.signal_pos[arrived] = 0.0
+    brain.signal_active[arrived] = False
+
+    brain.charge[charging] += brain.charge_rate[charging] * dt
+    targets = brain.adjacency.deliver(arrived, brain.charge)
+    brain.charge[targets] = np.clip(brain.charge[targets], 0.0, 1.0)
+
+    firing = ~brain.signal_active & (brain.charge >= 1.0)
+    brain.charge[firing] = 0.0
+    brain.signal_active[firing] = True
+    brain.signal_pos[firing] = 0.0
+    return int(np.count_nonzero(firing))
@@ -0,0 +1,438 @@
+"""Scaling benchmarks for init_brain, step_state, connect attempts and draw."""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from src import array_step, step
+from src.config import SimConfig
+from src.run import build_state
+from src.settings import SIM_DT
+from src.threaded import free_threaded
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Sweep brain sizes and time init, stepping, connects and draw."
+    )
+    parser.add_argument(
+        "--engine",
+        nargs="+",
+        choices=("object", "array"),
+        default=["object", "array"],
+        help="Engines to benchmark (default: both).",
+    )
+    parser.add_argument(
+        "--neurons",
+        nargs="+",
+        type=int,
+        default=[128, 1024],
+        help="num_neurons values to sweep (default: 128 1024).",
+    )
+    parser.add_argument(
+        "--grid",
+        nargs="+",
+        type=int,
+        default=[16, 64],
+        help="grid_size values to sweep (default: 16 64).",
+    )
+    parser.add_argument(
+        "--terminals",
+        nargs="+",
+        type=int,
+        default=[4],
+        help="num_inputs / num_outputs values to sweep (default: 4).",
+    )
+    parser.add_argument(
+        "--max-dist",
+        nargs="+",
+        default=["2,4,2"],
+        help="INPUT,HUB,OUTPUT max distances to sweep (default: 2,4,2).",
+    )
+    parser.add_argument(
+        "--steps",
+        type=int,
+        default=200,
+        help="Measured steps per case (default: 200).",
+    )
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=50,
+        help="Unmeasured steps before timing (default: 50).",
+    )
+    parser.add_argument(
+        "--threads",
+        nargs="+",
+        type=int,
+        default=[],
+        help="Also time object engine steps on this many threads (default: off).",
+    )
+    parser.add_argument(
+        "--frames",
+        type=int,
+        default=0,
+        help="Draw frames to time per case, 0 skips draw (default: 0).",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed for every case (default: 0).",
+    )
+    parser.add_argument(
+        "--out",
+        type=Path,
+        default=None,
+        help="Write results as JSON to this path.",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=None,
+        help="Compare against results previously written with --out.",
+    )
+    parser.add_argument(
+        "--max-slowdown",
+        type=float,
+        default=1.25,
+        help="Fail when a case is this many times slower than baseline (default: 1.25).",
+    )
+    return parser.parse_args()
+
+
+def sweep_cases(args: argparse.Namespace) -> list[dict]:
+    cases = []
+    for engine, neurons, grid, terminals, max_dist in itertools.product(
+        args.engine, args.neurons, args.grid, args.terminals, args.max_dist
+    ):
+        input_dist, hub_dist, output_dist = (int(v) for v in max_dist.split(","))
+        settings = {
+            "num_neurons": neurons,
+            "grid_size": grid,
+            "num_inputs": terminals,
+            "num_outputs": terminals,
+            "input_max_dist": input_dist,
+            "hub_max_dist": hub_dist,
+            "output_max_dist": output_dist,
+        }
+        key = f"{engine}/n{neurons}/g{grid}/io{terminals}/d{max_dist}"
+        cases.append({"key": key, "engine": engine, "settings": settings})
+    return cases
+
+
+def engine_phases(engine: str):
+    """(name, fn(state, dt)) in step_state order, each phase staggers itself."""
+    if engine == "array":
+
+        def array_phase(name, fn):
+            def run(s, dt):
+                period, offset = array_step.phase_slot(s.scheduler, name, s.step_count)
+                fn(s, period, offset)
+
+            return name, run
+
+        def migrate_phase(name, migrate):
+            return array_phase(name, lambda s, p, o: migrate(s.arrays, s.rng, p, o))
+
+        return (
+            migrate_phase("neurons", array_step.migrate_neurons),
+            migrate_phase("hubs", array_step.migrate_hubs),
+            migrate_phase("inputs", array_step.migrate_inputs),
+            migrate_phase("outputs", array_step.migrate_outputs),
+            array_phase(
+                "activity",
+                lambda s, p, o: array_step.update_activity(s.arrays, SIM_DT * p, p, o),
+            ),
+        )
+    return (
+        ("neurons", lambda s, dt: step.migrate_neurons(s)),
+        ("hubs", lambda s, dt: step.migrate_hubs(s)),
+        ("inputs", lambda s, dt: step.migrate_inputs(s)),
+        ("outputs", lambda s, dt: step.migrate_outputs(s)),
+        ("activity", lambda s, dt: step.update_activity_phase(s, dt)),
+    )
+
+
+def summarize_ms(samples_ns: list[int]) -> dict[str, float]:
+    if not samples_ns:
+        return {"mean": 0.0, "median": 0.0, "p95": 0.0, "count": 0}
+    ordered = sorted(samples_ns)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return {
+        "mean": statistics.fmean(ordered) / 1e6,
+        "median": statistics.median(ordered) / 1e6,
+        "p95": p95 / 1e6,
+        "count": len(ordered),
+    }
+
+
+def bench_init(engine: str, config: SimConfig, seed: int) -> dict[str, float]:
+    start = time.perf_counter_ns()
+    build_state(engine, seed, config)
+    return {"ms": (time.perf_counter_ns() - start) / 1e6}
+
+
+def bench_steps(
+    engine: str, config: SimConfig, seed: int, warmup: int, steps: int
+) -> dict[str, float]:
+    state = build_state(engine, seed, config)
+    for _ in range(warmup):
+        step.step_state(state, SIM_DT)
+    samples = []
+    for _ in range(steps):
+        start = time.perf_counter_ns()
+        step.step_state(state, SIM_DT)
+        samples.append(time.perf_counter_ns() - start)
+    return summarize_ms(samples)
+
+
+def bench_threaded_steps(
+    config: SimConfig, seed: int, warmup: int, steps: int, threads: int
+) -> dict[str, float]:
+    from src.threaded import ThreadedStepper, stop_threads
+
+    state = build_state("object", seed, config)
+    # set directly so a GIL build still measures the threaded path
+    state.threads = ThreadedStepper(threads)
+    try:
+        for _ in range(warmup):
+            step.step_state(state, SIM_DT)
+        samples = []
+        for _ in range(steps):
+            start = time.perf_counter_ns()
+            step.step_state(state, SIM_DT)
+            samples.append(time.perf_counter_ns() - start)
+    finally:
+        stop_threads(state)
+    return summarize_ms(samples)
+
+
+def bench_phases(
+    engine: str, config: SimConfig, seed: int, warmup: int, steps: int
+) -> dict[str, dict]:
+    state = build_state(engine, seed, config)
+    for _ in range(warmup):
+        step.step_state(state, SIM_DT)
+    phases = engine_phases(engine)
+    samples = {name: [] for name, _ in phases}
+    for _ in range(steps):
+        state.step_count += 1
+        state.time += SIM_DT
+        for name, fn in phases:
+            start = time.perf_counter_ns()
+            fn(state, SIM_DT)
+            samples[name].append(time.perf_counter_ns() - start)
+    return {name: summarize_ms(values) for name, values in samples.items()}
+
+
+def bench_connect(config: SimConfig, seed: int, warmup: int) -> dict[str, float]:
+    """ns per attempt_connect_input / attempt_connect_output over every free terminal."""
+    state = build_state("object", seed, config)
+    for _ in range(warmup):
+        step.step_state(state, SIM_DT)
+
+    inputs = [i for n in state.neurons for i in n.inputs if not i.connected_output]
+    outputs = [o for n in state.neurons for o in n.outputs if not o.connected_input]
+
+    start = time.perf_counter_ns()
+    for input in inputs:
+        step.attempt_connect_input(state, input)
+    input_ns = time.perf_counter_ns() - start
+
+    start = time.perf_counter_ns()
+    for output in outputs:
+        step.attempt_connect_output(state, output)
+    output_ns = time.perf_counter_ns() - start
+
+    return {
+        "input_calls": len(inputs),
+        "input_ns_per_call": input_ns / max(1, len(inputs)),
+        "output_calls": len(outputs),
+        "output_ns_per_call": output_ns / max(1, len(outputs)),
+    }
+
+
+def bench_memory(
+    engine: str, config: SimConfig, seed: int, steps: int
+) -> dict[str, float]:
+    """Traced allocations for init and stepping, separate from the timed runs."""
+    tracemalloc.start()
+    try:
+        blocks_before = sys.getallocatedblocks()
+        state = build_state(engine, seed, config)
+        init_current, init_peak = tracemalloc.get_traced_memory()
+        blocks_after_init = sys.getallocatedblocks()
+
+        tracemalloc.reset_peak()
+        for _ in range(steps):
+            step.step_state(state, SIM_DT)
+        step_current, step_peak = tracemalloc.get_traced_memory()
+        blocks_after_steps = sys.getallocatedblocks()
+    finally:
+        tracemalloc.stop()
+
+    num_neurons = (
+        state.arrays.num_neurons if state.arrays is not None else len(state.neurons)
+    )
+    return {
+        "bytes_per_neuron": init_current / max(1, num_neurons),
+        "init_retained_kib": init_current / 1024.0,
+        "init_peak_kib": init_peak / 1024.0,
+        "init_blocks": blocks_after_init - blocks_before,
+        "step_transient_kib": (step_peak - init_current) / 1024.0,
+        "step_retained_kib": (step_current - init_current) / 1024.0,
+        "step_blocks": blocks_after_steps - blocks_after_init,
+    }
+
+
+def bench_draw(
+    engine: str, config: SimConfig, seed: int, warmup: int, frames: int
+) -> dict[str, float]:
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+
+    from src.data import init_target_distribution
+    from src.draw import draw
+    from src.graphics import Graphics
+    from src.settings import DIMS, SQUARE_SIZE_HEIGHT_FRAC
+    from src.snapshot import take_snapshot
+
+    pygame.init()
+    graphics = Graphics()
+    state = build_state(engine, seed, config)
+    square_px = int(DIMS.y * SQUARE_SIZE_HEIGHT_FRAC)
+    init_target_distribution(state, size=(square_px, square_px))
+    for _ in range(warmup):
+        step.step_state(state, SIM_DT)
+
+    samples = []
+    for _ in range(frames):
+        start = time.perf_counter_ns()
+        draw(take_snapshot(state), graphics)
+        samples.append(time.perf_counter_ns() - start)
+    return summarize_ms(samples)
+
+
+def run_case(case: dict, args: argparse.Namespace) -> dict:
+    engine = case["engine"]
+    config = SimConfig(**case["settings"])
+    result = {
+        "key": case["key"],
+        "engine": engine,
+        "settings": case["settings"],
+        "init": bench_init(engine, config, args.seed),
+        "step_ms": bench_steps(engine, config, args.seed, args.warmup, args.steps),
+        "phase_ms": bench_phases(engine, config, args.seed, args.warmup, args.steps),
+        "memory": bench_memory(engine, config, args.seed, min(args.steps, 50)),
+    }
+    if engine == "object" and args.threads:
+        result["threaded_step_ms"] = {
+            str(threads): bench_threaded_steps(
+                config, args.seed, args.warmup, args.steps, threads
+            )
+            for threads in args.threads
+        }
+    if engine == "object":
+        result["connect"] = bench_connect(config, args.seed, args.warmup)
+    if args.frames:
+        result["draw_ms"] = bench_draw(
+            engine, config, args.seed, args.warmup, args.frames
+        )
+    return result
+
+
+def compare_to_baseline(
+    results: list[dict], baseline: dict, max_slowdown: float
+) -> list[str]:
+    """Return a line per case and metric that regressed past max_slowdown."""
+    previous = {case["key"]: case for case in baseline["cases"]}
+    regressions = []
+    for case in results:
+        old = previous.get(case["key"])
+        if old is None:
+            continue
+        for metric in ("step_ms", "draw_ms"):
+            if metric not in case or metric not in old:
+                continue
+            now = case[metric]["median"]
+            before = old[metric]["median"]
+            if before > 0 and now > before * max_slowdown:
+                regressions.append(
+                    f"{case['key']} {metric}: {now:.3f}ms vs baseline {before:.3f}ms "
+                    f"({now / before:.2f}x > {max_slowdown:.2f}x)"
+                )
+    return regressions
+
+
+def report(result: dict) -> None:
+    step_ms = result["step_ms"]
+    memory = result["memory"]
+    phases = ", ".join(
+        f"{name} {values['mean']:.3f}" for name, values in result["phase_ms"].items()
+    )
+    print(
+        f"{result['key']:<36} init {result['init']['ms']:8.2f}ms  "
+        f"step {step_ms['median']:8.3f}ms (p95 {step_ms['p95']:.3f})  "
+        f"peak {memory['init_peak_kib']:9.1f}KiB  "
+        f"{memory['bytes_per_neuron']:7.1f}B/neuron"
+    )
+    print(f"    phases ms: {phases}")
+    if "connect" in result:
+        connect = result["connect"]
+        print(
+            f"    connect ns/call: input {connect['input_ns_per_call']:.0f}, "
+            f"output {connect['output_ns_per_call']:.0f}"
+        )
+    if "threaded_step_ms" in result:
+        threaded = ", ".join(
+            f"{threads} threads {values['median']:.3f}"
+            for threads, values in result["threaded_step_ms"].items()
+        )
+        print(f"    threaded step ms: {threaded}")
+    if "draw_ms" in result:
+        print(f"    draw {result['draw_ms']['median']:.3f}ms")
+
+
+def main() -> None:
+    args = parse_args()
+
+    results = []
+    for case in sweep_cases(args):
+        result = run_case(case, args)
+        report(result)
+        results.append(result)
+
+    output = {
+        "python": platform.python_version(),
+        "free_threaded": free_threaded(),
+        "platform": platform.platform(),
+        "max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "cases": results,
+    }
+    if args.out is not None:
+        args.out.write_text(json.dumps(output, indent=2))
+        print(f"wrote {args.out}")
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = compare_to_baseline(results, baseline, args.max_slowdown)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions past {args.max_slowdown:.2f}x against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
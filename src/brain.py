@@ -1,84 +1,188 @@
-import random
-
 import glm
+import numpy as np
 
-from src.utils import clamp_to_grid
-from src.settings import (
-    NUM_NEURONS,
-    GRID_SIZE,
-    NEURON_CHARGE_RATE,
-    INPUT_MAX_DIST,
-    HUB_MAX_DIST,
-    OUTPUT_MAX_DIST,
-    NUM_INPUTS,
-    NUM_OUTPUTS,
-)
+from src.rng import seed_state
+from src.utils import clamp_coord
 
 
 class Input:
+    __slots__ = (
+        "id",
+        "index",
+        "x",
+        "y",
+        "weight",
+        "parent_neuron",
+        "connected_output",
+        "cell",
+        "cell_free",
+        "cell_prev",
+        "cell_next",
+    )
+
     NEXT_ID = 0
 
     def __init__(self) -> None:
         self.id = Input.NEXT_ID
         Input.NEXT_ID += 1
+        # position in the owning state, used for phase offsets and checkpoints
+        self.index: int = -1
 
-        self.pos: glm.ivec2 = None
+        self.x: int = 0
+        self.y: int = 0
         self.weight: float = 0.0
 
         self.parent_neuron = None
 
         self.connected_output = None
 
+        # intrusive links for GridIndex
+        self.cell: int = -1
+        self.cell_free: bool = True
+        self.cell_prev = None
+        self.cell_next = None
+
+    @property
+    def pos(self) -> glm.ivec2:
+        return glm.ivec2(self.x, self.y)
+
+    @pos.setter
+    def pos(self, value: glm.ivec2) -> None:
+        self.x = int(value.x)
+        self.y = int(value.y)
+
 
 class Output:
+    __slots__ = (
+        "id",
+        "index",
+        "x",
+        "y",
+        "weight",
+        "parent_neuron",
+        "connected_input",
+        "cell",
+        "cell_free",
+        "cell_prev",
+        "cell_next",
+    )
+
     NEXT_ID = 0
 
     def __init__(self) -> None:
         self.id = Output.NEXT_ID
         Output.NEXT_ID += 1
+        # position in the owning state, used for phase offsets and checkpoints
+        self.index: int = -1
 
-        self.pos: glm.ivec2 = None
+        self.x: int = 0
+        self.y: int = 0
         self.weight: float = 0.0
 
         self.parent_neuron = None
 
         self.connected_input = None
 
+        # intrusive links for GridIndex
+        self.cell: int = -1
+        self.cell_free: bool = True
+        self.cell_prev = None
+        self.cell_next = None
+
+    @property
+    def pos(self) -> glm.ivec2:
+        return glm.ivec2(self.x, self.y)
+
+    @pos.setter
+    def pos(self, value: glm.ivec2) -> None:
+        self.x = int(value.x)
+        self.y = int(value.y)
+
 
 class Neuron:
     """
     Neurons have heads and hubs.
     Heads have inputs.
     Hubs have outputs.
+
+    Positions are plain ints, pos / hub_pos build a glm.ivec2 on demand.
     """
 
+    __slots__ = (
+        "id",
+        "index",
+        "satisfied",
+        "hub_satisfied",
+        "connected_input_count",
+        "connected_output_count",
+        "x",
+        "y",
+        "charge",
+        "charge_rate",
+        "fire_threshold",
+        "decay_rate",
+        "signal_pos",
+        "signal_active",
+        "inputs",
+        "hub_x",
+        "hub_y",
+        "outputs",
+    )
+
     NEXT_ID = 0
 
     def __init__(self) -> None:
         self.id = Neuron.NEXT_ID
         Neuron.NEXT_ID += 1
+        # position in state.neurons, used for phase offsets and checkpoints
+        self.index: int = -1
 
         self.satisfied = False
         self.hub_satisfied = False
+        self.connected_input_count = 0
+        self.connected_output_count = 0
 
-        self.pos: glm.ivec2 = None
-        self.charge: float = None
+        self.x: int = 0
+        self.y: int = 0
+        self.charge: float = 0.0
+        self.charge_rate: float = 0.0
         self.fire_threshold: float = None
         self.decay_rate: float = None
+        self.signal_pos: float = 0.0
+        self.signal_active: bool = False
 
         # self.num_inputs: int = 4
         # self.input_max_dist: int = 4
         self.inputs: list[Input] = []
 
         # self.hub_max_dist: int = 16
-        self.hub_pos: glm.ivec2 = None
+        self.hub_x: int = 0
+        self.hub_y: int = 0
 
         # self.num_outputs: int = 4
         # self.output_max_dist: int = 4
         self.outputs: list[Output] = []
 
+    @property
+    def pos(self) -> glm.ivec2:
+        return glm.ivec2(self.x, self.y)
+
+    @pos.setter
+    def pos(self, value: glm.ivec2) -> None:
+        self.x = int(value.x)
+        self.y = int(value.y)
+
+    @property
+    def hub_pos(self) -> glm.ivec2:
+        return glm.ivec2(self.hub_x, self.hub_y)
 
-def init_brain(state):
+    @hub_pos.setter
+    def hub_pos(self, value: glm.ivec2) -> None:
+        self.hub_x = int(value.x)
+        self.hub_y = int(value.y)
+
+
+def init_brain(state, seed: int | np.random.SeedSequence | None = None):
     """
     neuron pos is on grid
     positions are integer pairs, x, y
@@ -87,69 +191,91 @@ def init_brain(state):
     output hub is placed randomly around neuron with max distance constraint
     outputs are placed randomly around output hub with max distance constraint
 
+    every random draw comes from state.rng, rooted at seed, sizes and
+    distances come from state.config
+
     dont worry about setting other settings for now lets just get the positions good
     """
-
-    for _ in range(NUM_NEURONS):
+    seed_state(state, seed)
+    rng = state.rng
+    config = state.config
+    grid_size = config.grid_size
+    num_neurons = config.num_neurons
+    num_inputs = config.num_inputs
+    num_outputs = config.num_outputs
+
+    # draw everything up front, one batch per kind of value
+    neuron_xy = rng.integers(0, grid_size, size=(num_neurons, 2)).tolist()
+    input_offsets = rng.integers(
+        -config.input_max_dist,
+        config.input_max_dist + 1,
+        size=(num_neurons, num_inputs, 2),
+    ).tolist()
+    input_weights = rng.uniform(-1.0, 1.0, size=(num_neurons, num_inputs)).tolist()
+    hub_offsets = rng.integers(
+        -config.hub_max_dist, config.hub_max_dist + 1, size=(num_neurons, 2)
+    ).tolist()
+    output_offsets = rng.integers(
+        -config.output_max_dist,
+        config.output_max_dist + 1,
+        size=(num_neurons, num_outputs, 2),
+    ).tolist()
+    output_weights = rng.uniform(-1.0, 1.0, size=(num_neurons, num_outputs)).tolist()
+    charges = rng.random(num_neurons).tolist()
+
+    input_lookup = state.input_pos_lookup
+    output_lookup = state.output_pos_lookup
+
+    for i in range(num_neurons):
         neuron = Neuron()
-        neuron.pos = clamp_to_grid(
-            glm.ivec2(
-                random.randint(0, GRID_SIZE - 1),
-                random.randint(0, GRID_SIZE - 1),
-            )
-        )
+        neuron.index = i
+        neuron.x = clamp_coord(neuron_xy[i][0], grid_size)
+        neuron.y = clamp_coord(neuron_xy[i][1], grid_size)
 
         # create inputs
-        for _ in range(NUM_INPUTS):
-            input_pos = glm.ivec2(
-                neuron.pos.x + random.randint(-INPUT_MAX_DIST, INPUT_MAX_DIST),
-                neuron.pos.y + random.randint(-INPUT_MAX_DIST, INPUT_MAX_DIST),
-            )
-            input_pos = clamp_to_grid(
-                input_pos,
-            )
+        for k, ((offset_x, offset_y), weight) in enumerate(
+            zip(input_offsets[i], input_weights[i])
+        ):
             new_input = Input()
-            new_input.pos = input_pos
-            new_input.weight = random.uniform(-1.0, 1.0)
+            new_input.index = i * num_inputs + k
+            new_input.x = clamp_coord(neuron.x + offset_x, grid_size)
+            new_input.y = clamp_coord(neuron.y + offset_y, grid_size)
+            new_input.weight = weight
             new_input.parent_neuron = neuron
             neuron.inputs.append(new_input)
             # add to state lookup
-            key = (input_pos.x, input_pos.y)
-            if key not in state.input_pos_lookup:
-                state.input_pos_lookup[key] = []
-            state.input_pos_lookup[key].append(new_input)
-
-        # create output hub
-        output_hub_pos = glm.ivec2(
-            neuron.pos.x + random.randint(-HUB_MAX_DIST, HUB_MAX_DIST),
-            neuron.pos.y + random.randint(-HUB_MAX_DIST, HUB_MAX_DIST),
-        )
-        neuron.hub_pos = clamp_to_grid(
-            output_hub_pos,
-        )
+            input_lookup.insert(
+                new_input, input_lookup.cell_of(new_input.x, new_input.y)
+            )
+            state.active_inputs[new_input] = None
+
+        # create output hub, outputs are placed around the unclamped position
+        output_hub_x = neuron.x + hub_offsets[i][0]
+        output_hub_y = neuron.y + hub_offsets[i][1]
+        neuron.hub_x = clamp_coord(output_hub_x, grid_size)
+        neuron.hub_y = clamp_coord(output_hub_y, grid_size)
 
         # create outputs
-        for _ in range(NUM_OUTPUTS):
-            output_pos = glm.ivec2(
-                output_hub_pos.x + random.randint(-OUTPUT_MAX_DIST, OUTPUT_MAX_DIST),
-                output_hub_pos.y + random.randint(-OUTPUT_MAX_DIST, OUTPUT_MAX_DIST),
-            )
-            output_pos = clamp_to_grid(
-                output_pos,
-            )
+        for k, ((offset_x, offset_y), weight) in enumerate(
+            zip(output_offsets[i], output_weights[i])
+        ):
             new_output = Output()
-            new_output.pos = output_pos
-            new_output.weight = random.uniform(-1.0, 1.0)
+            new_output.index = i * num_outputs + k
+            new_output.x = clamp_coord(output_hub_x + offset_x, grid_size)
+            new_output.y = clamp_coord(output_hub_y + offset_y, grid_size)
+            new_output.weight = weight
             new_output.parent_neuron = neuron
             neuron.outputs.append(new_output)
-            key = (output_pos.x, output_pos.y)
-            if key not in state.output_pos_lookup:
-                state.output_pos_lookup[key] = []
-            state.output_pos_lookup[key].append(new_output)
+            output_lookup.insert(
+                new_output, output_lookup.cell_of(new_output.x, new_output.y)
+            )
+            state.active_outputs[new_output] = None
 
-        neuron.charge = random.random()
-        neuron.charge_rate = NEURON_CHARGE_RATE
+        neuron.charge = charges[i]
+        neuron.charge_rate = config.neuron_charge_rate
         neuron.signal_pos = 0.0
         neuron.signal_active = False
 
         state.neurons.append(neuron)
+        state.unsatisfied_neurons[neuron] = None
+        state.unsatisfied_hubs[neuron] = None
@@ -0,0 +1,365 @@
+"""Save a State as flat typed arrays in an .npz and resume or fork it later."""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+from src.adjacency import rebuild_adjacency
+from src.array_brain import ArrayBrain
+from src.array_step import sync_counters, update_satisfaction
+from src.brain import Input, Neuron, Output
+from src.conduction import enable_conduction_delay
+from src.config import SimConfig
+from src.events import enable_event_activity
+from src.grid_index import GridIndex
+from src.state import State
+from src.step import set_hub_satisfaction, set_neuron_satisfaction
+
+FORMAT_VERSION = 2
+
+# ArrayBrain fields written as-is, the object engine is packed into the same names
+BRAIN_ARRAYS = (
+    "neuron_pos",
+    "hub_pos",
+    "charge",
+    "charge_rate",
+    "signal_pos",
+    "signal_active",
+    "input_pos",
+    "input_weight",
+    "output_pos",
+    "output_weight",
+)
+
+
+def save_checkpoint(state: State, path: str | Path) -> None:
+    """
+    Write the state to path as an uncompressed .npz.
+
+    Connections are stored as (input index, output index) pairs. Derived
+    structure (position lookups, active sets, adjacency, counters) is rebuilt
+    on load, except the orders that decide which terminal or neuron moves or
+    connects next, so a resumed run continues exactly like the original.
+    """
+    write_checkpoint(pack_checkpoint(state), path)
+
+
+def pack_checkpoint(state: State) -> dict[str, np.ndarray]:
+    """Snapshot the state into fresh arrays, safe to write from another thread."""
+    if state.arrays is not None:
+        arrays, meta = pack_array_brain(state.arrays)
+        arrays = {name: array.copy() for name, array in arrays.items()}
+    else:
+        arrays, meta = pack_object_brain(state)
+        if state.conduction is not None:
+            # spikes in flight as (ticks until due, target neuron, transfer)
+            arrays["conduction_pending"] = np.array(
+                state.conduction.pending(), dtype=np.float64
+            ).reshape(-1, 3)
+
+    seed = state.seed_sequence
+    meta.update(
+        version=FORMAT_VERSION,
+        step_count=state.step_count,
+        time=state.time,
+        spike_count=state.spike_count,
+        connection_changes=state.connection_changes,
+        moves=state.moves,
+        config=state.config.to_dict(),
+        periods=state.scheduler.periods,
+        event_activity=state.event_activity is not None,
+        conduction_delay=(
+            state.conduction.delay_per_cell if state.conduction is not None else None
+        ),
+        # entropy can exceed 64 bits, json keeps python ints exact
+        seed_entropy=seed.entropy,
+        seed_spawn_key=list(seed.spawn_key),
+        seed_children=seed.n_children_spawned,
+        rng_state=state.rng.bit_generator.state,
+    )
+    arrays["meta"] = np.array(json.dumps(meta))
+    return arrays
+
+
+def write_checkpoint(arrays: dict[str, np.ndarray], path: str | Path) -> None:
+    with open(path, "wb") as f:
+        np.savez(f, **arrays)
+
+
+def read_checkpoint_meta(path: str | Path) -> dict:
+    """The meta of a checkpoint, without reading its arrays."""
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(str(data["meta"]))
+    check_format(meta, path)
+    return meta
+
+
+def check_format(meta: dict, path: str | Path) -> None:
+    version = meta.get("version")
+    if version == 1:
+        # version 1 ran on the module settings and stored no SimConfig
+        raise ValueError(
+            f"{path} is a version 1 checkpoint, saved before checkpoints carried "
+            f"their SimConfig, and cannot be resumed (expected version {FORMAT_VERSION})"
+        )
+    if version != FORMAT_VERSION:
+        raise ValueError(
+            f"{path} is a version {version} checkpoint, expected version {FORMAT_VERSION}"
+        )
+
+
+def load_checkpoint(path: str | Path) -> State:
+    """Rebuild a State saved by save_checkpoint."""
+    with np.load(path, allow_pickle=False) as data:
+        arrays = {name: data[name] for name in data.files}
+    meta = json.loads(str(arrays.pop("meta")))
+    check_format(meta, path)
+
+    state = State(SimConfig(**meta["config"]))
+    state.step_count = meta["step_count"]
+    state.time = meta["time"]
+    state.spike_count = meta["spike_count"]
+    for name, period in meta["periods"].items():
+        state.scheduler.set_period(name, period)
+
+    state.seed_sequence = np.random.SeedSequence(
+        meta["seed_entropy"],
+        spawn_key=tuple(meta["seed_spawn_key"]),
+        n_children_spawned=meta["seed_children"],
+    )
+    state.rng = np.random.default_rng(state.seed_sequence)
+    state.rng.bit_generator.state = meta["rng_state"]
+
+    if meta["engine"] == "array":
+        unpack_array_brain(state, arrays, meta)
+    else:
+        unpack_object_brain(state, arrays, meta)
+        if meta["event_activity"]:
+            enable_event_activity(state)
+        if meta.get("conduction_delay"):
+            conduction = enable_conduction_delay(state, meta["conduction_delay"])
+            for ticks, target, transfer in arrays["conduction_pending"].tolist():
+                conduction.wheel.insert(int(ticks), (state.neurons[int(target)], transfer))
+    state.connection_changes = meta["connection_changes"]
+    state.moves = meta.get("moves", 0)
+    return state
+
+
+def pack_array_brain(brain: ArrayBrain) -> tuple[dict[str, np.ndarray], dict]:
+    arrays = {name: getattr(brain, name) for name in BRAIN_ARRAYS}
+    outputs = np.flatnonzero(brain.output_conn >= 0)
+    arrays["connections"] = np.stack(
+        [brain.output_conn[outputs], outputs], axis=1
+    ).astype(np.int32)
+    meta = {
+        "engine": "array",
+        "num_neurons": brain.num_neurons,
+        "num_inputs": brain.num_inputs,
+        "num_outputs": brain.num_outputs,
+    }
+    return arrays, meta
+
+
+def unpack_array_brain(state: State, arrays: dict[str, np.ndarray], meta: dict):
+    brain = ArrayBrain(state.config)
+    for name in BRAIN_ARRAYS:
+        getattr(brain, name)[:] = arrays[name]
+
+    inputs, outputs = arrays["connections"].T
+    brain.input_conn[inputs] = outputs
+    brain.output_conn[outputs] = inputs
+    brain.free_inputs = np.flatnonzero(brain.input_conn < 0)
+    brain.free_outputs = np.flatnonzero(brain.output_conn < 0)
+    brain.connected_inputs[:] = np.bincount(
+        brain.input_parent[inputs], minlength=brain.num_neurons
+    )
+    brain.connected_outputs[:] = np.bincount(
+        brain.output_parent[outputs], minlength=brain.num_neurons
+    )
+    update_satisfaction(brain, np.arange(brain.num_neurons))
+    brain.total_connected = len(inputs)
+    brain.connection_changes = meta["connection_changes"]
+    brain.moves = meta.get("moves", 0)
+    brain.adjacency = rebuild_adjacency(brain)
+
+    state.arrays = brain
+    sync_counters(state, brain)
+
+
+def cell_order(lookup: GridIndex, terminals: list) -> np.ndarray:
+    """
+    Terminal indices in an order that, inserted one by one, rebuilds every
+    cell's free and bound lists exactly as they are now.
+    """
+    order = []
+    for terminal in terminals:
+        if terminal.cell_prev is not None or terminal.cell < 0:
+            continue
+        # terminal heads a list, walk it and replay tail first
+        run = []
+        while terminal is not None:
+            run.append(terminal.index)
+            terminal = terminal.cell_next
+        order.extend(reversed(run))
+    return np.array(order, dtype=np.int32)
+
+
+def pack_object_brain(state: State) -> tuple[dict[str, np.ndarray], dict]:
+    neurons = state.neurons
+    num_inputs = len(neurons[0].inputs) if neurons else 0
+    num_outputs = len(neurons[0].outputs) if neurons else 0
+    inputs = [input for neuron in neurons for input in neuron.inputs]
+    outputs = [output for neuron in neurons for output in neuron.outputs]
+    if len(inputs) != len(neurons) * num_inputs or len(outputs) != len(
+        neurons
+    ) * num_outputs:
+        raise ValueError("checkpoints need the same terminal count on every neuron")
+
+    # the event queue leaves charging neurons' charges stale, bring them up
+    # to date in the copy only so saving does not change the run
+    activity = state.event_activity
+    if activity is not None:
+        charges = [
+            n.charge if n.signal_active else activity.charge_at(n, activity.time)
+            for n in neurons
+        ]
+    else:
+        charges = [n.charge for n in neurons]
+
+    arrays = {
+        "neuron_pos": np.array([(n.x, n.y) for n in neurons], dtype=np.int32),
+        "hub_pos": np.array([(n.hub_x, n.hub_y) for n in neurons], dtype=np.int32),
+        "charge": np.array(charges, dtype=np.float64),
+        "charge_rate": np.array([n.charge_rate for n in neurons], dtype=np.float64),
+        "signal_pos": np.array([n.signal_pos for n in neurons], dtype=np.float64),
+        "signal_active": np.array([n.signal_active for n in neurons], dtype=bool),
+        "input_pos": np.array([(i.x, i.y) for i in inputs], dtype=np.int32),
+        "input_weight": np.array([i.weight for i in inputs], dtype=np.float64),
+        "output_pos": np.array([(o.x, o.y) for o in outputs], dtype=np.int32),
+        "output_weight": np.array([o.weight for o in outputs], dtype=np.float64),
+        "connections": np.array(
+            [
+                (input.index, input.connected_output.index)
+                for input in inputs
+                if input.connected_output is not None
+            ],
+            dtype=np.int32,
+        ).reshape(-1, 2),
+        "input_cell_order": cell_order(state.input_pos_lookup, inputs),
+        "output_cell_order": cell_order(state.output_pos_lookup, outputs),
+        "active_inputs": np.array(
+            [input.index for input in state.active_inputs], dtype=np.int32
+        ),
+        "active_outputs": np.array(
+            [output.index for output in state.active_outputs], dtype=np.int32
+        ),
+        "unsatisfied_neurons": np.array(
+            [neuron.index for neuron in state.unsatisfied_neurons], dtype=np.int32
+        ),
+        "unsatisfied_hubs": np.array(
+            [neuron.index for neuron in state.unsatisfied_hubs], dtype=np.int32
+        ),
+    }
+    meta = {
+        "engine": "object",
+        "num_neurons": len(neurons),
+        "num_inputs": num_inputs,
+        "num_outputs": num_outputs,
+    }
+    return arrays, meta
+
+
+def unpack_object_brain(state: State, arrays: dict[str, np.ndarray], meta: dict):
+    num_inputs = meta["num_inputs"]
+    num_outputs = meta["num_outputs"]
+
+    neurons = []
+    for i, ((x, y), (hub_x, hub_y), charge, charge_rate, signal_pos, active) in (
+        enumerate(
+            zip(
+                arrays["neuron_pos"].tolist(),
+                arrays["hub_pos"].tolist(),
+                arrays["charge"].tolist(),
+                arrays["charge_rate"].tolist(),
+                arrays["signal_pos"].tolist(),
+                arrays["signal_active"].tolist(),
+            )
+        )
+    ):
+        neuron = Neuron()
+        neuron.index = i
+        neuron.x = x
+        neuron.y = y
+        neuron.hub_x = hub_x
+        neuron.hub_y = hub_y
+        neuron.charge = charge
+        neuron.charge_rate = charge_rate
+        neuron.signal_pos = signal_pos
+        neuron.signal_active = active
+        neurons.append(neuron)
+    state.neurons = neurons
+
+    inputs = []
+    for i, ((x, y), weight) in enumerate(
+        zip(arrays["input_pos"].tolist(), arrays["input_weight"].tolist())
+    ):
+        input = Input()
+        input.index = i
+        input.x = x
+        input.y = y
+        input.weight = weight
+        input.parent_neuron = neurons[i // num_inputs]
+        input.parent_neuron.inputs.append(input)
+        inputs.append(input)
+
+    outputs = []
+    for i, ((x, y), weight) in enumerate(
+        zip(arrays["output_pos"].tolist(), arrays["output_weight"].tolist())
+    ):
+        output = Output()
+        output.index = i
+        output.x = x
+        output.y = y
+        output.weight = weight
+        output.parent_neuron = neurons[i // num_outputs]
+        output.parent_neuron.outputs.append(output)
+        outputs.append(output)
+
+    # connect before the cell lists are built, then replay the saved orders
+    for input_index, output_index in arrays["connections"].tolist():
+        input = inputs[input_index]
+        output = outputs[output_index]
+        input.connected_output = output
+        output.connected_input = input
+        input.parent_neuron.connected_input_count += 1
+        output.parent_neuron.connected_output_count += 1
+    state.connected_inputs = state.connected_outputs = len(arrays["connections"])
+
+    for lookup, terminals, order, bound_attr in (
+        (state.input_pos_lookup, inputs, arrays["input_cell_order"], "connected_output"),
+        (state.output_pos_lookup, outputs, arrays["output_cell_order"], "connected_input"),
+    ):
+        for index in order.tolist():
+            terminal = terminals[index]
+            free = getattr(terminal, bound_attr) is None
+            lookup.insert(terminal, lookup.cell_of(terminal.x, terminal.y), free)
+
+    for neuron in neurons:
+        set_neuron_satisfaction(state, neuron)
+        set_hub_satisfaction(state, neuron)
+    state.satisfied_neurons = sum(neuron.satisfied for neuron in neurons)
+    state.satisfied_hubs = sum(neuron.hub_satisfied for neuron in neurons)
+
+    state.active_inputs = dict.fromkeys(
+        inputs[i] for i in arrays["active_inputs"].tolist()
+    )
+    state.active_outputs = dict.fromkeys(
+        outputs[i] for i in arrays["active_outputs"].tolist()
+    )
+    state.unsatisfied_neurons = dict.fromkeys(
+        neurons[i] for i in arrays["unsatisfied_neurons"].tolist()
+    )
+    state.unsatisfied_hubs = dict.fromkeys(
+        neurons[i] for i in arrays["unsatisfied_hubs"].tolist()
+    )
@@ -0,0 +1,173 @@
+"""Distance-based conduction delay, spikes scheduled on a hierarchical timing wheel."""
+
+from src.brain import Neuron
+from src.state import State
+from src.step import clamp_charge, maybe_start_signal, signal_transfer_amount
+
+
+def seq_of(entry: tuple) -> int:
+    return entry[1]
+
+
+class TimingWheel:
+    """
+    Items keyed by the tick they are due on. Level l has size slots, each
+    spanning size ** l ticks. An item goes in the lowest level whose span
+    covers its delay, and when the tick reaches a higher level's slot the
+    slot's items are placed again, now closer to due and one level lower or
+    more. Insert and cascade are O(1) per item, a tick that cascades nothing
+    is O(1), and only items in flight take memory. Delays beyond the top
+    level's reach just cascade through it more than once.
+
+    Items due on the same tick come out in insertion order whatever path
+    they took through the levels, so a wheel rebuilt from pending() in
+    order drains exactly like the original.
+    """
+
+    def __init__(self, bits: int = 6, levels: int = 4) -> None:
+        self.bits = bits
+        self.size = 1 << bits
+        self.mask = self.size - 1
+        self.slots = [[[] for _ in range(self.size)] for _ in range(levels)]
+        self.tick = 0
+        self.count = 0
+        self.seq = 0
+
+    def insert(self, delay: int, item) -> None:
+        """Schedule item delay >= 1 ticks from now."""
+        self.place(self.tick + delay, self.seq, item)
+        self.seq += 1
+        self.count += 1
+
+    def place(self, due: int, seq: int, item) -> None:
+        delta = due - self.tick
+        level = 0
+        top = len(self.slots) - 1
+        while level < top and delta >> (self.bits * (level + 1)):
+            level += 1
+        slot = (due >> (self.bits * level)) & self.mask
+        self.slots[level][slot].append((due, seq, item))
+
+    def advance(self) -> list:
+        """Move to the next tick and return the items due on it."""
+        self.tick += 1
+        tick = self.tick
+        for level in range(len(self.slots) - 1, 0, -1):
+            if tick & ((1 << (self.bits * level)) - 1):
+                continue
+            slots = self.slots[level]
+            slot = (tick >> (self.bits * level)) & self.mask
+            cascading = slots[slot]
+            if cascading:
+                slots[slot] = []
+                for due, seq, item in cascading:
+                    self.place(due, seq, item)
+
+        slots = self.slots[0]
+        slot = tick & self.mask
+        due = slots[slot]
+        if not due:
+            return []
+        slots[slot] = []
+        self.count -= len(due)
+        # all due now, so this orders by seq
+        due.sort(key=seq_of)
+        return [item for _, _, item in due]
+
+    def pending(self) -> list[tuple[int, object]]:
+        """(ticks until due, item) of every item in flight, in insertion order."""
+        entries = [entry for level in self.slots for slot in level for entry in slot]
+        entries.sort(key=seq_of)
+        return [(due - self.tick, item) for due, _, item in entries]
+
+
+class ConductionDelay:
+    """
+    Delays every delivery of a spike by the Manhattan length of its path
+    past the hub, hub to output plus input to target neuron, times
+    delay_per_cell seconds. The charge a delivery carries is fixed when the
+    spike reaches the hub, a connection broken while it is in flight does
+    not cancel it. Ticks are simulation steps, a delay rounds to whole steps
+    and one that rounds to zero is delivered at once.
+    """
+
+    def __init__(self, delay_per_cell: float) -> None:
+        self.delay_per_cell = delay_per_cell
+        self.wheel = TimingWheel()
+        self.dt = 0.0
+
+    def deliver(self, dt: float, spikes: list[int] | None = None) -> int:
+        """Advance one step of dt and apply what arrives, returns spikes fired."""
+        self.dt = dt
+        fired = 0
+        for target, transfer in self.wheel.advance():
+            fired += self.inject(target, transfer, spikes)
+        return fired
+
+    def dispatch(self, neuron: Neuron, spikes: list[int] | None = None) -> int:
+        """
+        Schedule the neuron's signal to each target, like dispatch_signal
+        but arriving later. Returns the spikes fired by immediate deliveries.
+        """
+        fired = 0
+        ticks_per_cell = self.delay_per_cell / self.dt if self.dt > 0 else 0.0
+        for output in neuron.outputs:
+            connected_input = output.connected_input
+            if not connected_input:
+                continue
+            target_neuron = connected_input.parent_neuron
+            if not target_neuron:
+                continue
+
+            transfer = signal_transfer_amount(connected_input, output)
+            if transfer <= 0.0:
+                continue
+
+            distance = (
+                abs(output.x - neuron.hub_x)
+                + abs(output.y - neuron.hub_y)
+                + abs(target_neuron.x - connected_input.x)
+                + abs(target_neuron.y - connected_input.y)
+            )
+            ticks = round(distance * ticks_per_cell)
+            if ticks < 1:
+                fired += self.inject(target_neuron, transfer, spikes)
+            else:
+                self.wheel.insert(ticks, (target_neuron, transfer))
+        return fired
+
+    def inject(self, target: Neuron, transfer: float, spikes: list[int] | None) -> int:
+        target.charge = clamp_charge(target.charge + transfer)
+        if maybe_start_signal(target):
+            if spikes is not None:
+                spikes.append(target.index)
+            return 1
+        return 0
+
+    def pending(self) -> list[tuple[int, int, float]]:
+        """(ticks until due, target index, transfer) of every spike in flight."""
+        return [
+            (ticks, target.index, transfer)
+            for ticks, (target, transfer) in self.wheel.pending()
+        ]
+
+
+def enable_conduction_delay(state: State, delay_per_cell: float) -> ConductionDelay:
+    """Deliver spikes after a delay proportional to their path length."""
+    if state.arrays is not None or state.event_activity is not None:
+        raise ValueError("conduction delay runs on the fixed-dt object engine only")
+    if delay_per_cell <= 0:
+        raise ValueError(f"delay_per_cell must be > 0, got {delay_per_cell}")
+    state.conduction = ConductionDelay(delay_per_cell)
+    return state.conduction
+
+
+def disable_conduction_delay(state: State) -> None:
+    """Deliver spikes instantly again, anything in flight arrives now."""
+    conduction = state.conduction
+    if conduction is None:
+        return
+    for _, target, transfer in conduction.pending():
+        neuron = state.neurons[target]
+        neuron.charge = clamp_charge(neuron.charge + transfer)
+    state.conduction = None
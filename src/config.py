@@ -0,0 +1,76 @@
+from src.settings import (
+    GRID_SIZE,
+    HUB_MAX_DIST,
+    HUB_SATISFACTION_RATIO,
+    INPUT_MAX_DIST,
+    NEURON_CHARGE_RATE,
+    NEURON_SATISFACTION_RATIO,
+    NUM_INPUTS,
+    NUM_NEURONS,
+    NUM_OUTPUTS,
+    OUTPUT_MAX_DIST,
+    SIGNAL_SPEED,
+)
+
+
+class SimConfig:
+    """
+    Sizes, reaches and rates of one simulation. Every State carries its own,
+    defaulting to src.settings, so brains of different sizes can run side by
+    side in one process.
+    """
+
+    __slots__ = (
+        "grid_size",
+        "num_neurons",
+        "num_inputs",
+        "num_outputs",
+        "input_max_dist",
+        "hub_max_dist",
+        "output_max_dist",
+        "neuron_charge_rate",
+        "signal_speed",
+        "neuron_satisfaction_ratio",
+        "hub_satisfaction_ratio",
+    )
+
+    def __init__(
+        self,
+        grid_size: int = GRID_SIZE,
+        num_neurons: int = NUM_NEURONS,
+        num_inputs: int = NUM_INPUTS,
+        num_outputs: int = NUM_OUTPUTS,
+        input_max_dist: int = INPUT_MAX_DIST,
+        hub_max_dist: int = HUB_MAX_DIST,
+        output_max_dist: int = OUTPUT_MAX_DIST,
+        neuron_charge_rate: float = NEURON_CHARGE_RATE,
+        signal_speed: float = SIGNAL_SPEED,
+        neuron_satisfaction_ratio: float = NEURON_SATISFACTION_RATIO,
+        hub_satisfaction_ratio: float = HUB_SATISFACTION_RATIO,
+    ) -> None:
+        if grid_size < 1:
+            raise ValueError(f"grid_size must be >= 1, got {grid_size}")
+        if signal_speed <= 0:
+            raise ValueError(f"signal_speed must be > 0, got {signal_speed}")
+        self.grid_size = int(grid_size)
+        self.num_neurons = int(num_neurons)
+        self.num_inputs = int(num_inputs)
+        self.num_outputs = int(num_outputs)
+        self.input_max_dist = int(input_max_dist)
+        self.hub_max_dist = int(hub_max_dist)
+        self.output_max_dist = int(output_max_dist)
+        self.neuron_charge_rate = float(neuron_charge_rate)
+        self.signal_speed = float(signal_speed)
+        self.neuron_satisfaction_ratio = float(neuron_satisfaction_ratio)
+        self.hub_satisfaction_ratio = float(hub_satisfaction_ratio)
+
+    def replace(self, **changes) -> "SimConfig":
+        """A copy with some fields changed."""
+        return SimConfig(**{**self.to_dict(), **changes})
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={value!r}" for name, value in self.to_dict().items())
+        return f"SimConfig({fields})"
@@ -0,0 +1,31 @@
+class ConvergenceDetector:
+    """
+    Reports convergence once no connection has been made or broken for
+    window consecutive steps while every neuron and hub was satisfied.
+    Unsatisfied neurons and hubs keep walking, so a quiet stretch with any
+    of them left is not settled. Only reads the State's running counters,
+    so checking every step is O(1).
+    """
+
+    def __init__(self, window: int) -> None:
+        self.window = window
+        self.last_changes = -1
+        self.stable_steps = 0
+        self.converged_at: int | None = None
+
+    def update(self, state) -> bool:
+        """Call once per step, returns True once the network has settled."""
+        num_neurons = state.config.num_neurons
+        settled = (
+            state.satisfied_neurons == num_neurons and state.satisfied_hubs == num_neurons
+        )
+        if state.connection_changes != self.last_changes or not settled:
+            self.last_changes = state.connection_changes
+            self.stable_steps = 0
+            self.converged_at = None
+            return False
+        self.stable_steps += 1
+        if self.stable_steps >= self.window and self.converged_at is None:
+            # the last change happened window steps ago
+            self.converged_at = state.step_count - self.stable_steps
+        return self.converged_at is not None
@@ -1,12 +1,23 @@
+import os
+from typing import TYPE_CHECKING
+
 import glm
 import numpy as np
-import pygame
 
-from src.graphics import Graphics
+from src.rng import spawn_rngs
+from src.settings import DISTRIBUTION_CACHE_DIR
 from src.state import State
 
+if TYPE_CHECKING:
+    import pygame
+
+# bump when build_density changes so stale cache files are not picked up
+DENSITY_VERSION = 1
+
+
+def distribution_surface_from_density(density: np.ndarray) -> "pygame.Surface":
+    import pygame
 
-def distribution_surface_from_density(density: np.ndarray) -> pygame.Surface:
     normalized = (density * 255).astype(np.uint8)
     grayscale = normalized.T  # pygame expects width x height
     rgb = np.repeat(grayscale[:, :, None], 3, axis=2)
@@ -14,36 +25,134 @@ def distribution_surface_from_density(density: np.ndarray) -> pygame.Surface:
     return surface.convert()
 
 
+def build_density(width: int, height: int, seed: int, nodes: int) -> np.ndarray:
+    """
+    Deterministic 2-D Gaussian mixture on [0, 1]^2, (height, width) float32
+    normalized to a peak of 1. Each isotropic gaussian is separable, so the
+    whole mixture is a single (height, nodes) @ (nodes, width) product.
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.uniform(0.2, 0.8, size=(nodes, 2)).astype(np.float32)
+    stds = rng.uniform(0.05, 0.15, size=nodes).astype(np.float32)
+
+    xs = np.linspace(0.0, 1.0, width, dtype=np.float32)
+    ys = np.linspace(0.0, 1.0, height, dtype=np.float32)
+    scale = (-0.5 / stds**2)[:, None]
+    gaussian_x = np.exp((xs[None, :] - centers[:, 0:1]) ** 2 * scale)
+    gaussian_y = np.exp((ys[None, :] - centers[:, 1:2]) ** 2 * scale)
+    density = gaussian_y.T @ gaussian_x
+
+    peak = density.max(initial=0.0)
+    if peak > 0:
+        density /= peak
+    return density
+
+
+def load_density(width: int, height: int, seed: int, nodes: int) -> np.ndarray:
+    """build_density through the on-disk cache in DISTRIBUTION_CACHE_DIR."""
+    path = DISTRIBUTION_CACHE_DIR / (
+        f"density_v{DENSITY_VERSION}_{width}x{height}_seed{seed}_nodes{nodes}.npy"
+    )
+    try:
+        density = np.load(path)
+        if density.shape == (height, width) and density.dtype == np.float32:
+            return density
+    except (OSError, ValueError):
+        pass
+
+    density = build_density(width, height, seed, nodes)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # write then rename so a concurrent launch never reads half a file
+        temp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(temp_path, "wb") as file:
+            np.save(file, density)
+        os.replace(temp_path, path)
+    except OSError:
+        pass  # an unwritable cache only costs the rebuild next launch
+    return density
+
+
+def alias_table(weights: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Walker alias table over the flattened weights: cell i keeps itself with
+    probability prob[i] and otherwise hands over to alias[i].
+
+    Vose's pairing, batched: each round every under-full cell is settled at
+    once against the over-full ones by walking the cumulative deficits along
+    the cumulative excesses, so a round is a few whole-array operations and
+    the round count stays in the tens for smooth densities.
+    """
+    prob = weights.astype(np.float64).ravel()
+    total = prob.sum()
+    if total <= 0:
+        raise ValueError("cannot sample from an all-zero density")
+    prob *= prob.size / total
+    alias = np.arange(prob.size)
+
+    small = np.flatnonzero(prob < 1.0)
+    large = np.flatnonzero(prob >= 1.0)
+    while len(small) and len(large):
+        deficits = 1.0 - prob[small]
+        owners = np.searchsorted(np.cumsum(prob[large] - 1.0), np.cumsum(deficits))
+        owners = np.minimum(owners, len(large) - 1)
+        alias[small] = large[owners]
+        prob[large] -= np.bincount(owners, weights=deficits, minlength=len(large))
+        still_large = prob[large] >= 1.0
+        small = large[~still_large]
+        large = large[still_large]
+    # whatever is left over is 1 up to rounding
+    prob[small] = 1.0
+    prob[large] = 1.0
+    return prob, alias
+
+
+class DistributionSampler:
+    """
+    Draws points from a density with an alias table, O(1) per point: one
+    uniform picks a pixel and, from its fractional part, whether to keep it
+    or take its alias, then a second jitters the point inside the pixel.
+    Points come back as (count, 2) float32 x, y in [0, 1], pixels with zero
+    density are never drawn.
+    """
+
+    def __init__(self, density: np.ndarray, rng: np.random.Generator) -> None:
+        self.height, self.width = density.shape
+        self.prob, self.alias = alias_table(density)
+        self.rng = rng
+
+    def sample(self, count: int) -> np.ndarray:
+        rng = self.rng
+        picks = rng.random(count) * self.prob.size
+        cells = picks.astype(np.int64)
+        cells = np.where(picks - cells < self.prob[cells], cells, self.alias[cells])
+        rows, cols = np.divmod(cells, self.width)
+        points = rng.random((count, 2), dtype=np.float32)
+        points[:, 0] += cols
+        points[:, 1] += rows
+        points /= np.array([self.width, self.height], dtype=np.float32)
+        return points
+
+
 def init_target_distribution(
     state: State,
-    graphics: Graphics,
     size: glm.ivec2,
     seed: int = 7,
     nodes: int = 2,
 ) -> None:
     """
     Initialize a deterministic 2-D Gaussian mixture distribution and pre-render
-    it to a surface for fast blitting.
-    """
+    it to state.target_distribution_surface for fast blitting. Needs the
+    display to be set up, the surface is converted to its format.
 
+    state.target_sampler draws points from it with its own child generator,
+    so sampling never shifts the stream the simulation steps with. Call it
+    after init_brain / init_array_brain, which reseed the state, so that
+    child is spawned from the run's root seed.
+    """
     width, height = size
-    rng = np.random.default_rng(seed)
-    centers = rng.uniform(0.2, 0.8, size=(nodes, 2))
-    stds = rng.uniform(0.05, 0.15, size=nodes)
-
-    xs = np.linspace(0.0, 1.0, width)
-    ys = np.linspace(0.0, 1.0, height)
-    grid_x, grid_y = np.meshgrid(xs, ys)
-
-    density = np.zeros((height, width), dtype=np.float32)
-    for center, std in zip(centers, stds, strict=False):
-        dx = grid_x - center[0]
-        dy = grid_y - center[1]
-        gaussian = np.exp(-(dx**2 + dy**2) / (2.0 * std**2))
-        density += gaussian
-
-    if np.max(density) > 0:
-        density /= np.max(density)
+    density = load_density(int(width), int(height), seed, nodes)
 
     state.target_distribution = density
-    graphics.target_distribution_surface = distribution_surface_from_density(density)
+    state.target_sampler = DistributionSampler(density, spawn_rngs(state, 1)[0])
+    state.target_distribution_surface = distribution_surface_from_density(density)
@@ -1,7 +1,10 @@
 import pygame
 import glm
+import numpy as np
 
-from src.state import State
+from src.metrics import METRICS
+from src.raster import rasterize
+from src.snapshot import Snapshot
 from src.utils import mouse_pos
 from src.settings import (
     WINDOW_DIMS,
@@ -10,70 +13,132 @@ from src.settings import (
     TOP_PADDING_FRAC_Y,
     SQUARE_SIZE_HEIGHT_FRAC,
     VERTICAL_GAP_FRAC_Y,
-    GRID_SIZE,
 )
 
 
 def draw(
-    state,
+    snapshot: Snapshot,
     graphics,
     fps: float = 0.0,
     fps_target: float = 0.0,
     sim_rate: float = 0.0,
     sim_target: float = 0.0,
+    sim_label: str = "SIM",
 ):
-    graphics.render_surface.fill((0, 0, 0))
-
-    mpos = mouse_pos()
-
-    left_pad = DIMS.x * LEFT_PADDING_FRAC_X
-    top_pad = DIMS.y * TOP_PADDING_FRAC_Y
-    square_size = DIMS.y * SQUARE_SIZE_HEIGHT_FRAC
+    layers = graphics.layers
+    surface = graphics.render_surface
+    # grid, target distribution and stats panel come pre-rendered
+    background = layers.background(
+        snapshot.target_distribution_surface, snapshot.grid_size
+    )
+    surface.blit(background, (0, 0))
 
-    grid_pos = glm.vec2(left_pad, top_pad)
-    grid_size = glm.vec2(square_size, square_size)
-    draw_grid_and_nn(state, graphics, grid_pos, grid_size)
+    draw_neurons(snapshot, graphics, layers.grid_pos, layers.grid_size)
 
     # just draw a circle on the mouse
-    pygame.draw.circle(graphics.render_surface, (0, 255, 0), mpos, 2)
-    draw_grid_coords_under_mouse(state, graphics, grid_pos, grid_size, mpos)
-
-    dist_top = grid_pos.y + grid_size.y + DIMS.y * VERTICAL_GAP_FRAC_Y
-    dist_pos = glm.vec2(left_pad, dist_top)
-    dist_size = glm.vec2(square_size, square_size)
-    draw_target_distribution(state, graphics, dist_pos, dist_size)
-
-    draw_perf_stats(graphics, fps, fps_target, sim_rate, sim_target)
+    mpos = mouse_pos()
+    pygame.draw.circle(surface, (0, 255, 0), mpos, 2)
+    draw_grid_coords_under_mouse(
+        graphics, layers.grid_pos, layers.grid_size, snapshot.grid_size, mpos
+    )
 
-    # lets put it on the right 40% of the screen, from top to bottom
-    stats_pos = glm.vec2(DIMS.x * 0.6, 0)
-    stats_size = glm.vec2(DIMS.x * 0.4, DIMS.y)
-    draw_stats(state, graphics, stats_pos, stats_size)
+    draw_perf_stats(graphics, fps, fps_target, sim_rate, sim_target, sim_label)
+    draw_phase_stats(graphics, snapshot.phase_percentiles, layers.stats_pos)
+    draw_sparklines(graphics, snapshot.metrics, layers.stats_pos, layers.stats_size)
 
-    stretched_surface = pygame.transform.scale(graphics.render_surface, WINDOW_DIMS)
-    graphics.window.blit(stretched_surface, (0, 0))
+    # scale into the same window-sized surface every frame instead of a new one
+    pygame.transform.scale(surface, WINDOW_DIMS, graphics.scaled_surface)
+    graphics.window.blit(graphics.scaled_surface, (0, 0))
     pygame.display.update()
 
 
-# should take in pos, and size
-def draw_grid_and_nn(state, graphics, pos: glm.vec2, size: glm.vec2):
-    draw_grid(state, graphics, pos, size)
-    draw_neurons(state, graphics, pos, size)
-
+class LayerCache:
+    """
+    Pre-rendered static parts of the frame. The background holds the grid,
+    the target distribution (scaled once) and the stats panel box, and is
+    rebuilt only when the layout, the grid size or the distribution surface
+    changes.
+    Rendered text is cached by string, so unchanged labels are not
+    re-rendered every frame.
+    """
 
-def draw_stats(state, graphics, pos, size):
+    MAX_TEXT_ENTRIES = 256
+
+    def __init__(self, size: tuple[int, int]) -> None:
+        self.size = size
+        self.layout_key = None
+        self.set_layout()
+        self.background_surface = pygame.Surface(size)
+        self.background_key = None
+        self.texts: dict[tuple[int, str], pygame.Surface] = {}
+
+    def set_layout(self) -> None:
+        """Recompute the layout from the settings, invalidating the background."""
+        left_pad = DIMS.x * LEFT_PADDING_FRAC_X
+        top_pad = DIMS.y * TOP_PADDING_FRAC_Y
+        square_size = DIMS.y * SQUARE_SIZE_HEIGHT_FRAC
+
+        self.grid_pos = glm.vec2(left_pad, top_pad)
+        self.grid_size = glm.vec2(square_size, square_size)
+
+        dist_top = self.grid_pos.y + self.grid_size.y + DIMS.y * VERTICAL_GAP_FRAC_Y
+        self.dist_pos = glm.vec2(left_pad, dist_top)
+        self.dist_size = glm.vec2(square_size, square_size)
+
+        # lets put it on the right 40% of the screen, from top to bottom
+        self.stats_pos = glm.vec2(DIMS.x * 0.6, 0)
+        self.stats_size = glm.vec2(DIMS.x * 0.4, DIMS.y)
+
+        self.layout_key = (
+            tuple(DIMS),
+            tuple(self.grid_pos),
+            tuple(self.grid_size),
+            tuple(self.dist_pos),
+            tuple(self.stats_pos),
+        )
+        self.background_key = None
+
+    def background(
+        self, distribution: "pygame.Surface | None", cells: int
+    ) -> pygame.Surface:
+        key = (self.layout_key, id(distribution), cells)
+        if key != self.background_key:
+            surface = self.background_surface
+            surface.fill((0, 0, 0))
+            draw_grid(surface, self.grid_pos, self.grid_size, cells)
+            draw_target_distribution(surface, distribution, self.dist_pos, self.dist_size)
+            draw_stats(surface, self.stats_pos, self.stats_size)
+            self.background_key = key
+        return self.background_surface
+
+    def text(self, font: pygame.font.Font, string: str) -> pygame.Surface:
+        key = (id(font), string)
+        rendered = self.texts.get(key)
+        if rendered is None:
+            if len(self.texts) >= self.MAX_TEXT_ENTRIES:
+                self.texts.clear()
+            rendered = font.render(string, True, (255, 255, 255))
+            self.texts[key] = rendered
+        return rendered
+
+
+def draw_stats(surface: pygame.Surface, pos, size):
     # for now just a box
     BOX_COLOR = (30, 30, 30)
     pygame.draw.rect(
-        graphics.render_surface,
+        surface,
         BOX_COLOR,
         (int(round(pos.x)), int(round(pos.y)), int(round(size.x)), int(round(size.y))),
     )
 
 
-def draw_target_distribution(state, graphics, pos: glm.vec2, size: glm.vec2):
-    surface = state.target_distribution_surface
-    if surface is None:
+def draw_target_distribution(
+    surface: pygame.Surface,
+    distribution: "pygame.Surface | None",
+    pos: glm.vec2,
+    size: glm.vec2,
+):
+    if distribution is None:
         return
 
     dest_rect = pygame.Rect(
@@ -83,27 +148,27 @@ def draw_target_distribution(state, graphics, pos: glm.vec2, size: glm.vec2):
         int(round(size.y)),
     )
 
-    blit_surface = surface
-    if surface.get_size() != (dest_rect.width, dest_rect.height):
-        blit_surface = pygame.transform.smoothscale(surface, dest_rect.size)
+    blit_surface = distribution
+    if distribution.get_size() != (dest_rect.width, dest_rect.height):
+        blit_surface = pygame.transform.smoothscale(distribution, dest_rect.size)
 
-    graphics.render_surface.blit(blit_surface, dest_rect.topleft)
-    pygame.draw.rect(graphics.render_surface, (80, 80, 80), dest_rect, 1)
+    surface.blit(blit_surface, dest_rect.topleft)
+    pygame.draw.rect(surface, (80, 80, 80), dest_rect, 1)
 
 
 def draw_grid_coords_under_mouse(
-    state,
     graphics,
     grid_pos: glm.vec2,
     grid_size: glm.vec2,
+    cells: int,
     pos: glm.vec2,
 ):
     mouse = mouse_pos()
     col = "-"
     row = "-"
     cell = glm.vec2(
-        grid_size.x / GRID_SIZE if GRID_SIZE else 0,
-        grid_size.y / GRID_SIZE if GRID_SIZE else 0,
+        grid_size.x / cells if cells else 0,
+        grid_size.y / cells if cells else 0,
     )
 
     within_x = grid_pos.x <= mouse.x < grid_pos.x + grid_size.x
@@ -112,51 +177,106 @@ def draw_grid_coords_under_mouse(
         col = int((mouse.x - grid_pos.x) / cell.x)
         row = int((mouse.y - grid_pos.y) / cell.y)
 
-    # draw the text in the top right corner
-    font = pygame.font.Font(None, 16)
-    text = font.render(f"({col}, {row})", True, (255, 255, 255))
-    # put it at pos
+    # draw the text at pos
+    text = graphics.layers.text(graphics.small_font, f"({col}, {row})")
     graphics.render_surface.blit(text, (pos.x, pos.y))
 
 
-def draw_perf_stats(graphics, fps, fps_target, sim_rate, sim_target):
+def draw_perf_stats(graphics, fps, fps_target, sim_rate, sim_target, sim_label="SIM"):
+    """achieved / requested rates, a target of 0 means as fast as possible"""
+
     def fmt_line(label, current, target):
-        percent = 0.0
-        if target:
-            percent = (current / target) * 100.0
+        if not target:
+            return f"{label}: {current:6.1f}"
+        percent = (current / target) * 100.0
         return f"{label}: {current:6.1f} / {target:6.1f} ({percent:5.1f}%)"
 
     lines = [
-        fmt_line("SIM", sim_rate, sim_target),
+        fmt_line(sim_label, sim_rate, sim_target),
         fmt_line("FPS", fps, fps_target),
     ]
 
     y = 2
     for line in lines:
-        text_surface = graphics.font.render(line, True, (255, 255, 255))
+        text_surface = graphics.layers.text(graphics.font, line)
         graphics.render_surface.blit(text_surface, (2, y))
         y += text_surface.get_height() + 2
 
 
-def draw_grid(state, graphics, pos: glm.vec2, size: glm.vec2):
+def draw_phase_stats(graphics, percentiles: dict | None, pos: glm.vec2):
+    """p50 / p99 ms of each step phase as a table in the stats panel"""
+    if not percentiles:
+        return
+    columns = (8, 80, 130)  # x of phase, p50 and p99 within the panel
+    rows = [("phase", "p50 ms", "p99 ms")]
+    for name, (p50, p99) in percentiles.items():
+        rows.append((name, f"{p50:.2f}", f"{p99:.2f}"))
+
+    y = pos.y + 8
+    for row in rows:
+        height = 0
+        for x, cell in zip(columns, row):
+            text_surface = graphics.layers.text(graphics.small_font, cell)
+            graphics.render_surface.blit(text_surface, (pos.x + x, y))
+            height = max(height, text_surface.get_height())
+        y += height + 2
+
+
+SPARKLINE_COLOR = (100, 200, 255)
+SPARKLINE_FRAME_COLOR = (60, 60, 60)
+
+
+def draw_sparklines(graphics, metrics: np.ndarray | None, pos: glm.vec2, size: glm.vec2):
+    """
+    One sparkline per metric down the lower half of the stats panel, each
+    scaled to its own min..max over the plotted steps, with the latest value
+    next to its name
+    """
+    if metrics is None or len(metrics) < 2:
+        return
+    surface = graphics.render_surface
+    left = pos.x + 8
+    width = size.x - 16
+    top = pos.y + size.y * 0.45
+    row_height = (size.y * 0.55 - 8) / len(METRICS)
+    xs = left + np.linspace(0.0, width, len(metrics))
+
+    for row, name in enumerate(METRICS):
+        values = metrics[:, row]
+        y = top + row * row_height
+        label = graphics.layers.text(graphics.small_font, f"{name} {values[-1]:.0f}")
+        surface.blit(label, (left, y))
+
+        plot_top = y + label.get_height() + 1
+        plot_height = row_height - label.get_height() - 4
+        frame = (int(left), int(plot_top), int(width), int(plot_height))
+        pygame.draw.rect(surface, SPARKLINE_FRAME_COLOR, frame, 1)
+        low = values.min()
+        span = values.max() - low
+        scaled = (values - low) / span if span > 0 else np.full(len(values), 0.5)
+        ys = plot_top + (1.0 - scaled) * (plot_height - 1)
+        pygame.draw.lines(surface, SPARKLINE_COLOR, False, np.stack([xs, ys], axis=1))
+
+
+def draw_grid(surface: pygame.Surface, pos: glm.vec2, size: glm.vec2, cells: int):
     GRID_COLOR = (50, 50, 50)
     GRID_WIDTH = 1
-    cell_x = size.x / GRID_SIZE
-    cell_y = size.y / GRID_SIZE
+    cell_x = size.x / cells
+    cell_y = size.y / cells
 
-    for i in range(GRID_SIZE + 1):
+    for i in range(cells + 1):
         x = int(round(pos.x + i * cell_x))
         pygame.draw.line(
-            graphics.render_surface,
+            surface,
             GRID_COLOR,
             (x, int(round(pos.y))),
             (x, int(round(pos.y + size.y))),
             GRID_WIDTH,
         )
-    for j in range(GRID_SIZE + 1):
+    for j in range(cells + 1):
         y = int(round(pos.y + j * cell_y))
         pygame.draw.line(
-            graphics.render_surface,
+            surface,
             GRID_COLOR,
             (int(round(pos.x)), y),
             (int(round(pos.x + size.x)), y),
@@ -164,88 +284,76 @@ def draw_grid(state, graphics, pos: glm.vec2, size: glm.vec2):
         )
 
 
-def draw_neurons(state: State, graphics, pos: glm.vec2, size: glm.vec2):
+NEURON_COLOR = (0, 0, 255)
+NEURON_RADIUS = 2
+
+INPUT_COLOR = (0, 0, 200)
+OUTPUT_HUB_COLOR = (0, 200, 0)
+OUTPUT_COLOR = (200, 0, 0)
+SIGNAL_COLOR = (100, 255, 100)
+
+
+def draw_neurons(snapshot: Snapshot, graphics, pos: glm.vec2, size: glm.vec2):
     """
     draw neuron position as a blue circle
     draw neuron inputs as blue lines out from neuron position
     draw output hub as line from neuron position to output hub position
     draw outputs as lines from output hub position to output positions
-    """
-
-    NEURON_COLOR = (0, 0, 255)
-    NEURON_RADIUS = 2
-
-    INPUT_COLOR = (0, 0, 200)
-    OUTPUT_HUB_COLOR = (0, 200, 0)
-    OUTPUT_COLOR = (200, 0, 0)
-    SIGNAL_COLOR = (100, 255, 100)
-
-    cell = glm.vec2(size.x / GRID_SIZE, size.y / GRID_SIZE)
-
-    def to_surface_center(grid_point):
-        return glm.vec2(
-            pos.x + (grid_point.x + 0.5) * cell.x,
-            pos.y + (grid_point.y + 0.5) * cell.y,
-        )
-
-    def as_int_tuple(vec: glm.vec2) -> tuple[int, int]:
-        return int(round(vec.x)), int(round(vec.y))
 
-    for neuron in state.neurons:
-        neuron_pos = to_surface_center(neuron.pos)
-
-        # draw inputs
-        for input in neuron.inputs:
-            input_vec = to_surface_center(input.pos)
-            pygame.draw.line(
-                graphics.render_surface,
+    every endpoint is computed in one numpy pass and each color is
+    rasterized in bulk into the surface pixels, same pixels as pygame.draw,
+    stacked neuron by neuron like drawing each neuron in turn
+    """
+    cell = glm.vec2(size.x / snapshot.grid_size, size.y / snapshot.grid_size)
+
+    def to_screen(grid_points):
+        screen_x = pos.x + (grid_points[:, 0] + 0.5) * cell.x
+        screen_y = pos.y + (grid_points[:, 1] + 0.5) * cell.y
+        return np.stack([screen_x, screen_y], axis=-1)
+
+    def rounded(points):
+        return np.rint(points).astype(np.int64)
+
+    neuron_float = to_screen(snapshot.neuron_pos)
+    hub_float = to_screen(snapshot.hub_pos)
+    neuron_screen = rounded(neuron_float)
+    hub_screen = rounded(hub_float)
+    input_screen = rounded(to_screen(snapshot.input_pos))
+    output_screen = rounded(to_screen(snapshot.output_pos))
+
+    signaling = np.flatnonzero(snapshot.signal_active & (snapshot.signal_pos > 0.0))
+    progress = np.minimum(1.0, snapshot.signal_pos[signaling])[:, None]
+    start = neuron_float[signaling]
+    signal_end = rounded(start + (hub_float[signaling] - start) * progress)
+
+    neurons = np.arange(len(neuron_screen))
+    rasterize(
+        graphics.render_surface,
+        lines=[
+            (
+                np.repeat(neuron_screen, snapshot.num_inputs, axis=0),
+                input_screen,
+                1,
                 INPUT_COLOR,
-                as_int_tuple(neuron_pos),
-                as_int_tuple(input_vec),
+            ),
+            (neuron_screen, hub_screen, 1, OUTPUT_HUB_COLOR),
+            (neuron_screen[signaling], signal_end, 2, SIGNAL_COLOR),
+            (
+                np.repeat(hub_screen, snapshot.num_outputs, axis=0),
+                output_screen,
                 1,
-            )
-
-        # draw output hub
-        output_hub_vec = to_surface_center(neuron.hub_pos)
-        neuron_screen = as_int_tuple(neuron_pos)
-        hub_screen = as_int_tuple(output_hub_vec)
-        pygame.draw.line(
-            graphics.render_surface,
-            OUTPUT_HUB_COLOR,
-            neuron_screen,
-            hub_screen,
-            1,
-        )
-
-        if neuron.signal_active and neuron.signal_pos > 0.0:
-            progress = min(1.0, neuron.signal_pos)
-            signal_point = neuron_pos + (output_hub_vec - neuron_pos) * progress
-            pygame.draw.line(
-                graphics.render_surface,
-                SIGNAL_COLOR,
-                neuron_screen,
-                as_int_tuple(signal_point),
-                2,
-            )
-
-        # draw outputs
-        for output in neuron.outputs:
-            output_vec = to_surface_center(output.pos)
-            pygame.draw.line(
-                graphics.render_surface,
                 OUTPUT_COLOR,
-                as_int_tuple(output_hub_vec),
-                as_int_tuple(output_vec),
-                1,
-            )
-
-        # draw neuron position
-        pygame.draw.circle(
-            graphics.render_surface,
-            NEURON_COLOR,
-            as_int_tuple(neuron_pos),
-            NEURON_RADIUS,
-        )
+            ),
+        ],
+        dots=[(neuron_screen, NEURON_RADIUS, NEURON_COLOR)],
+        owners=[
+            np.repeat(neurons, snapshot.num_inputs),
+            neurons,
+            signaling,
+            np.repeat(neurons, snapshot.num_outputs),
+            neurons,
+        ],
+    )
 
 
 def draw_demo(surface):
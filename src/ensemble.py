@@ -0,0 +1,264 @@
+"""Run many seeded replicas across a process pool and aggregate their curves."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src.array_step import phase_slot, update_activity
+from src.convergence import ConvergenceDetector
+from src.rng import replica_seeds
+from src.run import build_state, connection_stats
+from src.settings import ENGINE, SIM_DT
+from src.step import step_state, update_activity_phase
+
+
+METRICS = ("connected_inputs", "satisfied_neurons", "spikes")
+PERCENTILES = (10, 50, 90)
+
+# set in each worker by init_worker
+_results_queue = None
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Run seeded replicas in parallel and report mean / percentile curves."
+    )
+    parser.add_argument(
+        "--replicas",
+        type=int,
+        default=100,
+        help="Number of replicas to run (default: 100).",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Root seed, every replica gets an independent child (default: 0).",
+    )
+    parser.add_argument(
+        "--steps",
+        type=int,
+        default=2000,
+        help="Steps per replica, a multiple of --sample-every (default: 2000).",
+    )
+    parser.add_argument(
+        "--sample-every",
+        type=int,
+        default=20,
+        help="Record metrics every N steps (default: 20).",
+    )
+    parser.add_argument(
+        "--chunk",
+        type=int,
+        default=10,
+        help="Samples per message streamed back to the parent (default: 10).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes (default: all cores).",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=("object", "array"),
+        default=ENGINE,
+        help=f"Simulation engine to use (default: {ENGINE}).",
+    )
+    parser.add_argument(
+        "--stop-window",
+        type=int,
+        default=0,
+        help="Freeze a replica's wiring once every neuron and hub is satisfied and "
+        "no connection changed for N steps, then only advance its activity "
+        "(default: off).",
+    )
+    parser.add_argument(
+        "--out",
+        type=Path,
+        default=None,
+        help="Write the aggregated curves as JSON to this path.",
+    )
+    args = parser.parse_args()
+    if args.sample_every < 1:
+        parser.error("--sample-every must be at least 1")
+    if args.steps % args.sample_every:
+        # the last sample has to land on --steps or the tail would go unrun
+        parser.error(
+            f"--steps {args.steps} is not a multiple of --sample-every {args.sample_every}"
+        )
+    return args
+
+
+def init_worker(results_queue) -> None:
+    global _results_queue
+    _results_queue = results_queue
+
+
+def run_replica(
+    replica: int,
+    seed: np.random.SeedSequence,
+    engine: str,
+    steps: int,
+    sample_every: int,
+    chunk: int,
+    stop_window: int = 0,
+) -> int:
+    """
+    Step one replica, streaming (replica, first_sample, rows) chunks to the
+    parent. Rows are (connected_inputs, satisfied_neurons, spikes since the
+    previous sample).
+
+    With stop_window, once every neuron and hub is satisfied and no
+    connection changed for that many steps the topology is frozen and only
+    activity is advanced for the remaining samples. Returns the number of
+    full steps run.
+    """
+    state = build_state(engine, seed)
+    detector = ConvergenceDetector(stop_window) if stop_window else None
+    settled = False
+    full_steps = 0
+
+    rows = []
+    first_sample = 0
+    last_spikes = 0
+    for _ in range(steps // sample_every):
+        for step in range(sample_every):
+            if settled:
+                advance_activity(state, sample_every - step)
+                break
+            step_state(state, SIM_DT)
+            full_steps += 1
+            settled = detector is not None and detector.update(state)
+
+        stats = connection_stats(state)
+        rows.append(
+            (
+                stats["connected_inputs"],
+                stats["satisfied_neurons"],
+                state.spike_count - last_spikes,
+            )
+        )
+        last_spikes = state.spike_count
+        if len(rows) >= chunk:
+            _results_queue.put((replica, first_sample, rows))
+            first_sample += len(rows)
+            rows = []
+    if rows:
+        _results_queue.put((replica, first_sample, rows))
+    return full_steps
+
+
+def advance_activity(state, steps: int) -> None:
+    """
+    Advance only the activity model by steps * SIM_DT on a settled brain,
+    integrating exactly as step_state's activity phase would.
+    """
+    brain = state.arrays
+    for _ in range(steps):
+        # the bookkeeping and activity slot of step_state, without migration
+        state.step_count += 1
+        state.time += SIM_DT
+        if brain is not None:
+            period, offset = phase_slot(state.scheduler, "activity", state.step_count)
+            state.spike_count += update_activity(brain, SIM_DT * period, period, offset)
+        else:
+            state.spike_count += update_activity_phase(state, SIM_DT)
+
+
+def aggregate(series: np.ndarray) -> dict[str, dict[str, list[float]]]:
+    """series is [replica, sample, metric], returns mean / percentile curves."""
+    curves = {}
+    for m, name in enumerate(METRICS):
+        values = series[:, :, m]
+        curves[name] = {"mean": np.nanmean(values, axis=0).tolist()}
+        for p in PERCENTILES:
+            curves[name][f"p{p}"] = np.nanpercentile(values, p, axis=0).tolist()
+    return curves
+
+
+def run_ensemble(args: argparse.Namespace) -> tuple[np.ndarray, float, int]:
+    num_samples = args.steps // args.sample_every
+    series = np.full((args.replicas, num_samples, len(METRICS)), np.nan)
+    seeds = replica_seeds(args.seed, args.replicas)
+
+    context = multiprocessing.get_context()
+    results_queue = context.Queue()
+    start = time.perf_counter()
+    full_steps = 0
+    with context.Pool(
+        args.workers, initializer=init_worker, initargs=(results_queue,)
+    ) as pool:
+        pending = [
+            pool.apply_async(
+                run_replica,
+                (
+                    replica,
+                    seeds[replica],
+                    args.engine,
+                    args.steps,
+                    args.sample_every,
+                    args.chunk,
+                    args.stop_window,
+                ),
+            )
+            for replica in range(args.replicas)
+        ]
+        received = 0
+        expected = args.replicas * num_samples
+        while received < expected:
+            try:
+                replica, first_sample, rows = results_queue.get(timeout=1.0)
+            except queue.Empty:
+                # surface worker crashes instead of waiting forever
+                for result in pending:
+                    if result.ready():
+                        result.get()
+                continue
+            series[replica, first_sample : first_sample + len(rows)] = rows
+            received += len(rows)
+        for result in pending:
+            full_steps += result.get()
+    return series, time.perf_counter() - start, full_steps
+
+
+def main() -> None:
+    args = parse_args()
+    series, elapsed, full_steps = run_ensemble(args)
+    curves = aggregate(series)
+
+    total_steps = args.replicas * args.steps
+    print(
+        f"{args.replicas} replicas x {args.steps} steps on {args.workers} workers "
+        f"in {elapsed:.2f}s ({total_steps / elapsed:.0f} steps/sec total)"
+    )
+    if args.stop_window:
+        print(f"  {full_steps} of {total_steps} steps needed full migration")
+    for name in METRICS:
+        final = {key: values[-1] for key, values in curves[name].items()}
+        percentiles = ", ".join(f"p{p} {final[f'p{p}']:.3f}" for p in PERCENTILES)
+        print(f"  final {name}: mean {final['mean']:.3f}, {percentiles}")
+
+    if args.out is not None:
+        steps = [(i + 1) * args.sample_every for i in range(series.shape[1])]
+        output = {
+            "replicas": args.replicas,
+            "seed": args.seed,
+            "engine": args.engine,
+            "steps": steps,
+            "curves": curves,
+        }
+        args.out.write_text(json.dumps(output, indent=2))
+        print(f"wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
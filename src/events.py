@@ -0,0 +1,180 @@
+"""Event-driven neuron activity, an alternative to integrating at SIM_DT."""
+
+import heapq
+
+from src.brain import Neuron
+from src.state import State
+from src.step import clamp_charge, signal_transfer_amount
+
+FIRE = 0
+ARRIVE = 1
+
+
+class EventActivity:
+    """
+    Between spikes a charging neuron's charge is c0 + charge_rate * (t - t0)
+    and a signal reaches the hub exactly 1 / signal_speed after firing, so the
+    activity model can jump from one event to the next instead of stepping.
+
+    The heap holds (time, seq, kind, neuron, version). Fire events go stale
+    when a delivery changes the target's charge, they are dropped lazily by
+    comparing version against the neuron's current version.
+
+    While this is in charge, neuron.charge is the charge at charge_time[neuron]
+    for charging neurons, call sync_charges to bring every neuron up to date.
+    """
+
+    def __init__(self, state: State) -> None:
+        self.time = state.time
+        self.heap: list[tuple[float, int, int, Neuron, int]] = []
+        self.seq = 0
+        self.charge_time: dict[Neuron, float] = {}
+        self.version: dict[Neuron, int] = {}
+        self.in_flight: dict[Neuron, float] = {}
+        self.spike_count = 0
+        self.num_neurons = len(state.neurons)
+        self.signal_speed = state.config.signal_speed
+        self.signal_duration = 1.0 / self.signal_speed
+
+        for neuron in state.neurons:
+            self.version[neuron] = 0
+            self.charge_time[neuron] = self.time
+            if neuron.signal_active:
+                start = self.time - neuron.signal_pos * self.signal_duration
+                self.in_flight[neuron] = start
+                self.push(start + self.signal_duration, ARRIVE, neuron)
+            else:
+                self.schedule_fire(neuron)
+
+    def push(self, time: float, kind: int, neuron: Neuron) -> None:
+        heapq.heappush(self.heap, (time, self.seq, kind, neuron, self.version[neuron]))
+        self.seq += 1
+
+    def charge_at(self, neuron: Neuron, time: float) -> float:
+        return neuron.charge + neuron.charge_rate * (time - self.charge_time[neuron])
+
+    def schedule_fire(self, neuron: Neuron) -> None:
+        """(Re)schedule the next threshold crossing of a charging neuron."""
+        self.version[neuron] += 1
+        if neuron.charge >= 1.0:
+            self.push(self.charge_time[neuron], FIRE, neuron)
+        elif neuron.charge_rate > 0.0:
+            remaining = (1.0 - neuron.charge) / neuron.charge_rate
+            self.push(self.charge_time[neuron] + remaining, FIRE, neuron)
+
+    def fire(self, neuron: Neuron, time: float, spikes: list[int] | None) -> None:
+        self.version[neuron] += 1
+        neuron.charge = 0.0
+        neuron.signal_active = True
+        neuron.signal_pos = 0.0
+        self.charge_time[neuron] = time
+        self.in_flight[neuron] = time
+        self.spike_count += 1
+        if spikes is not None:
+            spikes.append(neuron.index)
+        self.push(time + self.signal_duration, ARRIVE, neuron)
+
+    def inject(self, neuron: Neuron, amount: float, time: float) -> None:
+        if neuron.signal_active:
+            neuron.charge = clamp_charge(neuron.charge + amount)
+            return
+        neuron.charge = clamp_charge(self.charge_at(neuron, time) + amount)
+        self.charge_time[neuron] = time
+        self.schedule_fire(neuron)
+
+    def arrive(self, neuron: Neuron, time: float) -> None:
+        neuron.signal_active = False
+        neuron.signal_pos = 0.0
+        del self.in_flight[neuron]
+
+        for output in neuron.outputs:
+            connected_input = output.connected_input
+            if not connected_input:
+                continue
+            target_neuron = connected_input.parent_neuron
+            if not target_neuron:
+                continue
+            transfer = signal_transfer_amount(connected_input, output)
+            if transfer <= 0.0:
+                continue
+            self.inject(target_neuron, transfer, time)
+
+        # resume charging from whatever was delivered while in flight
+        self.charge_time[neuron] = time
+        self.schedule_fire(neuron)
+
+    def advance(self, until: float, spikes: list[int] | None = None) -> int:
+        """
+        Process every event up to and including until, returns spikes fired.
+        Indices of the neurons that fired are appended to spikes if given.
+        """
+        fired_before = self.spike_count
+        heap = self.heap
+        while heap and heap[0][0] <= until:
+            time, _, kind, neuron, version = heapq.heappop(heap)
+            if kind == FIRE:
+                if version != self.version[neuron] or neuron.signal_active:
+                    continue
+                self.fire(neuron, time, spikes)
+            else:
+                self.arrive(neuron, time)
+
+        self.time = until
+        self.sync_signals()
+        if len(heap) > 4 * self.num_neurons + 64:
+            self.compact()
+        return self.spike_count - fired_before
+
+    def sync_signals(self) -> None:
+        """Set signal_pos on in-flight neurons for drawing, O(spikes in flight)."""
+        for neuron, start in self.in_flight.items():
+            neuron.signal_pos = (self.time - start) * self.signal_speed
+
+    def sync_charges(self, state: State) -> None:
+        """Bring every charging neuron's charge up to the current time."""
+        for neuron in state.neurons:
+            if not neuron.signal_active:
+                neuron.charge = self.charge_at(neuron, self.time)
+                self.charge_time[neuron] = self.time
+
+    def compact(self) -> None:
+        """Drop stale fire events once they outnumber live ones."""
+        version = self.version
+        self.heap = [
+            entry
+            for entry in self.heap
+            if entry[2] == ARRIVE or entry[4] == version[entry[3]]
+        ]
+        heapq.heapify(self.heap)
+
+
+def enable_event_activity(state: State) -> EventActivity:
+    """Switch step_state from fixed-dt activity to the event queue."""
+    if state.arrays is not None:
+        raise ValueError("event activity runs on the object engine only")
+    if state.conduction is not None:
+        raise ValueError("event activity does not model conduction delay")
+    state.event_activity = EventActivity(state)
+    return state.event_activity
+
+
+def disable_event_activity(state: State) -> None:
+    """Hand activity back to the fixed-dt loop with charges brought up to date."""
+    if state.event_activity is None:
+        return
+    state.event_activity.sync_charges(state)
+    state.event_activity = None
+
+
+def fast_forward(state: State, seconds: float) -> int:
+    """
+    Run only the activity model for seconds of simulated time on the current
+    topology, cost is proportional to the spikes fired. Returns the spike count.
+    """
+    activity = state.event_activity
+    if activity is None:
+        activity = enable_event_activity(state)
+    state.time += seconds
+    spikes = activity.advance(state.time)
+    state.spike_count += spikes
+    return spikes
@@ -1,5 +1,6 @@
 import pygame
 
+from src.draw import LayerCache
 from src.settings import WINDOW_DIMS, DIMS
 
 
@@ -7,5 +8,11 @@ class Graphics:
     def __init__(self):
         self.window = pygame.display.set_mode(WINDOW_DIMS.to_tuple())
         self.render_surface = pygame.Surface(DIMS.to_tuple())
+        # scale target reused every frame, same format as render_surface
+        self.scaled_surface = pygame.Surface(
+            WINDOW_DIMS.to_tuple(), 0, self.render_surface
+        )
+        self.layers = LayerCache(self.render_surface.get_size())
         self.clock = pygame.time.Clock()
         self.font = pygame.font.Font(None, 18)
+        self.small_font = pygame.font.Font(None, 16)
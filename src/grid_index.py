@@ -0,0 +1,89 @@
+class GridIndex:
+    """
+    Dense per-cell index of inputs or outputs.
+
+    Each cell has two intrusive doubly linked lists threaded through the
+    terminals themselves (cell, cell_prev, cell_next, cell_free): one of free
+    terminals and one of connected ones. Insert, remove, move, flipping a
+    terminal between free and connected, and finding a free partner in a cell
+    are all O(1).
+
+    Terminals are pushed at the head of a list, so first_free returns the
+    terminal that most recently arrived in or was freed in the cell. The
+    dict-of-lists lookup it replaced returned the earliest arrival instead,
+    so a seeded run pairs terminals differently than it did before the
+    grid index.
+    """
+
+    def __init__(self, grid_size: int) -> None:
+        self.grid_size = grid_size
+        self.free_heads = [None] * (grid_size * grid_size)
+        self.bound_heads = [None] * (grid_size * grid_size)
+        self.count = 0
+
+    def cell_of(self, x: int, y: int) -> int:
+        return x * self.grid_size + y
+
+    def _link(self, terminal, cell: int, free: bool) -> None:
+        heads = self.free_heads if free else self.bound_heads
+        head = heads[cell]
+        terminal.cell = cell
+        terminal.cell_free = free
+        terminal.cell_prev = None
+        terminal.cell_next = head
+        if head is not None:
+            head.cell_prev = terminal
+        heads[cell] = terminal
+
+    def _unlink(self, terminal) -> None:
+        prev = terminal.cell_prev
+        next = terminal.cell_next
+        if prev is not None:
+            prev.cell_next = next
+        else:
+            heads = self.free_heads if terminal.cell_free else self.bound_heads
+            heads[terminal.cell] = next
+        if next is not None:
+            next.cell_prev = prev
+        terminal.cell_prev = None
+        terminal.cell_next = None
+
+    def insert(self, terminal, cell: int, free: bool = True) -> None:
+        self._link(terminal, cell, free)
+        self.count += 1
+
+    def remove(self, terminal) -> None:
+        if terminal.cell < 0:
+            return
+        self._unlink(terminal)
+        terminal.cell = -1
+        self.count -= 1
+
+    def move(self, terminal, cell: int) -> None:
+        if terminal.cell == cell:
+            return
+        free = terminal.cell_free
+        if terminal.cell >= 0:
+            self._unlink(terminal)
+        else:
+            self.count += 1
+        self._link(terminal, cell, free)
+
+    def mark_bound(self, terminal) -> None:
+        if terminal.cell < 0 or not terminal.cell_free:
+            return
+        self._unlink(terminal)
+        self._link(terminal, terminal.cell, False)
+
+    def mark_free(self, terminal) -> None:
+        if terminal.cell < 0 or terminal.cell_free:
+            return
+        self._unlink(terminal)
+        self._link(terminal, terminal.cell, True)
+
+    def first_free(self, cell: int):
+        """A free terminal in the cell, or None."""
+        return self.free_heads[cell]
+
+    def __len__(self) -> int:
+        return self.count
@@ -0,0 +1,27 @@
+"""Record layout shared by the recorder, the step hooks and replay."""
+
+import numpy as np
+
+LOG_VERSION = 1
+
+# record kinds, a / b meaning in the comments
+INPUT_MOVE = 0  # input index, cell
+OUTPUT_MOVE = 1  # output index, cell
+NEURON_MOVE = 2  # neuron index, cell
+HUB_MOVE = 3  # neuron index, cell
+CONNECT = 4  # input index, output index
+DISCONNECT = 5  # input index, output index
+SPIKE = 6  # neuron index, 1 if its signal advanced later in the same step
+STEP = 7  # step count just finished, unused
+
+# 9 bytes a record, cells are x * grid_size + y
+RECORD = np.dtype([("kind", "u1"), ("a", "<i4"), ("b", "<i4")])
+KEYFRAME = np.dtype([("step", "<u8"), ("offset", "<u8")])
+
+EVENTS_FILE = "events.bin"
+KEYFRAMES_FILE = "keyframes.bin"
+META_FILE = "meta.json"
+
+
+def keyframe_file(step: int) -> str:
+    return f"keyframe_{step:09d}.npz"
@@ -4,16 +4,33 @@ import glm
 from src.graphics import Graphics
 from src.state import State
 from src.brain import init_brain
+from src.array_brain import init_array_brain
 from src.data import init_target_distribution
-from src.step import step_state
+from src.sim_thread import SimulationThread
+from src.snapshot import SnapshotBuffer
 from src.utils import mouse_pos
-from src.settings import DIMS, SQUARE_SIZE_HEIGHT_FRAC
 from src.draw import draw
-from src.settings import SIMULATION_FPS, SIM_DT, RENDER_FPS, RENDER_INTERVAL
+from src.settings import (
+    DIMS,
+    SQUARE_SIZE_HEIGHT_FRAC,
+    RENDER_FPS,
+    ENGINE,
+    TIME_WARPS,
+    PROFILE_WINDOW,
+    METRICS_CAPACITY,
+    CONDUCTION_DELAY,
+)
+from src.profiler import start_profiling
+from src.metrics import start_metrics
+from src.conduction import enable_conduction_delay
 
 
 pygame.init()
 
+# 1, 2, 3 pick TIME_WARPS, 0 toggles max speed, P dumps the phase profile
+# and C captures a cProfile of the stepping
+WARP_KEYS = (pygame.K_1, pygame.K_2, pygame.K_3)
+
 
 def main():
     state = State()
@@ -21,56 +38,54 @@ def main():
 
     square_px = int(DIMS.y * SQUARE_SIZE_HEIGHT_FRAC)
     dist_size = (square_px, square_px)
-    init_target_distribution(state, graphics, size=dist_size, seed=7, nodes=2)
-    init_brain(state)
+    if ENGINE == "array":
+        init_array_brain(state)
+    else:
+        init_brain(state)
+        if CONDUCTION_DELAY > 0:
+            enable_conduction_delay(state, CONDUCTION_DELAY)
+    # after init so the sampler's generator is spawned from the run's root seed
+    init_target_distribution(state, size=dist_size, seed=7, nodes=2)
+    start_profiling(state, PROFILE_WINDOW)
+    start_metrics(state, METRICS_CAPACITY)
 
-    running = True
-    accumulator = 0.0
-    last_time = pygame.time.get_ticks() / 1000.0
-    last_render_time = 0.0
-    displayed_fps = 0.0
-    sim_rate = SIMULATION_FPS
-    sim_measure_start = last_time
-    sim_steps = 0
+    buffer = SnapshotBuffer()
+    sim = SimulationThread(state, buffer)
+    sim.start()
 
+    running = True
     while running:
-        current_time = pygame.time.get_ticks() / 1000.0
-        frame_time = current_time - last_time
-        last_time = current_time
-        accumulator += frame_time
-
         for event in pygame.event.get():
             if event.type == pygame.QUIT or (
                 event.type == pygame.KEYDOWN
                 and (event.key == pygame.K_ESCAPE or event.key == pygame.K_q)
             ):
                 running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key in WARP_KEYS:
+                    sim.set_time_warp(TIME_WARPS[WARP_KEYS.index(event.key)])
+                elif event.key == pygame.K_0:
+                    sim.toggle_max_speed()
+                elif event.key == pygame.K_p:
+                    sim.request_profile_dump()
+                elif event.key == pygame.K_c:
+                    sim.request_capture()
 
-        while accumulator >= SIM_DT:
-            step_state(state, SIM_DT)
-            accumulator -= SIM_DT
-            sim_steps += 1
-
-        if current_time - sim_measure_start >= 0.5:
-            elapsed = current_time - sim_measure_start
-            if elapsed > 0:
-                sim_rate = sim_steps / elapsed
-            sim_steps = 0
-            sim_measure_start = current_time
-
-        if current_time - last_render_time >= RENDER_INTERVAL:
-            graphics.clock.tick()
-            displayed_fps = graphics.clock.get_fps()
+        # draw whatever the sim published last, at most RENDER_FPS times a second
+        graphics.clock.tick(RENDER_FPS)
+        snapshot = buffer.latest()
+        if snapshot is not None:
             draw(
-                state,
+                snapshot,
                 graphics,
-                fps=displayed_fps,
+                fps=graphics.clock.get_fps(),
                 fps_target=RENDER_FPS,
-                sim_rate=sim_rate,
-                sim_target=SIMULATION_FPS,
+                sim_rate=snapshot.sim_rate,
+                sim_target=sim.requested_rate,
+                sim_label="SIM max" if sim.max_speed else f"SIM {sim.time_warp:g}x",
             )
-            last_render_time = current_time
 
+    sim.stop()
     pygame.quit()
 
 
@@ -0,0 +1,107 @@
+"""Fixed-size history of per-step convergence metrics."""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+from src.state import State
+
+METRICS = (
+    "connected_inputs",
+    "connected_outputs",
+    "satisfied_neurons",
+    "satisfied_hubs",
+    "spikes_per_second",
+    "moves",
+)
+
+
+class MetricsHistory:
+    """
+    Ring buffer of the last capacity steps' metrics, one float64 row per
+    step. Every value comes from the State's running counters, the spike and
+    move rates as differences from the previous step, so recording is O(1)
+    and memory stays capacity rows however long the run.
+    """
+
+    def __init__(self, state: State, capacity: int) -> None:
+        self.capacity = capacity
+        self.values = np.zeros((capacity, len(METRICS)), dtype=np.float64)
+        self.steps = np.zeros(capacity, dtype=np.int64)
+        self.columns = {name: column for column, name in enumerate(METRICS)}
+        self.cursor = 0
+        self.count = 0
+        self.last_spikes = state.spike_count
+        self.last_moves = state.moves
+
+    def record(self, state: State, dt: float) -> None:
+        spikes = state.spike_count
+        moves = state.moves
+        self.values[self.cursor] = (
+            state.connected_inputs,
+            state.connected_outputs,
+            state.satisfied_neurons,
+            state.satisfied_hubs,
+            (spikes - self.last_spikes) / dt if dt > 0 else 0.0,
+            moves - self.last_moves,
+        )
+        self.steps[self.cursor] = state.step_count
+        self.last_spikes = spikes
+        self.last_moves = moves
+        self.cursor = (self.cursor + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def order(self, last: int | None = None) -> np.ndarray:
+        """Ring rows of the last steps held, oldest first."""
+        count = self.count if last is None else min(last, self.count)
+        return np.arange(self.cursor - count, self.cursor) % self.capacity
+
+    def recent(self, last: int | None = None) -> np.ndarray:
+        """(steps, len(METRICS)) copy of the last steps, oldest first."""
+        return self.values[self.order(last)]
+
+    def series(self, name: str, last: int | None = None) -> np.ndarray:
+        """One metric over the last steps, oldest first."""
+        return self.values[self.order(last), self.columns[name]]
+
+    def latest(self) -> dict[str, float]:
+        if not self.count:
+            return {}
+        row = self.values[(self.cursor - 1) % self.capacity]
+        return {name: float(value) for name, value in zip(METRICS, row)}
+
+    def summary(self, last: int | None = None) -> dict[str, dict[str, float]]:
+        """min, mean and max of every metric over the last steps."""
+        values = self.recent(last)
+        if not len(values):
+            return {}
+        return {
+            name: {
+                "min": float(values[:, column].min()),
+                "mean": float(values[:, column].mean()),
+                "max": float(values[:, column].max()),
+            }
+            for column, name in enumerate(METRICS)
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "metrics": list(METRICS),
+            "steps": self.steps[self.order()].tolist(),
+            "values": self.recent().tolist(),
+            "summary": self.summary(),
+        }
+
+    def dump(self, path: str | Path) -> None:
+        Path(path).write_text(json.dumps(self.to_dict()))
+
+
+def start_metrics(state: State, capacity: int) -> MetricsHistory:
+    """Record the metrics of every step from now on, keeping the last capacity."""
+    state.metrics = MetricsHistory(state, capacity)
+    return state.metrics
+
+
+def stop_metrics(state: State) -> None:
+    state.metrics = None
@@ -0,0 +1,110 @@
+"""Per-phase step timings over a rolling window of steps."""
+
+import json
+from pathlib import Path
+from time import perf_counter_ns
+
+import numpy as np
+
+from src.state import State
+
+# connect is time spent connecting, it is also counted in the phase that connected
+PHASES = ("neurons", "hubs", "inputs", "outputs", "connect", "activity", "step")
+
+# histogram bins, log spaced from 1us to 1s
+BIN_EDGES_NS = np.geomspace(1e3, 1e9, 61)
+
+
+class PhaseProfiler:
+    """
+    Times each phase of step_state with perf_counter_ns into a ring of the
+    last window steps, one int64 column per step. Recording is a subtraction
+    and an array store per phase, percentiles and histograms are only worked
+    out when asked for. A phase that did not run in a step is stored as -1
+    and left out.
+    """
+
+    def __init__(self, window: int) -> None:
+        self.window = window
+        self.samples = np.full((len(PHASES), window), -1, dtype=np.int64)
+        self.rows = {name: row for row, name in enumerate(PHASES)}
+        self.cursor = 0
+        self.count = 0
+        self.step_start = 0
+        self.last = 0
+        self.connect_ns = 0
+
+    def begin_step(self) -> None:
+        self.samples[:, self.cursor] = -1
+        self.connect_ns = 0
+        self.step_start = self.last = perf_counter_ns()
+
+    def lap(self, name: str) -> None:
+        """Record the time since the previous lap as phase name."""
+        now = perf_counter_ns()
+        self.samples[self.rows[name], self.cursor] = now - self.last
+        self.last = now
+
+    def end_step(self) -> None:
+        column = self.cursor
+        self.samples[self.rows["connect"], column] = self.connect_ns
+        self.samples[self.rows["step"], column] = perf_counter_ns() - self.step_start
+        self.cursor = (column + 1) % self.window
+        self.count = min(self.count + 1, self.window)
+
+    def phase_samples(self, name: str) -> np.ndarray:
+        row = self.samples[self.rows[name]]
+        return row[row >= 0]
+
+    def percentiles(self) -> dict[str, tuple[float, float]]:
+        """(p50, p99) ms of every phase with samples in the window."""
+        summary = {}
+        for name in PHASES:
+            samples = self.phase_samples(name)
+            if len(samples):
+                p50, p99 = np.percentile(samples, (50, 99)) / 1e6
+                summary[name] = (float(p50), float(p99))
+        return summary
+
+    def to_dict(self) -> dict:
+        phases = {}
+        for name in PHASES:
+            samples = self.phase_samples(name)
+            if not len(samples):
+                continue
+            p50, p90, p99 = np.percentile(samples, (50, 90, 99)) / 1e6
+            counts, _ = np.histogram(
+                np.clip(samples, BIN_EDGES_NS[0], BIN_EDGES_NS[-1]), BIN_EDGES_NS
+            )
+            phases[name] = {
+                "count": len(samples),
+                "mean_ms": float(samples.mean()) / 1e6,
+                "p50_ms": float(p50),
+                "p90_ms": float(p90),
+                "p99_ms": float(p99),
+                "max_ms": float(samples.max()) / 1e6,
+                "histogram": counts.tolist(),
+            }
+        return {
+            "window": self.window,
+            "steps": self.count,
+            "bin_edges_us": (BIN_EDGES_NS / 1e3).tolist(),
+            "phases": phases,
+        }
+
+    def dump(self, path: str | Path) -> None:
+        Path(path).write_text(json.dumps(self.to_dict(), indent=2))
+
+
+def start_profiling(state: State, window: int) -> PhaseProfiler:
+    """Time every step_state phase from now on, over the last window steps."""
+    state.profiler = PhaseProfiler(window)
+    if state.arrays is not None:
+        state.arrays.profiler = state.profiler
+    return state.profiler
+
+
+def stop_profiling(state: State) -> None:
+    state.profiler = None
+    if state.arrays is not None:
+        state.arrays.profiler = None
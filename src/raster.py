@@ -0,0 +1,180 @@
+"""Bulk line and dot rasterizer writing straight into a surface's pixels."""
+
+from functools import lru_cache
+
+import numpy as np
+import pygame
+
+
+def line_pixels(
+    starts: np.ndarray, ends: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Every pixel of every segment in one pass, (n, 2) int endpoints in.
+    Returns xs, ys and the pixel count of each segment, pixels are grouped
+    by segment in input order.
+
+    Closed form of the Bresenham loop pygame.draw.line runs: after k steps
+    along the major axis the minor axis has taken
+    ceil((k * minor - major // 2) / major) steps, so the pixel set matches
+    pygame's exactly, ties included.
+    """
+    x0 = starts[:, 0]
+    y0 = starts[:, 1]
+    dx = np.abs(ends[:, 0] - x0)
+    dy = np.abs(ends[:, 1] - y0)
+    x_major = dx > dy
+    major = np.maximum(dx, dy)
+    minor = np.minimum(dx, dy)
+
+    counts = major + 1
+    segment = np.repeat(np.arange(len(starts)), counts)
+    first = np.cumsum(counts) - counts
+    k = np.arange(int(counts.sum())) - first[segment]
+
+    # exact in float64 for any coordinates a surface can have
+    minor_steps = np.ceil(
+        (k * minor[segment] - major[segment] // 2) / np.maximum(major, 1)[segment]
+    )
+    minor_steps = np.maximum(minor_steps, 0.0).astype(np.int64)
+
+    seg_x_major = x_major[segment]
+    step_x = np.where(x0 < ends[:, 0], 1, -1)[segment]
+    step_y = np.where(y0 < ends[:, 1], 1, -1)[segment]
+    xs = x0[segment] + step_x * np.where(seg_x_major, k, minor_steps)
+    ys = y0[segment] + step_y * np.where(seg_x_major, minor_steps, k)
+    return xs, ys, counts
+
+
+def thicken(
+    starts: np.ndarray, ends: np.ndarray, width: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    The parallel copies pygame.draw.line draws for width > 1, offset along
+    y for x-major lines and along x otherwise.
+    """
+    if width == 1:
+        return starts, ends
+    delta = np.abs(ends - starts)
+    axis = np.where(delta[:, 0] > delta[:, 1], 1, 0)
+    low = -(width // 2) + (1 - width % 2)
+    offsets = np.arange(low, low + width)
+    shift = np.zeros((width, len(starts), 2), dtype=starts.dtype)
+    shift[:, np.arange(len(starts)), axis] = offsets[:, None]
+    return (starts + shift).reshape(-1, 2), (ends + shift).reshape(-1, 2)
+
+
+@lru_cache(maxsize=None)
+def dot_offsets(radius: int) -> tuple[np.ndarray, np.ndarray]:
+    """Pixel offsets of a filled pygame.draw.circle, taken from pygame itself."""
+    size = 2 * radius + 3
+    stamp = pygame.Surface((size, size))
+    pygame.draw.circle(stamp, (255, 255, 255), (radius + 1, radius + 1), radius)
+    xs, ys = np.nonzero(pygame.surfarray.array2d(stamp))
+    return xs - (radius + 1), ys - (radius + 1)
+
+
+def dot_pixels(centers: np.ndarray, radius: int) -> tuple[np.ndarray, np.ndarray]:
+    offset_x, offset_y = dot_offsets(radius)
+    xs = (centers[:, 0][:, None] + offset_x).ravel()
+    ys = (centers[:, 1][:, None] + offset_y).ravel()
+    return xs, ys
+
+
+def rasterize(
+    surface: pygame.Surface,
+    lines: list[tuple[np.ndarray, np.ndarray, int, tuple[int, int, int]]],
+    dots: list[tuple[np.ndarray, int, tuple[int, int, int]]] = (),
+    owners: list[np.ndarray] | None = None,
+) -> None:
+    """
+    Draw (starts, ends, width, color) line groups, then (centers, radius,
+    color) dot groups, in order. All lines go through one line_pixels pass
+    and every group is written with a single fancy-indexed store.
+
+    owners, if given, has one int array per line group and then per dot
+    group naming the owner of each segment or dot. Owners are then drawn
+    one after another, each with its groups in order, as a loop drawing
+    every owner's items in turn would.
+    """
+    starts = []
+    ends = []
+    group_segments = []
+    for group_starts, group_ends, width, _ in lines:
+        group_starts, group_ends = thicken(group_starts, group_ends, width)
+        starts.append(group_starts)
+        ends.append(group_ends)
+        group_segments.append(len(group_starts))
+
+    if sum(group_segments):
+        xs, ys, counts = line_pixels(np.concatenate(starts), np.concatenate(ends))
+        segment_bounds = np.cumsum([0] + group_segments)
+        bounds = np.concatenate([[0], np.cumsum(counts)])[segment_bounds]
+    else:
+        xs = ys = counts = np.zeros(0, dtype=np.int64)
+        segment_bounds = bounds = np.zeros(len(lines) + 1, dtype=np.int64)
+
+    # 32 bit surfaces take one mapped int per pixel, others go per channel
+    if surface.get_bytesize() == 4:
+        pixels = pygame.surfarray.pixels2d(surface)
+
+        def color_value(color):
+            return surface.map_rgb(color)
+
+    else:
+        pixels = pygame.surfarray.pixels3d(surface)
+
+        def color_value(color):
+            return color
+
+    width, height = pixels.shape[:2]
+
+    # (xs, ys, color) per group, lines then dots
+    groups = [
+        (xs[start:end], ys[start:end], color)
+        for (_, _, _, color), start, end in zip(lines, bounds[:-1], bounds[1:])
+    ]
+    groups += [(*dot_pixels(centers, radius), color) for centers, radius, color in dots]
+
+    keys = None
+    if owners is not None:
+        # each pixel's drawing rank, by owner and then group
+        num_groups = len(groups)
+        keys = []
+        for group, (_, _, line_width, _) in enumerate(lines):
+            # thicken lays the group's copies out one after the other
+            segment_keys = np.tile(owners[group] * num_groups + group, line_width)
+            group_counts = counts[segment_bounds[group] : segment_bounds[group + 1]]
+            keys.append(np.repeat(segment_keys, group_counts))
+        for group, (_, radius, _) in enumerate(dots, len(lines)):
+            dot_keys = owners[group] * num_groups + group
+            keys.append(np.repeat(dot_keys, len(dot_offsets(radius)[0])))
+
+    for group, (group_xs, group_ys, color) in enumerate(groups):
+        inside = (group_xs >= 0) & (group_xs < width) & (group_ys >= 0) & (group_ys < height)
+        groups[group] = (group_xs[inside], group_ys[inside], color)
+        if keys is not None:
+            keys[group] = keys[group][inside]
+    if keys is not None:
+        groups = topmost(groups, keys, width, height)
+
+    for group_xs, group_ys, color in groups:
+        pixels[group_xs, group_ys] = color_value(color)
+    # release the surface lock before anything blits it
+    del pixels
+
+
+def topmost(groups: list, keys: list[np.ndarray], width: int, height: int) -> list:
+    """
+    Keep only the pixels of each group whose item has the highest key at
+    that pixel. An item is a single color, so what is left no longer
+    overlaps and the groups can be stored in any order.
+    """
+    top = np.full(width * height, -1, dtype=np.int64)
+    for (group_xs, group_ys, _), group_keys in zip(groups, keys):
+        np.maximum.at(top, group_xs * height + group_ys, group_keys)
+    visible_groups = []
+    for (group_xs, group_ys, color), group_keys in zip(groups, keys):
+        visible = top[group_xs * height + group_ys] == group_keys
+        visible_groups.append((group_xs[visible], group_ys[visible], color))
+    return visible_groups
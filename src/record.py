@@ -0,0 +1,149 @@
+"""Append-only binary log of structural changes and spikes, with keyframes."""
+
+import json
+import queue
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from src.checkpoint import pack_checkpoint, write_checkpoint
+from src.log_format import (
+    EVENTS_FILE,
+    KEYFRAME,
+    KEYFRAMES_FILE,
+    LOG_VERSION,
+    META_FILE,
+    RECORD,
+    SPIKE,
+    STEP,
+    keyframe_file,
+)
+from src.state import State
+
+
+class Recorder:
+    """
+    Collects records as flat kind, a, b ints in one list while the state
+    steps. Plain ints are not tracked by the garbage collector, unlike a
+    tuple per record, so a busy step does not trigger extra collections.
+    Every batch_size records the buffer is handed to a writer thread that
+    packs and appends it to events.bin, so the step loop only pays for the
+    extend.
+
+    Every keyframe_interval steps the state is packed into a checkpoint and
+    written next to the log together with the record offset it starts at,
+    which lets replay seek without reading the log from the beginning.
+    """
+
+    def __init__(
+        self,
+        state: State,
+        path: str | Path,
+        dt: float,
+        batch_size: int = 65536,
+        keyframe_interval: int = 3600,
+    ) -> None:
+        if state.arrays is not None:
+            raise ValueError("recording runs on the object engine only")
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.keyframe_interval = keyframe_interval
+
+        self.records: list[int] = []
+        self.spikes: list[int] = []
+        self.flushed = 0
+
+        neuron = state.neurons[0] if state.neurons else None
+        meta = {
+            "version": LOG_VERSION,
+            "grid_size": state.config.grid_size,
+            "num_inputs": len(neuron.inputs) if neuron else 0,
+            "num_outputs": len(neuron.outputs) if neuron else 0,
+            "dt": dt,
+            "first_step": state.step_count,
+        }
+        (self.path / META_FILE).write_text(json.dumps(meta, indent=2))
+
+        self.events_file = open(self.path / EVENTS_FILE, "wb")
+        self.keyframes_file = open(self.path / KEYFRAMES_FILE, "wb")
+        self.queue: queue.Queue = queue.Queue()
+        self.writer = threading.Thread(target=self.write_loop, daemon=True)
+        self.writer.start()
+
+        self.keyframe(state)
+
+    def end_step(self, state: State) -> None:
+        """Close out the step, called once at the end of step_state."""
+        records = self.records
+        if self.spikes:
+            neurons = state.neurons
+            for index in self.spikes:
+                neuron = neurons[index]
+                # a spike fired early in the step can move on before it ends
+                advanced = not neuron.signal_active or neuron.signal_pos > 0.0
+                records.extend((SPIKE, index, int(advanced)))
+            self.spikes.clear()
+        records.extend((STEP, state.step_count, 0))
+        if len(records) >= 3 * self.batch_size:
+            self.flush()
+        if state.step_count % self.keyframe_interval == 0:
+            self.keyframe(state)
+
+    def flush(self) -> None:
+        if not self.records:
+            return
+        self.queue.put(("records", self.records))
+        self.flushed += len(self.records) // 3
+        self.records = []
+
+    def keyframe(self, state: State) -> None:
+        self.flush()
+        self.queue.put(("keyframe", state.step_count, self.flushed, pack_checkpoint(state)))
+
+    def close(self) -> None:
+        self.flush()
+        self.queue.put(None)
+        self.writer.join()
+        self.events_file.close()
+        self.keyframes_file.close()
+
+    def write_loop(self) -> None:
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            if item[0] == "records":
+                self.events_file.write(pack_records(item[1]).tobytes())
+                self.events_file.flush()
+            else:
+                _, step, offset, arrays = item
+                write_checkpoint(arrays, self.path / keyframe_file(step))
+                # only index the keyframe once its checkpoint is on disk
+                self.keyframes_file.write(
+                    np.array([(step, offset)], dtype=KEYFRAME).tobytes()
+                )
+                self.keyframes_file.flush()
+
+
+def pack_records(records: list[int]) -> np.ndarray:
+    triples = np.array(records, dtype=np.int32).reshape(-1, 3)
+    packed = np.empty(len(triples), dtype=RECORD)
+    packed["kind"] = triples[:, 0]
+    packed["a"] = triples[:, 1]
+    packed["b"] = triples[:, 2]
+    return packed
+
+
+def start_recording(state: State, path: str | Path, dt: float, **kwargs) -> Recorder:
+    """Record every structural change and spike of state into the directory path."""
+    state.recorder = Recorder(state, path, dt, **kwargs)
+    return state.recorder
+
+
+def stop_recording(state: State) -> None:
+    if state.recorder is None:
+        return
+    state.recorder.close()
+    state.recorder = None
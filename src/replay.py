@@ -0,0 +1,261 @@
+"""Replay a recorded run from its event log, at any speed and with seeking."""
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import json
+from pathlib import Path
+
+import numpy as np
+
+from src.checkpoint import load_checkpoint
+from src.log_format import (
+    CONNECT,
+    DISCONNECT,
+    EVENTS_FILE,
+    HUB_MOVE,
+    INPUT_MOVE,
+    KEYFRAME,
+    KEYFRAMES_FILE,
+    LOG_VERSION,
+    META_FILE,
+    NEURON_MOVE,
+    OUTPUT_MOVE,
+    RECORD,
+    SPIKE,
+    STEP,
+    keyframe_file,
+)
+from src.settings import SIMULATION_FPS
+from src.state import State, move_input_xy, move_output_xy
+from src.step import connect_input_output, disconnect_input_output
+
+# records decoded per read from the memory map
+READ_CHUNK = 4096
+
+
+class Replay:
+    """
+    Rebuilds the recorded state at any step. Seeking loads the nearest
+    keyframe at or before the target and applies the records after it.
+
+    Structure and spikes are exact. Charges are only exact at keyframes,
+    deliveries are not logged, so between keyframes they hold still.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.meta = json.loads((self.path / META_FILE).read_text())
+        if self.meta["version"] != LOG_VERSION:
+            raise ValueError(
+                f"log format {self.meta['version']} is not supported, "
+                f"expected {LOG_VERSION}"
+            )
+        self.grid_size = self.meta["grid_size"]
+        self.dt = self.meta["dt"]
+
+        self.keyframes = np.fromfile(self.path / KEYFRAMES_FILE, dtype=KEYFRAME)
+        if len(self.keyframes) == 0:
+            raise ValueError(f"{self.path} has no keyframes")
+        self.keyframe_steps = self.keyframes["step"].tolist()
+
+        events_path = self.path / EVENTS_FILE
+        if events_path.stat().st_size >= RECORD.itemsize:
+            self.records = np.memmap(events_path, dtype=RECORD, mode="r")
+        else:
+            self.records = np.zeros(0, dtype=RECORD)
+
+        self.state: State = None
+        self.cursor = 0
+        self.seek(self.keyframe_steps[0])
+
+    @property
+    def first_step(self) -> int:
+        return self.keyframe_steps[0]
+
+    @property
+    def step(self) -> int:
+        return self.state.step_count
+
+    @property
+    def at_end(self) -> bool:
+        return self.cursor >= len(self.records)
+
+    def load_keyframe(self, index: int) -> None:
+        step = self.keyframe_steps[index]
+        self.state = load_checkpoint(self.path / keyframe_file(step))
+        self.cursor = int(self.keyframes["offset"][index])
+
+        state = self.state
+        self.inputs = [input for neuron in state.neurons for input in neuron.inputs]
+        self.outputs = [output for neuron in state.neurons for output in neuron.outputs]
+        self.in_flight = {
+            neuron: None for neuron in state.neurons if neuron.signal_active
+        }
+        self.fired = []
+
+    def seek(self, step: int) -> None:
+        """Jump to step, clamped to the recorded range."""
+        index = max(0, bisect.bisect_right(self.keyframe_steps, step) - 1)
+        if self.state is None or not (self.keyframe_steps[index] <= self.step <= step):
+            self.load_keyframe(index)
+        self.advance(step - self.step)
+
+    def advance(self, steps: int) -> int:
+        """Apply up to steps recorded steps, returns how many were applied."""
+        done = 0
+        while done < steps and not self.at_end:
+            chunk = self.records[self.cursor : self.cursor + READ_CHUNK]
+            for kind, a, b in chunk.tolist():
+                self.cursor += 1
+                if kind == STEP:
+                    self.end_step(a)
+                    done += 1
+                    if done == steps:
+                        break
+                else:
+                    self.apply(kind, a, b)
+        return done
+
+    def apply(self, kind: int, a: int, b: int) -> None:
+        state = self.state
+        if kind == INPUT_MOVE:
+            move_input_xy(state, self.inputs[a], *divmod(b, self.grid_size))
+        elif kind == OUTPUT_MOVE:
+            move_output_xy(state, self.outputs[a], *divmod(b, self.grid_size))
+        elif kind == NEURON_MOVE:
+            neuron = state.neurons[a]
+            neuron.x, neuron.y = divmod(b, self.grid_size)
+        elif kind == HUB_MOVE:
+            neuron = state.neurons[a]
+            neuron.hub_x, neuron.hub_y = divmod(b, self.grid_size)
+        elif kind == CONNECT:
+            connect_input_output(state, self.inputs[a], self.outputs[b])
+        elif kind == DISCONNECT:
+            disconnect_input_output(state, self.inputs[a], self.outputs[b])
+        elif kind == SPIKE:
+            self.fired.append((state.neurons[a], b))
+
+    def end_step(self, step: int) -> None:
+        state = self.state
+        state.step_count = step
+        state.time += self.dt
+
+        # signals already in flight move on, then this step's spikes start,
+        # the ones flagged as advanced moved on once more before the step ended
+        period = state.scheduler.period("activity")
+        offset = step % period
+        distance = state.config.signal_speed * (self.dt * period)
+        for neuron in list(self.in_flight):
+            if neuron.index % period == offset:
+                self.advance_signal(neuron, distance)
+        for neuron, advanced in self.fired:
+            neuron.charge = 0.0
+            neuron.signal_active = True
+            neuron.signal_pos = 0.0
+            self.in_flight[neuron] = None
+            if advanced:
+                self.advance_signal(neuron, distance)
+        state.spike_count += len(self.fired)
+        self.fired.clear()
+
+    def advance_signal(self, neuron, distance: float) -> None:
+        neuron.signal_pos += distance
+        if neuron.signal_pos >= 1.0:
+            neuron.signal_pos = 0.0
+            neuron.signal_active = False
+            del self.in_flight[neuron]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Replay a recorded run. Space pauses, up / down change the "
+        "speed, left / right seek one keyframe, home restarts."
+    )
+    parser.add_argument("log", type=Path, help="Directory written by --record.")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="Playback speed as a multiple of real time (default: 1).",
+    )
+    parser.add_argument(
+        "--start",
+        type=int,
+        default=None,
+        help="Step to start from (default: the first recorded step).",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    import pygame
+
+    from src.draw import draw
+    from src.graphics import Graphics
+    from src.snapshot import take_snapshot
+
+    args = parse_args()
+    replay = Replay(args.log)
+    if args.start is not None:
+        replay.seek(args.start)
+
+    pygame.init()
+    graphics = Graphics()
+    keyframe_interval = (
+        replay.keyframe_steps[1] - replay.keyframe_steps[0]
+        if len(replay.keyframe_steps) > 1
+        else int(SIMULATION_FPS)
+    )
+
+    speed = args.speed
+    paused = False
+    pending = 0.0
+    last_time = pygame.time.get_ticks() / 1000.0
+    running = True
+    while running:
+        current_time = pygame.time.get_ticks() / 1000.0
+        frame_time = current_time - last_time
+        last_time = current_time
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key in (pygame.K_ESCAPE, pygame.K_q):
+                    running = False
+                elif event.key == pygame.K_SPACE:
+                    paused = not paused
+                elif event.key == pygame.K_UP:
+                    speed *= 2.0
+                elif event.key == pygame.K_DOWN:
+                    speed /= 2.0
+                elif event.key == pygame.K_RIGHT:
+                    replay.seek(replay.step + keyframe_interval)
+                elif event.key == pygame.K_LEFT:
+                    replay.seek(max(replay.first_step, replay.step - keyframe_interval))
+                elif event.key == pygame.K_HOME:
+                    replay.seek(replay.first_step)
+
+        if not paused and not replay.at_end:
+            pending += frame_time * speed / replay.dt
+            steps = int(pending)
+            pending -= steps
+            replay.advance(steps)
+
+        graphics.clock.tick(SIMULATION_FPS)
+        draw(
+            take_snapshot(replay.state),
+            graphics,
+            fps=graphics.clock.get_fps(),
+            fps_target=SIMULATION_FPS,
+            sim_rate=0.0 if paused else speed / replay.dt,
+            sim_target=1.0 / replay.dt,
+        )
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+"""Per-state random streams, splittable for workers and replicas."""
+
+import numpy as np
+
+
+def seed_state(state, seed: int | np.random.SeedSequence | None = None):
+    """Give the state its own generator, rooted at seed."""
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    state.seed_sequence = seed
+    state.rng = np.random.default_rng(seed)
+
+
+def spawn_rngs(state, count: int) -> list[np.random.Generator]:
+    """Independent child generators, e.g. one per worker thread or process."""
+    return [np.random.default_rng(child) for child in state.seed_sequence.spawn(count)]
+
+
+def replica_seeds(root_seed: int | None, count: int) -> list[np.random.SeedSequence]:
+    """Reproducible, independent seeds for count replicas from one root seed."""
+    return np.random.SeedSequence(root_seed).spawn(count)
@@ -0,0 +1,305 @@
+"""Run the simulation headless, as fast as possible, and report throughput."""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from src.array_brain import init_array_brain
+from src.brain import init_brain
+from src.checkpoint import load_checkpoint, read_checkpoint_meta, save_checkpoint
+from src.conduction import enable_conduction_delay
+from src.config import SimConfig
+from src.convergence import ConvergenceDetector
+from src.events import enable_event_activity, fast_forward
+from src.metrics import start_metrics, stop_metrics
+from src.profiler import start_profiling, stop_profiling
+from src.record import start_recording, stop_recording
+from src.settings import ENGINE, METRICS_CAPACITY, SIM_DT
+from src.state import State
+from src.step import step_state
+from src.threaded import start_threads, stop_threads
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Step the brain without a window and print steps/sec."
+    )
+    parser.add_argument(
+        "--steps",
+        type=int,
+        default=1000,
+        help="Number of simulation steps to run (default: 1000).",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Seed for brain init and migration (default: unseeded).",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=("object", "array"),
+        default=ENGINE,
+        help=f"Simulation engine to use (default: {ENGINE}).",
+    )
+    parser.add_argument(
+        "--dt",
+        type=float,
+        default=SIM_DT,
+        help=f"Simulated seconds per step (default: {SIM_DT:.4f}).",
+    )
+    parser.add_argument(
+        "--activity",
+        choices=("fixed", "event"),
+        default="fixed",
+        help="Integrate activity per step or jump between events, event on the object "
+        "engine only (default: fixed).",
+    )
+    parser.add_argument(
+        "--conduction-delay",
+        type=float,
+        default=0.0,
+        metavar="SECONDS",
+        help="Delay spikes by this many seconds per grid cell of path, object engine "
+        "with fixed activity only (default: 0, instant).",
+    )
+    parser.add_argument(
+        "--fast-forward",
+        type=float,
+        default=0.0,
+        help="After stepping, fast-forward activity by this many simulated seconds, "
+        "object engine only.",
+    )
+    parser.add_argument(
+        "--period",
+        action="append",
+        default=[],
+        metavar="PHASE=N",
+        help="Run a step phase every N steps, e.g. --period neurons=16 (repeatable).",
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=0,
+        help="Step input and output moves on this many threads, object engine on "
+        "a free-threaded build only (default: off).",
+    )
+    parser.add_argument(
+        "--until-converged",
+        type=int,
+        default=0,
+        metavar="WINDOW",
+        help="Stop early once every neuron and hub is satisfied and no connection "
+        "changed for WINDOW steps (default: off).",
+    )
+    parser.add_argument(
+        "--resume",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="Continue from a checkpoint instead of a fresh brain.",
+    )
+    parser.add_argument(
+        "--save",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="Write a checkpoint after stepping.",
+    )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="Time every step phase, print p50/p99 and write the profile as JSON.",
+    )
+    parser.add_argument(
+        "--metrics",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help=f"Write the last {METRICS_CAPACITY} steps' convergence metrics as JSON.",
+    )
+    parser.add_argument(
+        "--record",
+        type=str,
+        default=None,
+        metavar="DIR",
+        help="Log every structural change and spike to DIR for src.replay, object "
+        "engine only.",
+    )
+    args = parser.parse_args()
+    resumed_event_activity = False
+    resumed_delay = None
+    if args.resume:
+        # a resumed state keeps the engine and activity models it was saved with
+        try:
+            meta = read_checkpoint_meta(args.resume)
+        except ValueError as error:
+            parser.error(str(error))
+        args.engine = meta["engine"]
+        resumed_event_activity = meta["event_activity"]
+        resumed_delay = meta.get("conduction_delay")
+    if args.threads and args.engine != "object":
+        parser.error("--threads needs --engine object")
+    if args.activity == "event" and args.engine != "object":
+        parser.error("--activity event needs --engine object")
+    if args.fast_forward and args.engine != "object":
+        parser.error("--fast-forward needs --engine object")
+    if args.record and args.engine != "object":
+        parser.error("--record needs --engine object")
+    if resumed_delay and (args.activity == "event" or args.fast_forward):
+        parser.error(
+            f"{args.resume} has a conduction delay, it cannot run --activity event "
+            "or --fast-forward"
+        )
+    if args.conduction_delay < 0:
+        parser.error("--conduction-delay must be positive, or 0 for instant delivery")
+    if args.conduction_delay and (
+        args.engine != "object"
+        or args.activity != "fixed"
+        or resumed_event_activity
+        or args.fast_forward
+    ):
+        parser.error(
+            "--conduction-delay needs --engine object, --activity fixed "
+            "and no --fast-forward"
+        )
+    return args
+
+
+def build_state(
+    engine: str, seed: int | None, config: SimConfig | None = None
+) -> State:
+    state = State(config)
+    if engine == "array":
+        init_array_brain(state, seed)
+    else:
+        init_brain(state, seed)
+    return state
+
+
+def connection_stats(state: State) -> dict[str, float]:
+    """Fraction of connected terminals and satisfied neurons / hubs, O(1)."""
+    brain = state.arrays
+    if brain is not None:
+        num_neurons = brain.num_neurons
+        num_inputs = len(brain.input_conn)
+        num_outputs = len(brain.output_conn)
+    else:
+        num_neurons = len(state.neurons)
+        num_inputs = len(state.input_pos_lookup)
+        num_outputs = len(state.output_pos_lookup)
+    return {
+        "connected_inputs": state.connected_inputs / max(1, num_inputs),
+        "connected_outputs": state.connected_outputs / max(1, num_outputs),
+        "satisfied_neurons": state.satisfied_neurons / max(1, num_neurons),
+        "satisfied_hubs": state.satisfied_hubs / max(1, num_neurons),
+    }
+
+
+def run(
+    state: State,
+    steps: int,
+    dt: float,
+    detector: ConvergenceDetector | None = None,
+) -> tuple[float, int]:
+    """
+    Step the state, stopping early if the detector reports convergence.
+    Returns the elapsed wall-clock seconds and the steps actually run.
+    """
+    start = time.perf_counter()
+    for done in range(1, steps + 1):
+        step_state(state, dt)
+        if detector is not None and detector.update(state):
+            return time.perf_counter() - start, done
+    return time.perf_counter() - start, steps
+
+
+def main() -> None:
+    args = parse_args()
+
+    start = time.perf_counter()
+    if args.resume:
+        state = load_checkpoint(args.resume)
+    else:
+        state = build_state(args.engine, args.seed)
+    init_seconds = time.perf_counter() - start
+    for spec in args.period:
+        name, _, period = spec.partition("=")
+        state.scheduler.set_period(name, int(period))
+    if args.activity == "event" and state.event_activity is None:
+        enable_event_activity(state)
+    if args.conduction_delay and state.conduction is None:
+        enable_conduction_delay(state, args.conduction_delay)
+
+    if args.record:
+        start_recording(state, args.record, args.dt)
+
+    if args.profile:
+        start_profiling(state, args.steps)
+    if args.metrics:
+        start_metrics(state, METRICS_CAPACITY)
+
+    detector = None
+    if args.until_converged:
+        detector = ConvergenceDetector(args.until_converged)
+    if args.threads and not start_threads(state, args.threads):
+        print("this build has the GIL, stepping on one thread")
+    try:
+        elapsed, steps = run(state, args.steps, args.dt, detector)
+    finally:
+        stop_threads(state)
+    if args.record:
+        stop_recording(state)
+
+    rate = steps / elapsed if elapsed > 0 else float("inf")
+    print(
+        f"{args.engine} engine: {steps} steps in {elapsed:.3f}s "
+        f"({rate:.1f} steps/sec), init {init_seconds * 1000.0:.1f}ms"
+    )
+    if detector is not None and detector.converged_at is not None:
+        print(
+            f"  converged at step {detector.converged_at}, "
+            f"stable for {detector.stable_steps} steps"
+        )
+    for name, value in connection_stats(state).items():
+        print(f"  {name}: {value:6.1%}")
+
+    if args.metrics:
+        print(f"  metrics over the last {state.metrics.count} steps (min / mean / max):")
+        for name, values in state.metrics.summary().items():
+            print(
+                f"    {name:<18} {values['min']:10.1f} {values['mean']:10.1f} "
+                f"{values['max']:10.1f}"
+            )
+        state.metrics.dump(args.metrics)
+        stop_metrics(state)
+        print(f"wrote {args.metrics}")
+
+    if args.profile:
+        for name, (p50, p99) in state.profiler.percentiles().items():
+            print(f"  {name:<9} p50 {p50:8.3f}ms  p99 {p99:8.3f}ms")
+        state.profiler.dump(args.profile)
+        stop_profiling(state)
+        print(f"wrote {args.profile}")
+
+    if args.fast_forward > 0.0:
+        start = time.perf_counter()
+        spikes = fast_forward(state, args.fast_forward)
+        elapsed = time.perf_counter() - start
+        print(
+            f"fast-forwarded {args.fast_forward:.0f} simulated seconds in "
+            f"{elapsed:.3f}s ({spikes} spikes, {spikes / max(elapsed, 1e-9):.0f} spikes/sec)"
+        )
+
+    if args.save:
+        start = time.perf_counter()
+        save_checkpoint(state, args.save)
+        elapsed = time.perf_counter() - start
+        print(f"saved {args.save} in {elapsed * 1000.0:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
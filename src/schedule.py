@@ -0,0 +1,42 @@
+from src.settings import PHASE_PERIODS
+
+
+class PhaseScheduler:
+    """
+    Declares how often each step phase runs.
+
+    A phase with period p visits an item on the steps where
+    step % p == item.index % p, so every step does 1/p of the phase's work
+    instead of all of it on every pth step. Periods can be changed at runtime.
+    """
+
+    def __init__(self, periods: dict[str, int] | None = None) -> None:
+        self.periods = dict(PHASE_PERIODS)
+        if periods:
+            for name, period in periods.items():
+                self.set_period(name, period)
+
+    def set_period(self, name: str, period: int) -> None:
+        if name not in self.periods:
+            raise KeyError(f"unknown phase {name!r}, expected one of {list(self.periods)}")
+        if period < 1:
+            raise ValueError(f"phase period must be >= 1, got {period}")
+        self.periods[name] = int(period)
+
+    def period(self, name: str) -> int:
+        return self.periods[name]
+
+    def select(self, name: str, step: int, items) -> list:
+        """The items due this step out of an iterable of indexed items."""
+        period = self.periods[name]
+        if period == 1:
+            return list(items)
+        offset = step % period
+        return [item for item in items if item.index % period == offset]
+
+    def select_ordered(self, name: str, step: int, items: list) -> list:
+        """select for a list where item.index == position, O(len / period)."""
+        period = self.periods[name]
+        if period == 1:
+            return items
+        return items[step % period :: period]
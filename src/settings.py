@@ -1,13 +1,37 @@
+import os
+from pathlib import Path
+
 import glm
 
 # sim
+# "object" walks Neuron objects, "array" uses the numpy engine, whose activity
+# phase delivers spikes through a CSR adjacency and is the faster of the two
+ENGINE = "object"
 SIMULATION_FPS = 60.0  # 480.0
 SIM_DT = 1.0 / SIMULATION_FPS
 
+# phase -> run every N steps, each item gets an offset so 1/N of the work
+# lands on every step instead of all of it on every Nth step
+PHASE_PERIODS = {
+    "neurons": 8,
+    "hubs": 4,
+    "inputs": 1,
+    "outputs": 1,
+    "activity": 1,
+}
+
 # rendering
 RENDER_FPS = 60.0
 RENDER_INTERVAL = 1.0 / RENDER_FPS
 
+# main loop pacing
+MAX_CATCH_UP_STEPS = 4  # per loop pass and per 1x of warp, the rest is dropped
+TIME_WARPS = (1.0, 4.0, 16.0)  # picked with the 1, 2, 3 keys
+MAX_SPEED_SLICE = 0.5 * RENDER_INTERVAL  # wall-clock seconds of stepping per pass
+
+# threaded stepping, free-threaded builds only
+THREAD_MIN_SHARD = 512  # fewer walkers per thread than this are not worth a task
+
 WINDOW_DIMS = glm.vec2(1600, 800)
 DIMS = WINDOW_DIMS / 2
 
@@ -29,9 +53,29 @@ OUTPUT_MAX_DIST = 2
 NUM_INPUTS = 4
 NUM_OUTPUTS = 4
 
+# seconds a spike takes per grid cell of path past the hub, 0 delivers at once
+CONDUCTION_DELAY = 0.0
+
 NEURON_SATISFACTION_RATIO = (
     0.5  # what fraction of inputs must be connected for the neuron to not move
 )
 HUB_SATISFACTION_RATIO = (
     0.5  # what fraction of outputs must be connected for the hub to not move
 )
+
+# target distribution, built densities are cached here keyed by size, seed, nodes
+DISTRIBUTION_CACHE_DIR = (
+    Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+    / "non-backprop-convergence"
+    / "distributions"
+)
+
+# profiling, P dumps PROFILE_DIR/phases-<step>.json, C captures cProfile for some frames
+PROFILE_WINDOW = 600  # steps the phase percentiles cover
+PROFILE_CAPTURE_FRAMES = 120
+PROFILE_DIR = Path("profiles")
+
+# convergence metrics, the last METRICS_CAPACITY steps are kept, the stats
+# panel plots the last SPARKLINE_POINTS of them
+METRICS_CAPACITY = 3600
+SPARKLINE_POINTS = 240
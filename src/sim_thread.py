@@ -0,0 +1,163 @@
+"""Fixed-timestep simulation loop on a background thread."""
+
+import cProfile
+import math
+import threading
+import time
+
+from src.settings import (
+    MAX_CATCH_UP_STEPS,
+    MAX_SPEED_SLICE,
+    PROFILE_CAPTURE_FRAMES,
+    PROFILE_DIR,
+    RENDER_INTERVAL,
+    SIM_DT,
+    SIMULATION_FPS,
+)
+from src.snapshot import SnapshotBuffer, take_snapshot
+from src.state import State
+from src.step import step_state
+
+
+class SimulationThread(threading.Thread):
+    """
+    Steps the state at SIM_DT against the wall clock and publishes a
+    snapshot into buffer every RENDER_INTERVAL. The state is only ever
+    touched from this thread once it has started, the renderer reads the
+    snapshots, so a slow frame no longer eats into the step budget.
+
+    time_warp scales simulated time against wall time. Catch-up is capped at
+    MAX_CATCH_UP_STEPS per pass (times the warp) and at one RENDER_INTERVAL
+    of wall time, time beyond that is dropped instead of piling up, so a step
+    slower than SIM_DT degrades the rate rather than spiralling. In max_speed
+    mode the loop ignores the clock and steps for MAX_SPEED_SLICE of wall
+    time per pass.
+
+    Profile dumps and cProfile captures are requested from other threads
+    and carried out here between passes, since only this thread may read
+    the state.
+    """
+
+    def __init__(self, state: State, buffer: SnapshotBuffer) -> None:
+        super().__init__(name="simulation", daemon=True)
+        self.state = state
+        self.buffer = buffer
+        self.running = True
+        self.time_warp = 1.0
+        self.max_speed = False
+        self.sim_rate = 0.0
+        self.dropped_steps = 0
+        self.dump_requested = False
+        self.capture_frames = 0
+        self.capture: cProfile.Profile | None = None
+
+    @property
+    def requested_rate(self) -> float:
+        """Steps per second asked for, 0 in max speed mode."""
+        return 0.0 if self.max_speed else SIMULATION_FPS * self.time_warp
+
+    def set_time_warp(self, warp: float) -> None:
+        self.time_warp = warp
+        self.max_speed = False
+
+    def toggle_max_speed(self) -> None:
+        self.max_speed = not self.max_speed
+
+    def request_profile_dump(self) -> None:
+        """Write the phase percentiles and histograms to PROFILE_DIR."""
+        self.dump_requested = True
+
+    def request_capture(self, frames: int = PROFILE_CAPTURE_FRAMES) -> None:
+        """cProfile the stepping for the next frames published snapshots."""
+        if self.capture is None:
+            self.capture_frames = frames
+
+    def service_profiling(self) -> None:
+        state = self.state
+        if self.dump_requested:
+            self.dump_requested = False
+            if state.profiler is not None:
+                PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+                path = PROFILE_DIR / f"phases-{state.step_count}.json"
+                state.profiler.dump(path)
+                print(f"wrote {path}")
+        if self.capture_frames and self.capture is None:
+            self.capture = cProfile.Profile()
+            self.capture.enable()
+
+    def count_capture_frame(self) -> None:
+        if self.capture is None:
+            return
+        self.capture_frames -= 1
+        if self.capture_frames > 0:
+            return
+        self.capture.disable()
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        path = PROFILE_DIR / f"steps-{self.state.step_count}.prof"
+        self.capture.dump_stats(path)
+        self.capture = None
+        print(f"wrote {path}, view with python -m pstats {path}")
+
+    def stop(self) -> None:
+        self.running = False
+        self.join()
+
+    def run(self) -> None:
+        state = self.state
+        accumulator = 0.0
+        last_time = time.perf_counter()
+        last_publish = float("-inf")
+        sim_measure_start = last_time
+        sim_steps = 0
+
+        self.buffer.publish(take_snapshot(state))
+        while self.running:
+            self.service_profiling()
+            current_time = time.perf_counter()
+            elapsed = current_time - last_time
+            last_time = current_time
+
+            if self.max_speed:
+                accumulator = 0.0
+                deadline = current_time + MAX_SPEED_SLICE
+                while time.perf_counter() < deadline:
+                    step_state(state, SIM_DT)
+                    sim_steps += 1
+            else:
+                warp = self.time_warp
+                accumulator += elapsed * warp
+                due = int(accumulator / SIM_DT)
+                cap = min(due, MAX_CATCH_UP_STEPS * math.ceil(warp))
+                deadline = current_time + RENDER_INTERVAL
+                steps = 0
+                while steps < cap:
+                    step_state(state, SIM_DT)
+                    steps += 1
+                    if time.perf_counter() >= deadline:
+                        break
+                # whatever could not be caught up is dropped, not carried
+                self.dropped_steps += due - steps
+                accumulator -= due * SIM_DT
+                sim_steps += steps
+
+            current_time = time.perf_counter()
+            if current_time - sim_measure_start >= 0.5:
+                self.sim_rate = sim_steps / (current_time - sim_measure_start)
+                sim_steps = 0
+                sim_measure_start = current_time
+
+            if current_time - last_publish >= RENDER_INTERVAL:
+                self.buffer.publish(take_snapshot(state, self.sim_rate))
+                last_publish = current_time
+                self.count_capture_frame()
+
+            # wait for the next step, or just yield the GIL to the renderer
+            if self.max_speed:
+                time.sleep(0)
+            else:
+                time.sleep(max(0.0, (SIM_DT - accumulator) / self.time_warp))
+
+        # a capture cut short by stopping is dropped
+        if self.capture is not None:
+            self.capture.disable()
+            self.capture = None
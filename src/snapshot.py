@@ -0,0 +1,118 @@
+"""Immutable copies of the drawable state, handed from the sim to the renderer."""
+
+import threading
+
+import numpy as np
+
+from src.settings import SPARKLINE_POINTS
+from src.state import State
+
+
+class Snapshot:
+    """
+    Positions and signal state at one step, as read-only arrays named like
+    ArrayBrain's. Inputs and outputs are grouped per neuron, so neuron i
+    owns inputs i * num_inputs .. (i + 1) * num_inputs - 1.
+    """
+
+    __slots__ = (
+        "sim_rate",
+        "grid_size",
+        "num_inputs",
+        "num_outputs",
+        "neuron_pos",
+        "hub_pos",
+        "input_pos",
+        "output_pos",
+        "signal_active",
+        "signal_pos",
+        "target_distribution_surface",
+        "phase_percentiles",
+        "metrics",
+    )
+
+
+def take_snapshot(state: State, sim_rate: float = 0.0) -> Snapshot:
+    """Copy what draw needs out of the state, O(neurons + terminals)."""
+    snapshot = Snapshot()
+    snapshot.sim_rate = sim_rate
+    snapshot.grid_size = state.config.grid_size
+    # built once at startup and never drawn into, so sharing it is safe
+    snapshot.target_distribution_surface = state.target_distribution_surface
+    # (p50, p99) ms per step phase, None when the state is not profiled
+    profiler = state.profiler
+    snapshot.phase_percentiles = profiler.percentiles() if profiler is not None else None
+    # (steps, len(METRICS)) recent metrics, oldest first, None when not recorded
+    history = state.metrics
+    snapshot.metrics = history.recent(SPARKLINE_POINTS) if history is not None else None
+
+    brain = state.arrays
+    if brain is not None:
+        snapshot.num_inputs = brain.num_inputs
+        snapshot.num_outputs = brain.num_outputs
+        snapshot.neuron_pos = brain.neuron_pos.copy()
+        snapshot.hub_pos = brain.hub_pos.copy()
+        snapshot.input_pos = brain.input_pos.copy()
+        snapshot.output_pos = brain.output_pos.copy()
+        snapshot.signal_active = brain.signal_active.copy()
+        snapshot.signal_pos = brain.signal_pos.copy()
+    else:
+        neurons = state.neurons
+        inputs = [input for neuron in neurons for input in neuron.inputs]
+        outputs = [output for neuron in neurons for output in neuron.outputs]
+        snapshot.num_inputs = len(neurons[0].inputs) if neurons else 0
+        snapshot.num_outputs = len(neurons[0].outputs) if neurons else 0
+        snapshot.neuron_pos = np.array(
+            [(n.x, n.y) for n in neurons], dtype=np.int32
+        ).reshape(-1, 2)
+        snapshot.hub_pos = np.array(
+            [(n.hub_x, n.hub_y) for n in neurons], dtype=np.int32
+        ).reshape(-1, 2)
+        snapshot.input_pos = np.array(
+            [(i.x, i.y) for i in inputs], dtype=np.int32
+        ).reshape(-1, 2)
+        snapshot.output_pos = np.array(
+            [(o.x, o.y) for o in outputs], dtype=np.int32
+        ).reshape(-1, 2)
+        snapshot.signal_active = np.array(
+            [n.signal_active for n in neurons], dtype=bool
+        )
+        snapshot.signal_pos = np.array(
+            [n.signal_pos for n in neurons], dtype=np.float32
+        )
+
+    for name in (
+        "neuron_pos",
+        "hub_pos",
+        "input_pos",
+        "output_pos",
+        "signal_active",
+        "signal_pos",
+    ):
+        getattr(snapshot, name).flags.writeable = False
+    return snapshot
+
+
+class SnapshotBuffer:
+    """
+    Double buffer between the sim thread and the render thread. The sim
+    fills the back slot and flips, the renderer always reads the front slot,
+    so neither side waits on the other for longer than the flip.
+    """
+
+    def __init__(self) -> None:
+        self.slots: list[Snapshot | None] = [None, None]
+        self.front = 0
+        self.version = 0
+        self.lock = threading.Lock()
+
+    def publish(self, snapshot: Snapshot) -> None:
+        back = 1 - self.front
+        self.slots[back] = snapshot
+        with self.lock:
+            self.front = back
+            self.version += 1
+
+    def latest(self) -> Snapshot | None:
+        with self.lock:
+            return self.slots[self.front]
@@ -1,60 +1,105 @@
-import random
-from typing import Tuple
+from typing import TYPE_CHECKING
 
 import glm
 import numpy as np
-import pygame
 
 from src.brain import Input, Neuron, Output
+from src.config import SimConfig
+from src.grid_index import GridIndex
+from src.log_format import INPUT_MOVE, OUTPUT_MOVE
+from src.schedule import PhaseScheduler
+
+if TYPE_CHECKING:
+    import pygame
 
 
 class State:
-    def __init__(self):
+    def __init__(self, config: SimConfig | None = None):
+        # sizes, reaches and rates, read by init, step and draw
+        self.config = config if config is not None else SimConfig()
+
         self.step_count = 0
         self.time = 0.0
+        self.spike_count = 0
 
         self.neurons = []
+        self.scheduler = PhaseScheduler()
         self.env = None
         self.loss = 0.0
         self.target_distribution = None
-        self.target_distribution_surface: pygame.Surface | None = None
+        self.target_sampler = None
+        self.target_distribution_surface: "pygame.Surface | None" = None
 
-        self.input_pos_lookup: dict[Tuple[int, int], list[Input]] = {}
-        self.output_pos_lookup: dict[Tuple[int, int], list[Output]] = {}
+        # reseeded by init_brain / init_array_brain, children via spawn_rngs
+        self.seed_sequence = np.random.SeedSequence()
+        self.rng = np.random.default_rng(self.seed_sequence)
 
+        self.input_pos_lookup = GridIndex(self.config.grid_size)
+        self.output_pos_lookup = GridIndex(self.config.grid_size)
 
-# make non method versions
-def move_input(state: State, input: Input, new_pos: glm.ivec2):
-    old_key = (input.pos.x, input.pos.y)
-    new_key = (new_pos.x, new_pos.y)
+        # the unsettled population, insertion-ordered dicts used as sets so
+        # iteration stays deterministic. kept current by connect / disconnect
+        self.active_inputs: dict[Input, None] = {}
+        self.active_outputs: dict[Output, None] = {}
+        self.unsatisfied_neurons: dict[Neuron, None] = {}
+        self.unsatisfied_hubs: dict[Neuron, None] = {}
 
-    if old_key in state.input_pos_lookup:
-        bucket = state.input_pos_lookup[old_key]
-        if input in bucket:
-            bucket.remove(input)
-            if not bucket:
-                del state.input_pos_lookup[old_key]
+        # global convergence counters, updated in O(1) per connect / disconnect
+        self.connected_inputs = 0
+        self.connected_outputs = 0
+        self.satisfied_neurons = 0
+        self.satisfied_hubs = 0
+        self.connection_changes = 0
+        self.moves = 0  # neuron, hub and terminal position changes
 
-    input.pos = new_pos
+        # set by init_array_brain when running the array engine
+        self.arrays = None
 
-    if new_key not in state.input_pos_lookup:
-        state.input_pos_lookup[new_key] = []
-    state.input_pos_lookup[new_key].append(input)
+        # set by enable_event_activity to replace fixed-dt activity updates
+        self.event_activity = None
 
+        # set by enable_conduction_delay to deliver spikes after their path length
+        self.conduction = None
 
-def move_output(state: State, output: Output, new_pos: glm.ivec2):
-    old_key = (output.pos.x, output.pos.y)
-    new_key = (new_pos.x, new_pos.y)
+        # set by start_recording to log every structural change and spike
+        self.recorder = None
+
+        # set by start_threads to work out the object engine's moves on a pool
+        self.threads = None
 
-    if old_key in state.output_pos_lookup:
-        bucket = state.output_pos_lookup[old_key]
-        if output in bucket:
-            bucket.remove(output)
-            if not bucket:
-                del state.output_pos_lookup[old_key]
+        # set by start_profiling to time every phase of step_state
+        self.profiler = None
 
-    output.pos = new_pos
+        # set by start_metrics to keep a ring of per-step convergence metrics
+        self.metrics = None
 
-    if new_key not in state.output_pos_lookup:
-        state.output_pos_lookup[new_key] = []
-    state.output_pos_lookup[new_key].append(output)
+
+# make non method versions
+def move_input(state: State, input: Input, new_pos: glm.ivec2):
+    move_input_xy(state, input, new_pos.x, new_pos.y)
+
+
+def move_output(state: State, output: Output, new_pos: glm.ivec2):
+    move_output_xy(state, output, new_pos.x, new_pos.y)
+
+
+def move_input_xy(state: State, input: Input, x: int, y: int):
+    input.x = x
+    input.y = y
+    state.moves += 1
+    lookup = state.input_pos_lookup
+    cell = lookup.cell_of(x, y)
+    lookup.move(input, cell)
+    if state.recorder is not None:
+        state.recorder.records.extend((INPUT_MOVE, input.index, cell))
+
+
+def move_output_xy(state: State, output: Output, x: int, y: int):
+    output.x = x
+    output.y = y
+    state.moves += 1
+    lookup = state.output_pos_lookup
+    cell = lookup.cell_of(x, y)
+    lookup.move(output, cell)
+    if state.recorder is not None:
+        state.recorder.records.extend((OUTPUT_MOVE, output.index, cell))
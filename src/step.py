@@ -1,57 +1,264 @@
-import random
-import glm
+from time import perf_counter_ns
 
+from src.array_step import step_array_state
 from src.brain import Input, Neuron, Output
-from src.state import State, move_input, move_output
-from src.settings import (
-    GRID_SIZE,
-    INPUT_MAX_DIST,
-    OUTPUT_MAX_DIST,
-    HUB_MAX_DIST,
-    SIGNAL_SPEED,
-    NEURON_SATISFACTION_RATIO,
-    HUB_SATISFACTION_RATIO,
+from src.log_format import (
+    CONNECT,
+    DISCONNECT,
+    HUB_MOVE,
+    INPUT_MOVE,
+    NEURON_MOVE,
+    OUTPUT_MOVE,
 )
+from src.state import State, move_input_xy, move_output_xy
+from src.utils import clamp_coord
 
 
 def step_state(state: State, dt: float) -> None:
     """Advance simulation time and bookkeeping."""
     state.step_count += 1
     state.time += dt
-    move_neurons_this_frame = state.step_count % 8 == 0
-    move_hubs_this_frame = state.step_count % 4 == 0
+    profiler = state.profiler
+    if profiler is not None:
+        profiler.begin_step()
+    if state.arrays is not None:
+        step_array_state(state, dt)
+        finish_step(state, dt)
+        return
+
+    migrate_neurons(state)
+    if profiler is not None:
+        profiler.lap("neurons")
+    migrate_hubs(state)
+    if profiler is not None:
+        profiler.lap("hubs")
+    migrate_inputs(state)
+    if profiler is not None:
+        profiler.lap("inputs")
+    migrate_outputs(state)
+    if profiler is not None:
+        profiler.lap("outputs")
+
+    recorder = state.recorder
+    spikes = recorder.spikes if recorder is not None else None
+    if state.event_activity is not None:
+        state.spike_count += state.event_activity.advance(state.time, spikes)
+    else:
+        state.spike_count += update_activity_phase(state, dt, spikes)
+    if recorder is not None:
+        recorder.end_step(state)
+    if profiler is not None:
+        profiler.lap("activity")
+    finish_step(state, dt)
+
+
+def finish_step(state: State, dt: float) -> None:
+    if state.metrics is not None:
+        state.metrics.record(state, dt)
+    if state.profiler is not None:
+        state.profiler.end_step()
+
+
+def random_steps(state: State, count: int) -> list[int]:
+    """
+    One batched draw of count (dx, dy) steps in -1..1 from the state's own
+    generator, flattened as [dx0, dy0, dx1, dy1, ...].
+    """
+    return state.rng.integers(-1, 2, size=2 * count).tolist()
+
+
+def update_activity_phase(
+    state: State, dt: float, spikes: list[int] | None = None
+) -> int:
+    """Activity for the neurons due this step, each covering its whole period."""
+    period = state.scheduler.period("activity")
+    neurons = state.scheduler.select_ordered("activity", state.step_count, state.neurons)
+    conduction = state.conduction
+    if conduction is None:
+        return update_neuron_activity(
+            neurons, dt * period, state.config.signal_speed, spikes
+        )
+    # deliveries due this step land before anything integrates
+    fired = conduction.deliver(dt, spikes)
+    return fired + update_neuron_activity(
+        neurons, dt * period, state.config.signal_speed, spikes, conduction
+    )
+
+
+def migrate_neurons(state: State) -> None:
+    walkers = state.scheduler.select("neurons", state.step_count, state.unsatisfied_neurons)
+    steps = iter(random_steps(state, len(walkers)))
+    for neuron, step_x, step_y in zip(walkers, steps, steps):
+        migrate_neuron(state, neuron, step_x, step_y)
+
+
+def migrate_hubs(state: State) -> None:
+    walkers = state.scheduler.select("hubs", state.step_count, state.unsatisfied_hubs)
+    steps = iter(random_steps(state, len(walkers)))
+    for neuron, step_x, step_y in zip(walkers, steps, steps):
+        migrate_hub(state, neuron, step_x, step_y)
+
+
+def migrate_inputs(state: State) -> None:
+    walkers = state.scheduler.select("inputs", state.step_count, state.active_inputs)
+    steps = random_steps(state, len(walkers))
+    if state.threads is not None:
+        state.threads.migrate(
+            state, walkers, steps, input_targets, place_inputs, finish_input_move
+        )
+        return
+    steps = iter(steps)
+    for input, step_x, step_y in zip(walkers, steps, steps):
+        migrate_input(state, input, step_x, step_y)
 
-    for neuron in state.neurons:
-        if move_neurons_this_frame:
-            migrate_neuron(state, neuron)
-        if move_hubs_this_frame:
-            migrate_hub(state, neuron)
-        for input in neuron.inputs:
-            migrate_input(state, input)
-        for output in neuron.outputs:
-            migrate_output(state, output)
 
-    update_neuron_activity(state.neurons, dt)
+def migrate_outputs(state: State) -> None:
+    walkers = state.scheduler.select("outputs", state.step_count, state.active_outputs)
+    steps = random_steps(state, len(walkers))
+    if state.threads is not None:
+        state.threads.migrate(
+            state, walkers, steps, output_targets, place_outputs, finish_output_move
+        )
+        return
+    steps = iter(steps)
+    for output, step_x, step_y in zip(walkers, steps, steps):
+        migrate_output(state, output, step_x, step_y)
+
+
+def input_targets(
+    state: State, walkers: list[Input], steps: list[int]
+) -> list[tuple[Input, int, int]]:
+    """(input, x, y) for each walker migrate_input would move, in order."""
+    targets = []
+    steps = iter(steps)
+    for input, step_x, step_y in zip(walkers, steps, steps):
+        target = input_target(state, input, step_x, step_y)
+        if target is not None:
+            targets.append((input, *target))
+    return targets
+
+
+def output_targets(
+    state: State, walkers: list[Output], steps: list[int]
+) -> list[tuple[Output, int, int]]:
+    """(output, x, y) for each walker migrate_output would move, in order."""
+    targets = []
+    steps = iter(steps)
+    for output, step_x, step_y in zip(walkers, steps, steps):
+        target = output_target(state, output, step_x, step_y)
+        if target is not None:
+            targets.append((output, *target))
+    return targets
+
+
+def place_inputs(
+    state: State, moves: list[tuple[Input, int, int]]
+) -> list[Output | None]:
+    """
+    The cell half of migrate_input for each (input, x, y): move it in the
+    grid index and link it to the first free output of its new cell. Only
+    the cells it leaves and enters are written, so ThreadedStepper runs the
+    moves of disjoint regions at once. Returns the output each input linked
+    to, or None, for finish_input_move to count in walker order.
+    """
+    input_lookup = state.input_pos_lookup
+    output_lookup = state.output_pos_lookup
+    partners = []
+    for input, x, y in moves:
+        input.x = x
+        input.y = y
+        cell = input_lookup.cell_of(x, y)
+        input_lookup.move(input, cell)
+        output = output_lookup.first_free(cell)
+        if output is not None and output.parent_neuron is not input.parent_neuron:
+            link_input_output(state, input, output)
+        else:
+            output = None
+        partners.append(output)
+    return partners
+
+
+def place_outputs(
+    state: State, moves: list[tuple[Output, int, int]]
+) -> list[Input | None]:
+    """place_inputs for outputs, linking each to a free input of its new cell."""
+    input_lookup = state.input_pos_lookup
+    output_lookup = state.output_pos_lookup
+    partners = []
+    for output, x, y in moves:
+        output.x = x
+        output.y = y
+        cell = output_lookup.cell_of(x, y)
+        output_lookup.move(output, cell)
+        input = input_lookup.first_free(cell)
+        if input is not None and input.parent_neuron is not output.parent_neuron:
+            link_input_output(state, input, output)
+        else:
+            input = None
+        partners.append(input)
+    return partners
+
+
+def finish_input_move(state: State, input: Input, output: Output | None) -> None:
+    """The shared half of a move placed by place_inputs."""
+    state.moves += 1
+    if state.recorder is not None:
+        state.recorder.records.extend((INPUT_MOVE, input.index, input.cell))
+    if output is not None:
+        timed_register_connection(state, input, output)
+
+
+def finish_output_move(state: State, output: Output, input: Input | None) -> None:
+    """The shared half of a move placed by place_outputs."""
+    state.moves += 1
+    if state.recorder is not None:
+        state.recorder.records.extend((OUTPUT_MOVE, output.index, output.cell))
+    if input is not None:
+        timed_register_connection(state, input, output)
+
+
+def timed_register_connection(state: State, input: Input, output: Output) -> None:
+    """
+    register_connection, timed into the profiler's connect time like
+    attempt_connect_input. The link itself was made by place_inputs or
+    place_outputs on a worker thread and is left untimed there, since
+    concurrent workers' times would overlap.
+    """
+    profiler = state.profiler
+    if profiler is None:
+        register_connection(state, input, output)
+        return
+    start = perf_counter_ns()
+    register_connection(state, input, output)
+    profiler.connect_ns += perf_counter_ns() - start
 
 
 def clamp_charge(amount: float) -> float:
     return max(0.0, min(1.0, amount))
 
 
-def maybe_start_signal(neuron: Neuron):
+def maybe_start_signal(neuron: Neuron) -> bool:
+    """Start a signal if the neuron crossed threshold, returns whether it fired."""
     if neuron.signal_active:
-        return
+        return False
     if neuron.charge >= 1.0:
         neuron.charge = 0.0
         neuron.signal_active = True
         neuron.signal_pos = 0.0
+        return True
+    return False
 
 
 def signal_transfer_amount(input: Input, output: Output) -> float:
     return clamp_charge(1.0 * input.weight * output.weight)
 
 
-def dispatch_signal(neuron: Neuron):
+def dispatch_signal(neuron: Neuron, spikes: list[int] | None = None) -> int:
+    """
+    Deliver the neuron's signal, returns how many targets fired from it.
+    Indices of the neurons that fired are appended to spikes if given.
+    """
+    fired = 0
     for output in neuron.outputs:
         connected_input = output.connected_input
         if not connected_input:
@@ -65,67 +272,60 @@ def dispatch_signal(neuron: Neuron):
             continue
 
         target_neuron.charge = clamp_charge(target_neuron.charge + transfer)
-        maybe_start_signal(target_neuron)
-
-
-def update_neuron_activity(neurons, dt: float) -> None:
+        if maybe_start_signal(target_neuron):
+            fired += 1
+            if spikes is not None:
+                spikes.append(target_neuron.index)
+    return fired
+
+
+def update_neuron_activity(
+    neurons,
+    dt: float,
+    signal_speed: float,
+    spikes: list[int] | None = None,
+    conduction=None,
+) -> int:
+    """
+    Integrate charge and signals, returns the number of spikes fired.
+    Indices of the neurons that fired are appended to spikes if given.
+    Signals reaching the hub go through conduction when given, delivered
+    after their path length instead of at once. Delivery walks each firing
+    neuron's outputs, the array engine's update_activity does the same in
+    bulk through its CSR adjacency.
+    """
+    fired = 0
+    distance = signal_speed * dt
     for neuron in neurons:
         if neuron.signal_active:
-            neuron.signal_pos += SIGNAL_SPEED * dt
+            neuron.signal_pos += distance
             if neuron.signal_pos >= 1.0:
                 neuron.signal_pos = 0.0
                 neuron.signal_active = False
-                dispatch_signal(neuron)
+                if conduction is not None:
+                    fired += conduction.dispatch(neuron, spikes)
+                else:
+                    fired += dispatch_signal(neuron, spikes)
         else:
             neuron.charge += neuron.charge_rate * dt
-            maybe_start_signal(neuron)
-
-
-# return an ivec2 of -1, 0, or +1 added to x and y of pos
-def random_step() -> glm.ivec2:
-    delta_x = random.randint(-1, 1)
-    delta_y = random.randint(-1, 1)
-    return glm.ivec2(delta_x, delta_y)
-
+            if maybe_start_signal(neuron):
+                fired += 1
+                if spikes is not None:
+                    spikes.append(neuron.index)
+    return fired
+
+
+def clamp_xy_to_taxicab(
+    x: int, y: int, center_x: int, center_y: int, max_dist: int, grid_size: int
+) -> tuple[int, int]:
+    """Clamp x, y to grid and within an L1 neighborhood of center, as ints."""
+    x = clamp_coord(x, grid_size)
+    y = clamp_coord(y, grid_size)
+    dx = x - center_x
+    dy = y - center_y
+    if abs(dx) + abs(dy) <= max_dist:
+        return x, y
 
-# return a nearby position within 1 unit in x and y, unclamped
-def nearby(pos: glm.ivec2) -> glm.ivec2:
-    delta = random_step()
-    return glm.ivec2(pos.x + delta.x, pos.y + delta.y)
-
-
-def roam(pos: glm.ivec2) -> glm.ivec2:
-    new_pos = nearby(pos)
-
-    # Clamp to grid
-    lower = 0
-    upper = State.GRID_SIZE - 1
-    clamped_pos = glm.ivec2(
-        max(lower, min(upper, new_pos.x)),
-        max(lower, min(upper, new_pos.y)),
-    )
-    return clamped_pos
-
-
-def clamp_to_grid(point: glm.ivec2) -> glm.ivec2:
-    lower = 0
-    upper = GRID_SIZE - 1
-    return glm.ivec2(
-        max(lower, min(upper, point.x)),
-        max(lower, min(upper, point.y)),
-    )
-
-
-def clamp_to_taxicab_neighborhood(
-    point: glm.ivec2, center: glm.ivec2 | None, max_dist: int
-) -> glm.ivec2:
-    """Clamp point to grid and within an L1 neighborhood of center."""
-    clamped = clamp_to_grid(point)
-    if center is None:
-        return clamped
-
-    dx = clamped.x - center.x
-    dy = clamped.y - center.y
     while abs(dx) + abs(dy) > max_dist:
         if abs(dx) >= abs(dy) and dx != 0:
             dx -= 1 if dx > 0 else -1
@@ -133,23 +333,22 @@ def clamp_to_taxicab_neighborhood(
             dy -= 1 if dy > 0 else -1
         else:
             break
-    return clamp_to_grid(glm.ivec2(center.x + dx, center.y + dy))
+    return clamp_coord(center_x + dx, grid_size), clamp_coord(center_y + dy, grid_size)
 
 
 def pull_outputs_toward_hub(state: State, neuron: Neuron):
     """Ensure outputs remain within their allowed radius when the hub moves."""
-    hub_center = neuron.hub_pos
-    if hub_center is None:
-        return
+    hub_x = neuron.hub_x
+    hub_y = neuron.hub_y
+    max_dist = state.config.output_max_dist
+    grid_size = state.config.grid_size
 
     for output in neuron.outputs:
-        new_pos = clamp_to_taxicab_neighborhood(
-            glm.ivec2(output.pos.x, output.pos.y), hub_center, OUTPUT_MAX_DIST
-        )
-        if new_pos != output.pos:
+        x, y = clamp_xy_to_taxicab(output.x, output.y, hub_x, hub_y, max_dist, grid_size)
+        if x != output.x or y != output.y:
             if output.connected_input:
-                disconnect_input_output(output.connected_input, output)
-            move_output(state, output, new_pos)
+                disconnect_input_output(state, output.connected_input, output)
+            move_output_xy(state, output, x, y)
             attempt_connect_output(state, output)
 
 
@@ -162,190 +361,301 @@ clamp the neuron position to be within the grid
 """
 
 
-def migrate_neuron(state: State, neuron: Neuron):
+def migrate_neuron(state: State, neuron: Neuron, step_x: int, step_y: int):
     if neuron.satisfied:
         return
 
-    step = random_step()
-    if step.x == 0 and step.y == 0:
+    if step_x == 0 and step_y == 0:
         return  # no movement
 
-    maybe_new_pos = glm.ivec2(neuron.pos.x + step.x, neuron.pos.y + step.y)
-    maybe_new_pos = clamp_to_grid(maybe_new_pos)
-    if maybe_new_pos == neuron.pos:
+    config = state.config
+    grid_size = config.grid_size
+    input_max_dist = config.input_max_dist
+    new_x = clamp_coord(neuron.x + step_x, grid_size)
+    new_y = clamp_coord(neuron.y + step_y, grid_size)
+    if new_x == neuron.x and new_y == neuron.y:
         return  # no movement
 
-    neuron.pos = maybe_new_pos
+    neuron.x = new_x
+    neuron.y = new_y
+    state.moves += 1
+    if state.recorder is not None:
+        cell = state.input_pos_lookup.cell_of(new_x, new_y)
+        state.recorder.records.extend((NEURON_MOVE, neuron.index, cell))
 
     # check if inputs are too far from neuron / new york distance
     for input in neuron.inputs:
-        moved_x = False
-        moved_y = False
-        new_x = input.pos.x
-        new_y = input.pos.y
+        moved = False
+        input_x = input.x
+        input_y = input.y
 
         # check if input is too far in x direction
-        x_dist = abs(input.pos.x - neuron.pos.x)
-        if x_dist > INPUT_MAX_DIST:
+        if abs(input.x - new_x) > input_max_dist:
             # shift the input by the x step direction
-            new_x = input.pos.x + step.x
-            moved_x = True
-            # if the neron was connected before, it should be disconnected.
-            if input.connected_output:
-                disconnect_input_output(input, input.connected_output)
+            input_x = input.x + step_x
+            moved = True
 
         # check if input is too far in y direction
-        y_dist = abs(input.pos.y - neuron.pos.y)
-        if y_dist > INPUT_MAX_DIST:
+        if abs(input.y - new_y) > input_max_dist:
             # shift the input by the y step direction
-            new_y = input.pos.y + step.y
-            moved_y = True
+            input_y = input.y + step_y
+            moved = True
+
+        if moved:
             # if the neron was connected before, it should be disconnected.
             if input.connected_output:
-                disconnect_input_output(input, input.connected_output)
-
-        if moved_x or moved_y:
-            target_pos = clamp_to_taxicab_neighborhood(
-                glm.ivec2(new_x, new_y), neuron.pos, INPUT_MAX_DIST
+                disconnect_input_output(state, input, input.connected_output)
+            input_x, input_y = clamp_xy_to_taxicab(
+                input_x, input_y, new_x, new_y, input_max_dist, grid_size
             )
-            move_input(state, input, target_pos)
+            move_input_xy(state, input, input_x, input_y)
             attempt_connect_input(state, input)
 
     # ensure hub stays within allowed distance after the neuron moves
-    hub_pos = neuron.hub_pos
-    clamped_hub = clamp_to_taxicab_neighborhood(
-        glm.ivec2(hub_pos.x, hub_pos.y), neuron.pos, HUB_MAX_DIST
+    hub_x, hub_y = clamp_xy_to_taxicab(
+        neuron.hub_x, neuron.hub_y, new_x, new_y, config.hub_max_dist, grid_size
     )
-    if clamped_hub != hub_pos:
-        neuron.hub_pos = clamped_hub
+    if hub_x != neuron.hub_x or hub_y != neuron.hub_y:
+        move_hub_xy(state, neuron, hub_x, hub_y)
         pull_outputs_toward_hub(state, neuron)
 
 
-def migrate_input(state: State, input):
+def migrate_input(state: State, input, step_x: int, step_y: int):
     """
     just like migrate neuron, except satisfied status is just whether the input is connected to an output
     """
+    target = input_target(state, input, step_x, step_y)
+    if target is None:
+        return
 
+    # we do not have to check if we broke a connection since we dont migrate if connected
+    move_input_xy(state, input, *target)
+    attempt_connect_input(state, input)
+
+
+def input_target(
+    state: State, input: Input, step_x: int, step_y: int
+) -> tuple[int, int] | None:
+    """
+    Where migrate_input moves the input, None if it stays. Reads only the
+    input and its neuron, which no other input's move touches, so the
+    targets of a whole phase can be worked out at once.
+    """
     if input.connected_output:
-        return
+        return None
 
-    step = random_step()
-    if step.x == 0 and step.y == 0:
-        return  # no movement
+    if step_x == 0 and step_y == 0:
+        return None  # no movement
 
-    maybe_new_pos = glm.ivec2(input.pos.x + step.x, input.pos.y + step.y)
+    grid_size = state.config.grid_size
     parent_neuron = input.parent_neuron
-    center = parent_neuron.pos if parent_neuron else None
-    maybe_new_pos = clamp_to_taxicab_neighborhood(maybe_new_pos, center, INPUT_MAX_DIST)
-    if maybe_new_pos == input.pos:
-        return  # no movement
-
-    # we do not have to check if we broke a connection since we dont migrate if connected
-    move_input(state, input, maybe_new_pos)
-    attempt_connect_input(state, input)
+    if parent_neuron:
+        new_x, new_y = clamp_xy_to_taxicab(
+            input.x + step_x,
+            input.y + step_y,
+            parent_neuron.x,
+            parent_neuron.y,
+            state.config.input_max_dist,
+            grid_size,
+        )
+    else:
+        new_x = clamp_coord(input.x + step_x, grid_size)
+        new_y = clamp_coord(input.y + step_y, grid_size)
+    if new_x == input.x and new_y == input.y:
+        return None  # no movement
+    return new_x, new_y
 
 
-def migrate_hub(state: State, neuron: Neuron):
+def migrate_hub(state: State, neuron: Neuron, step_x: int, step_y: int):
     """Randomly walk hubs while keeping them near their neuron."""
     if neuron.hub_satisfied:
         return
 
-    step = random_step()
-    if step.x == 0 and step.y == 0:
+    if step_x == 0 and step_y == 0:
         return
 
-    maybe_new_pos = glm.ivec2(neuron.hub_pos.x + step.x, neuron.hub_pos.y + step.y)
-    maybe_new_pos = clamp_to_taxicab_neighborhood(
-        maybe_new_pos, neuron.pos, HUB_MAX_DIST
+    new_x, new_y = clamp_xy_to_taxicab(
+        neuron.hub_x + step_x,
+        neuron.hub_y + step_y,
+        neuron.x,
+        neuron.y,
+        state.config.hub_max_dist,
+        state.config.grid_size,
     )
-
-    if maybe_new_pos == neuron.hub_pos:
+    if new_x == neuron.hub_x and new_y == neuron.hub_y:
         return
 
-    neuron.hub_pos = maybe_new_pos
+    move_hub_xy(state, neuron, new_x, new_y)
     pull_outputs_toward_hub(state, neuron)
 
 
-def migrate_output(state: State, output):
+def move_hub_xy(state: State, neuron: Neuron, x: int, y: int):
+    neuron.hub_x = x
+    neuron.hub_y = y
+    state.moves += 1
+    if state.recorder is not None:
+        cell = state.output_pos_lookup.cell_of(x, y)
+        state.recorder.records.extend((HUB_MOVE, neuron.index, cell))
+
+
+def migrate_output(state: State, output, step_x: int, step_y: int):
     """
     just like migrate neuron, except satisfied status is just whether the output is connected to an input
     """
+    target = output_target(state, output, step_x, step_y)
+    if target is None:
+        return
+
+    # we do not have to check if we broke a connection since we dont migrate if connected
+    move_output_xy(state, output, *target)
+    attempt_connect_output(state, output)
 
+
+def output_target(
+    state: State, output: Output, step_x: int, step_y: int
+) -> tuple[int, int] | None:
+    """Where migrate_output moves the output, None if it stays, see input_target."""
     if output.connected_input:
-        return
+        return None
 
-    step = random_step()
-    if step.x == 0 and step.y == 0:
-        return  # no movement
+    if step_x == 0 and step_y == 0:
+        return None  # no movement
 
-    maybe_new_pos = glm.ivec2(output.pos.x + step.x, output.pos.y + step.y)
+    grid_size = state.config.grid_size
     parent_neuron = output.parent_neuron
-    hub_center = parent_neuron.hub_pos if parent_neuron else None
-    maybe_new_pos = clamp_to_taxicab_neighborhood(
-        maybe_new_pos, hub_center, OUTPUT_MAX_DIST
-    )
-    if maybe_new_pos == output.pos:
-        return  # no movement
-
-    # we do not have to check if we broke a connection since we dont migrate if connected
-    move_output(state, output, maybe_new_pos)
-    attempt_connect_output(state, output)
+    if parent_neuron:
+        new_x, new_y = clamp_xy_to_taxicab(
+            output.x + step_x,
+            output.y + step_y,
+            parent_neuron.hub_x,
+            parent_neuron.hub_y,
+            state.config.output_max_dist,
+            grid_size,
+        )
+    else:
+        new_x = clamp_coord(output.x + step_x, grid_size)
+        new_y = clamp_coord(output.y + step_y, grid_size)
+    if new_x == output.x and new_y == output.y:
+        return None  # no movement
+    return new_x, new_y
 
 
-def set_neuron_satisfaction(neuron: Neuron):
+def set_neuron_satisfaction(state: State, neuron: Neuron):
     """Set the satisfied status of the neuron based on its connections."""
 
-    connected_inputs = sum(1 for input in neuron.inputs if input.connected_output)
     total_inputs = len(neuron.inputs)
     neuron.satisfied = (
-        connected_inputs / total_inputs >= NEURON_SATISFACTION_RATIO
+        neuron.connected_input_count / total_inputs
+        >= state.config.neuron_satisfaction_ratio
         if total_inputs > 0
         else True
     )
 
 
-def set_hub_satisfaction(neuron: Neuron):
+def set_hub_satisfaction(state: State, neuron: Neuron):
     """Set the satisfied status of the neuron hub based on its connections."""
 
-    connected_outputs = sum(1 for output in neuron.outputs if output.connected_input)
     total_outputs = len(neuron.outputs)
     neuron.hub_satisfied = (
-        connected_outputs / total_outputs >= HUB_SATISFACTION_RATIO
+        neuron.connected_output_count / total_outputs
+        >= state.config.hub_satisfaction_ratio
         if total_outputs > 0
         else True
     )
 
 
-def connect_input_output(input: Input, output: Output):
+def update_active_sets(state: State, neuron: Neuron):
+    """
+    Keep the neuron's membership in the unsatisfied sets current, and the
+    global satisfied totals with it.
+    """
+    unsatisfied_neurons = state.unsatisfied_neurons
+    if neuron.satisfied:
+        if neuron in unsatisfied_neurons:
+            del unsatisfied_neurons[neuron]
+            state.satisfied_neurons += 1
+    elif neuron not in unsatisfied_neurons:
+        unsatisfied_neurons[neuron] = None
+        state.satisfied_neurons -= 1
+
+    unsatisfied_hubs = state.unsatisfied_hubs
+    if neuron.hub_satisfied:
+        if neuron in unsatisfied_hubs:
+            del unsatisfied_hubs[neuron]
+            state.satisfied_hubs += 1
+    elif neuron not in unsatisfied_hubs:
+        unsatisfied_hubs[neuron] = None
+        state.satisfied_hubs -= 1
+
+
+def connect_input_output(state: State, input: Input, output: Output):
     """Connect the given input and output and update satisfaction."""
     if input.connected_output or output.connected_input:
         return
     if input.parent_neuron is output.parent_neuron:
         return
 
+    link_input_output(state, input, output)
+    register_connection(state, input, output)
+
+
+def link_input_output(state: State, input: Input, output: Output):
+    """The terminals and grid index cell of a connect, nothing shared."""
     input.connected_output = output
     output.connected_input = input
+    state.input_pos_lookup.mark_bound(input)
+    state.output_pos_lookup.mark_bound(output)
+
+
+def register_connection(state: State, input: Input, output: Output):
+    """Active sets, counters and satisfaction for a pair link_input_output joined."""
+    state.active_inputs.pop(input, None)
+    state.active_outputs.pop(output, None)
+    state.connected_inputs += 1
+    state.connected_outputs += 1
+    state.connection_changes += 1
+    if state.recorder is not None:
+        state.recorder.records.extend((CONNECT, input.index, output.index))
 
     if input.parent_neuron:
-        set_neuron_satisfaction(input.parent_neuron)
+        input.parent_neuron.connected_input_count += 1
+        set_neuron_satisfaction(state, input.parent_neuron)
+        update_active_sets(state, input.parent_neuron)
     if output.parent_neuron:
-        set_hub_satisfaction(output.parent_neuron)
+        output.parent_neuron.connected_output_count += 1
+        set_hub_satisfaction(state, output.parent_neuron)
+        update_active_sets(state, output.parent_neuron)
 
 
-def disconnect_input_output(input: Input | None, output: Output | None):
+def disconnect_input_output(state: State, input: Input | None, output: Output | None):
     """Disconnect the given input/output pair and update satisfaction."""
     if not input or not output:
         return
 
     if input.connected_output is output:
         input.connected_output = None
+        state.input_pos_lookup.mark_free(input)
+        state.active_inputs[input] = None
+        state.connected_inputs -= 1
+        if input.parent_neuron:
+            input.parent_neuron.connected_input_count -= 1
     if output.connected_input is input:
         output.connected_input = None
+        state.output_pos_lookup.mark_free(output)
+        state.active_outputs[output] = None
+        state.connected_outputs -= 1
+        if output.parent_neuron:
+            output.parent_neuron.connected_output_count -= 1
+    state.connection_changes += 1
+    if state.recorder is not None:
+        state.recorder.records.extend((DISCONNECT, input.index, output.index))
 
     if input.parent_neuron:
-        set_neuron_satisfaction(input.parent_neuron)
+        set_neuron_satisfaction(state, input.parent_neuron)
+        update_active_sets(state, input.parent_neuron)
     if output.parent_neuron:
-        set_hub_satisfaction(output.parent_neuron)
+        set_hub_satisfaction(state, output.parent_neuron)
+        update_active_sets(state, output.parent_neuron)
 
 
 def attempt_connect_input(state: State, input: Input):
@@ -353,15 +663,17 @@ def attempt_connect_input(state: State, input: Input):
     if input.connected_output:
         return
 
-    key = (input.pos.x, input.pos.y)
-    candidates = state.output_pos_lookup.get(key)
-    if not candidates:
+    output = state.output_pos_lookup.first_free(input.cell)
+    if output is None:
         return
-
-    for output in candidates:
-        if not output.connected_input:
-            connect_input_output(input, output)
-            break
+    profiler = state.profiler
+    if profiler is None:
+        connect_input_output(state, input, output)
+        return
+    # only attempts that find a partner are timed, a miss is one list lookup
+    start = perf_counter_ns()
+    connect_input_output(state, input, output)
+    profiler.connect_ns += perf_counter_ns() - start
 
 
 def attempt_connect_output(state: State, output: Output):
@@ -369,12 +681,13 @@ def attempt_connect_output(state: State, output: Output):
     if output.connected_input:
         return
 
-    key = (output.pos.x, output.pos.y)
-    candidates = state.input_pos_lookup.get(key)
-    if not candidates:
+    input = state.input_pos_lookup.first_free(output.cell)
+    if input is None:
         return
-
-    for input in candidates:
-        if not input.connected_output:
-            connect_input_output(input, output)
-            break
+    profiler = state.profiler
+    if profiler is None:
+        connect_input_output(state, input, output)
+        return
+    start = perf_counter_ns()
+    connect_input_output(state, input, output)
+    profiler.connect_ns += perf_counter_ns() - start
@@ -0,0 +1,129 @@
+"""Thread-pool stepping of the object engine for free-threaded (no GIL) builds."""
+
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from src.settings import THREAD_MIN_SHARD
+from src.state import State
+
+
+def free_threaded() -> bool:
+    """Whether this interpreter runs Python threads in parallel."""
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+class ThreadedStepper:
+    """
+    Steps the input and output phases on a pool, in three passes.
+
+    Where a free terminal walks to depends only on itself and its neuron,
+    neither of which another terminal's move changes, so first the pool
+    works out every target of a phase at once, one contiguous shard of
+    walkers per thread, reading the State without writing it.
+
+    Then the grid is split into one band of columns per thread and each
+    thread places the moves that stay inside its band, moving the terminal
+    in the grid index and linking it to a free partner in its new cell.
+    That writes only the cells a move leaves and enters, so bands share
+    nothing. A move that crosses a band edge is a seam move, and every move
+    into a cell a seam move enters is held back with it, so each cell still
+    sees its arrivals in walker order.
+
+    Last, one pass on the calling thread in walker order places the held
+    back moves and counts every move and connect, the part that writes the
+    shared counters, active sets and neurons. A run matches the serial
+    engine step for step at any thread count.
+
+    The neuron, hub and activity phases stay serial. A neuron move drags
+    inputs and pulls outputs up to their reach away and a spike cascades
+    through neurons anywhere on the grid, so neither splits into bands
+    without most of the work landing in the seam pass. The unsettled
+    neurons and hubs are also a small share of a step's walkers.
+    """
+
+    def __init__(self, threads: int) -> None:
+        self.threads = threads
+        self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="step")
+        self.bands: list[int] = []
+
+    def propose(self, targets, state: State, walkers: list, steps: list[int]) -> list:
+        """
+        targets(state, walkers, steps) over shards of the walkers, steps
+        flattened two per walker, results concatenated in walker order.
+        """
+        shards = min(self.threads, len(walkers) // THREAD_MIN_SHARD)
+        if shards < 2:
+            return targets(state, walkers, steps)
+        bounds = [len(walkers) * shard // shards for shard in range(shards + 1)]
+        futures = [
+            self.pool.submit(targets, state, walkers[start:end], steps[2 * start : 2 * end])
+            for start, end in zip(bounds[:-1], bounds[1:])
+        ]
+        proposed = []
+        for future in futures:
+            proposed.extend(future.result())
+        return proposed
+
+    def migrate(
+        self, state: State, walkers: list, steps: list[int], targets, place, finish
+    ) -> None:
+        """
+        Move walkers by steps. targets proposes (walker, x, y) moves,
+        place(state, moves) moves and links them touching only their cells
+        and returns each one's partner or None, finish(state, walker,
+        partner) does the shared bookkeeping.
+        """
+        proposed = self.propose(targets, state, walkers, steps)
+        if len(proposed) < 2 * THREAD_MIN_SHARD:
+            for move, partner in zip(proposed, place(state, proposed)):
+                finish(state, move[0], partner)
+            return
+
+        grid_size = state.config.grid_size
+        if len(self.bands) != grid_size:
+            self.bands = [x * self.threads // grid_size for x in range(grid_size)]
+        bands = self.bands
+
+        seam_cells = {
+            (x, y) for walker, x, y in proposed if bands[walker.x] != bands[x]
+        }
+        local = [[] for _ in range(self.threads)]
+        for move in proposed:
+            _, x, y = move
+            if (x, y) not in seam_cells:
+                local[bands[x]].append(move)
+        futures = [self.pool.submit(place, state, moves) for moves in local]
+        partners = [iter(future.result()) for future in futures]
+
+        for move in proposed:
+            walker, x, y = move
+            if (x, y) in seam_cells:
+                partner = place(state, [move])[0]
+            else:
+                partner = next(partners[bands[x]])
+            finish(state, walker, partner)
+
+    def close(self) -> None:
+        self.pool.shutdown()
+
+
+def start_threads(state: State, threads: int) -> bool:
+    """
+    Step the object engine's terminal phases on threads threads. Under a
+    GIL build threads cannot run in parallel, so the state keeps stepping
+    serially and this returns False.
+    """
+    if state.arrays is not None:
+        raise ValueError("threaded stepping runs on the object engine only")
+    if threads < 2 or not free_threaded():
+        return False
+    state.threads = ThreadedStepper(threads)
+    return True
+
+
+def stop_threads(state: State) -> None:
+    if state.threads is None:
+        return
+    state.threads.close()
+    state.threads = None
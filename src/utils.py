@@ -1,18 +1,22 @@
-import pygame
 import glm
 
 from src.settings import DIMS, WINDOW_DIMS
-from src.settings import GRID_SIZE
 
 
 def mouse_pos():
+    import pygame
+
     return glm.vec2(pygame.mouse.get_pos()) / WINDOW_DIMS * DIMS
 
 
-def clamp_to_grid(point: glm.ivec2) -> glm.ivec2:
-    lower = 0
-    upper = GRID_SIZE - 1
-    return glm.ivec2(
-        max(lower, min(upper, point.x)),
-        max(lower, min(upper, point.y)),
-    )
+def clamp_to_grid(point: glm.ivec2, grid_size: int) -> glm.ivec2:
+    return glm.ivec2(clamp_coord(point.x, grid_size), clamp_coord(point.y, grid_size))
+
+
+def clamp_coord(value: int, grid_size: int) -> int:
+    """clamp_to_grid for a single int coordinate"""
+    if value < 0:
+        return 0
+    if value >= grid_size:
+        return grid_size - 1
+    return value
@@ -0,0 +1,96 @@
+import json
+
+import numpy as np
+import pytest
+
+from src.brain import init_brain
+from src.checkpoint import (
+    load_checkpoint,
+    pack_checkpoint,
+    read_checkpoint_meta,
+    save_checkpoint,
+    write_checkpoint,
+)
+from src.events import enable_event_activity
+from src.settings import SIM_DT
+from src.state import State
+from src.step import step_state
+
+
+def event_state(seed: int = 0) -> State:
+    state = State()
+    init_brain(state, seed)
+    enable_event_activity(state)
+    return state
+
+
+def neuron_fields(state: State) -> list[tuple]:
+    activity = state.event_activity
+    return [
+        (
+            neuron.x,
+            neuron.y,
+            neuron.hub_x,
+            neuron.hub_y,
+            neuron.charge,
+            neuron.signal_active,
+            neuron.signal_pos,
+            activity.charge_time[neuron] if activity is not None else None,
+        )
+        for neuron in state.neurons
+    ]
+
+
+def test_save_checkpoint_leaves_state_unchanged(tmp_path):
+    state = event_state()
+    for _ in range(200):
+        step_state(state, SIM_DT)
+    before = neuron_fields(state)
+
+    save_checkpoint(state, tmp_path / "state.npz")
+
+    assert neuron_fields(state) == before
+
+
+def test_saving_does_not_change_the_run(tmp_path):
+    saved = event_state()
+    uninterrupted = event_state()
+    for step in range(400):
+        if step == 200:
+            save_checkpoint(saved, tmp_path / "state.npz")
+        step_state(saved, SIM_DT)
+        step_state(uninterrupted, SIM_DT)
+
+    assert neuron_fields(saved) == neuron_fields(uninterrupted)
+    assert saved.spike_count == uninterrupted.spike_count
+
+
+def test_resume_matches_saved_state(tmp_path):
+    state = event_state()
+    for _ in range(200):
+        step_state(state, SIM_DT)
+    save_checkpoint(state, tmp_path / "state.npz")
+    resumed = load_checkpoint(tmp_path / "state.npz")
+
+    activity = state.event_activity
+    for neuron, loaded in zip(state.neurons, resumed.neurons, strict=True):
+        expected = (
+            neuron.charge if neuron.signal_active else activity.charge_at(neuron, activity.time)
+        )
+        assert loaded.charge == expected
+        assert (loaded.x, loaded.y) == (neuron.x, neuron.y)
+
+
+def test_version_1_checkpoints_are_rejected(tmp_path):
+    state = event_state()
+    arrays = pack_checkpoint(state)
+    meta = json.loads(str(arrays["meta"]))
+    meta["version"] = 1
+    del meta["config"]
+    arrays["meta"] = np.array(json.dumps(meta))
+    path = tmp_path / "old.npz"
+    write_checkpoint(arrays, path)
+
+    for read in (load_checkpoint, read_checkpoint_meta):
+        with pytest.raises(ValueError, match="version 1 checkpoint"):
+            read(path)
@@ -0,0 +1,51 @@
+from src.conduction import TimingWheel
+
+
+def arrivals(wheel: TimingWheel, ticks: int) -> dict[int, list]:
+    arrived = {}
+    for _ in range(ticks):
+        due = wheel.advance()
+        if due:
+            arrived[wheel.tick] = due
+    return arrived
+
+
+def test_items_arrive_on_their_exact_tick_across_levels():
+    wheel = TimingWheel()
+    # start off a level boundary so cascades happen mid-flight
+    for _ in range(37):
+        wheel.advance()
+    # level 0 spans 64 ticks, level 1 4096
+    delays = [1, 63, 64, 65, 127, 128, 4095, 4096, 4097, 9000]
+    for delay in delays:
+        wheel.insert(delay, delay)
+
+    arrived = arrivals(wheel, max(delays))
+
+    assert arrived == {37 + delay: [delay] for delay in delays}
+    assert wheel.count == 0
+
+
+def test_delays_past_the_top_level_still_arrive_on_time():
+    # 4 slots over 2 levels reach 16 ticks
+    wheel = TimingWheel(bits=2, levels=2)
+    wheel.advance()
+    for delay in (15, 16, 17, 50):
+        wheel.insert(delay, delay)
+
+    arrived = arrivals(wheel, 50)
+
+    assert arrived == {1 + delay: [delay] for delay in (15, 16, 17, 50)}
+
+
+def test_same_tick_arrivals_keep_insertion_order():
+    wheel = TimingWheel(bits=2, levels=3)
+    # all due on tick 70, each inserted from a different level
+    wheel.insert(70, "first")
+    arrivals(wheel, 60)
+    wheel.insert(10, "second")
+    arrivals(wheel, 9)
+    wheel.insert(1, "third")
+
+    assert wheel.advance() == ["first", "second", "third"]
+    assert wheel.tick == 70
@@ -0,0 +1,38 @@
+import numpy as np
+
+from src.data import DistributionSampler, alias_table
+
+
+def implied_probabilities(prob: np.ndarray, alias: np.ndarray) -> np.ndarray:
+    """The distribution an alias table draws, each cell 1 / n of the mass."""
+    mass = prob.copy()
+    np.add.at(mass, alias, 1.0 - prob)
+    return mass / len(prob)
+
+
+def test_alias_table_reproduces_weights():
+    weights = np.random.default_rng(1).random(1000) ** 4
+    prob, alias = alias_table(weights)
+    np.testing.assert_allclose(
+        implied_probabilities(prob, alias), weights / weights.sum(), atol=1e-12
+    )
+
+
+def test_sample_frequencies_match_density():
+    density = np.random.default_rng(2).random((6, 8)).astype(np.float32)
+    density[2, 3] = 0.0
+    sampler = DistributionSampler(density, np.random.default_rng(3))
+    count = 400_000
+    points = sampler.sample(count)
+
+    assert points.shape == (count, 2)
+    assert points.min() >= 0.0 and points.max() < 1.0
+    cols = (points[:, 0] * 8).astype(np.int64)
+    rows = (points[:, 1] * 6).astype(np.int64)
+    frequencies = np.bincount(rows * 8 + cols, minlength=48) / count
+
+    expected = (density / density.sum()).ravel()
+    # within 5 standard deviations of a multinomial count
+    tolerance = 5 * np.sqrt(expected * (1 - expected) / count)
+    assert np.all(np.abs(frequencies - expected) <= tolerance + 1e-12)
+    assert frequencies[2 * 8 + 3] == 0.0
@@ -0,0 +1,85 @@
+import numpy as np
+
+from src.grid_index import GridIndex
+
+
+class Terminal:
+    def __init__(self, index: int) -> None:
+        self.index = index
+        self.cell = -1
+        self.cell_free = True
+        self.cell_prev = None
+        self.cell_next = None
+
+
+def walk(head) -> list[int]:
+    indices = []
+    previous = None
+    while head is not None:
+        assert head.cell_prev is previous
+        indices.append(head.index)
+        previous = head
+        head = head.cell_next
+    return indices
+
+
+def test_grid_index_matches_dict_of_lists():
+    grid_size = 4
+    cells = grid_size * grid_size
+    index = GridIndex(grid_size)
+    terminals = [Terminal(i) for i in range(40)]
+    # cell -> terminal indices, newest first, as the index keeps them
+    free: dict[int, list[int]] = {}
+    bound: dict[int, list[int]] = {}
+    where: dict[int, int] = {}
+
+    def unfile(terminal: Terminal) -> None:
+        cell = where.pop(terminal.index)
+        for lists in (free, bound):
+            if terminal.index in lists.get(cell, []):
+                lists[cell].remove(terminal.index)
+
+    rng = np.random.default_rng(0)
+    for _ in range(5000):
+        terminal = terminals[rng.integers(len(terminals))]
+        op = rng.integers(5)
+        cell = int(rng.integers(cells))
+        placed = terminal.index in where
+        if op == 0 and not placed:
+            is_free = bool(rng.integers(2))
+            index.insert(terminal, cell, is_free)
+            (free if is_free else bound).setdefault(cell, []).insert(0, terminal.index)
+            where[terminal.index] = cell
+        elif op == 1:
+            index.remove(terminal)
+            if placed:
+                unfile(terminal)
+        elif op == 2 and placed:
+            is_free = terminal.index in free.get(where[terminal.index], [])
+            index.move(terminal, cell)
+            if where[terminal.index] != cell:
+                unfile(terminal)
+                (free if is_free else bound).setdefault(cell, []).insert(0, terminal.index)
+                where[terminal.index] = cell
+        elif op == 3 and placed:
+            index.mark_bound(terminal)
+            here = where[terminal.index]
+            if terminal.index in free.get(here, []):
+                free[here].remove(terminal.index)
+                bound.setdefault(here, []).insert(0, terminal.index)
+        elif op == 4 and placed:
+            index.mark_free(terminal)
+            here = where[terminal.index]
+            if terminal.index in bound.get(here, []):
+                bound[here].remove(terminal.index)
+                free.setdefault(here, []).insert(0, terminal.index)
+
+        assert len(index) == len(where)
+        for cell in range(cells):
+            assert walk(index.free_heads[cell]) == free.get(cell, [])
+            assert walk(index.bound_heads[cell]) == bound.get(cell, [])
+            first = index.first_free(cell)
+            expected = free.get(cell)
+            assert (first.index if first else None) == (expected[0] if expected else None)
+        for terminal in terminals:
+            assert terminal.cell == where.get(terminal.index, -1)
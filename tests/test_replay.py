@@ -0,0 +1,30 @@
+from src.brain import init_brain
+from src.record import start_recording, stop_recording
+from src.replay import Replay
+from src.settings import SIM_DT
+from src.state import State
+from src.step import step_state
+
+
+def record_run(path, steps: int, seed: int = 0) -> State:
+    state = State()
+    init_brain(state, seed)
+    # one keyframe at the start, so replay rebuilds every step from records
+    start_recording(state, path, SIM_DT, keyframe_interval=steps + 1)
+    for _ in range(steps):
+        step_state(state, SIM_DT)
+    stop_recording(state)
+    return state
+
+
+def test_replay_matches_live_signals(tmp_path):
+    live = record_run(tmp_path / "log", 600)
+    replay = Replay(tmp_path / "log")
+    replay.seek(live.step_count)
+
+    replayed = replay.state
+    assert replayed.step_count == live.step_count
+    assert replayed.spike_count == live.spike_count
+    for live_neuron, neuron in zip(live.neurons, replayed.neurons, strict=True):
+        assert neuron.signal_active == live_neuron.signal_active, neuron.index
+        assert neuron.signal_pos == live_neuron.signal_pos, neuron.index
@@ -0,0 +1,40 @@
+import numpy as np
+
+from src import threaded
+from src.brain import init_brain
+from src.checkpoint import pack_checkpoint
+from src.config import SimConfig
+from src.settings import SIM_DT
+from src.state import State
+from src.step import step_state
+from src.threaded import ThreadedStepper
+
+
+def run(threads: int, steps: int = 200) -> State:
+    state = State(SimConfig(num_neurons=512, grid_size=48))
+    init_brain(state, 0)
+    # set directly so a GIL build still takes the threaded path
+    if threads:
+        state.threads = ThreadedStepper(threads)
+    try:
+        for _ in range(steps):
+            step_state(state, SIM_DT)
+    finally:
+        if state.threads is not None:
+            state.threads.close()
+    return state
+
+
+def test_threaded_matches_serial(monkeypatch):
+    # small shards so every band and the seam pass see work
+    monkeypatch.setattr(threaded, "THREAD_MIN_SHARD", 8)
+    serial = run(0)
+    expected = pack_checkpoint(serial)
+    for threads in (2, 3):
+        state = run(threads)
+        packed = pack_checkpoint(state)
+        assert packed.keys() == expected.keys()
+        for name, array in expected.items():
+            assert np.array_equal(packed[name], array), (threads, name)
+        assert state.moves == serial.moves
+        assert state.connection_changes == serial.connection_changes